@@ -2,10 +2,13 @@
 """
 Tiny wrapper so `streamlit run app.py` still works.
 
-All UI logic lives in *src/ui/layout.py*.
+All UI logic lives in *src/ui/layout.py*.  Logging is configured here, once,
+rather than as a side effect of importing the helpers (see `src.utils.logs`).
 """
 
+from src.utils.logs import setup_logging
 from src.ui.layout import main
 
 if __name__ == "__main__":
+    setup_logging()
     main()
@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Stand-alone performance checks; run each module with `python -m benchmarks.<name>`
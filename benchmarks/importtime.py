@@ -0,0 +1,141 @@
+# benchmarks/importtime.py
+"""
+Import-time benchmark for the Streamlit entry point.
+
+Runs ``python -X importtime -c "import <target>"`` in a fresh interpreter,
+parses the per-module timings CPython writes to stderr and reports the most
+expensive modules.  Use it to keep cold starts on autoscaled pods cheap:
+
+    python -m benchmarks.importtime                       # app.py, top 25
+    python -m benchmarks.importtime src.ui.layout --top 40
+    python -m benchmarks.importtime --forbid edsl --budget-ms 1500
+    python -m benchmarks.importtime --json > importtime.json
+
+``--forbid`` fails (exit 1) if a module that should load lazily shows up at
+startup; ``--budget-ms`` fails if the total cumulative import time exceeds
+the budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from typing import Iterable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:       412 |       1180 |   src.utils.models"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int  # nesting level reported by -X importtime (0 = top level)
+
+
+def parse_importtime(lines: Iterable[str]) -> List[ImportTiming]:
+    """Parse ``-X importtime`` stderr into one record per imported module."""
+    out: List[ImportTiming] = []
+    for line in lines:
+        m = _LINE.match(line.rstrip("\n"))
+        if m is None:
+            continue  # header row or unrelated stderr output
+        self_us, cum_us, indent, module = m.groups()
+        out.append(
+            ImportTiming(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cum_us),
+                depth=max(len(indent) - 1, 0) // 2,
+            )
+        )
+    return out
+
+
+def measure(target: str, python: str = sys.executable) -> List[ImportTiming]:
+    """Import *target* in a clean subprocess and return its timings."""
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"importing {target!r} failed:\n{tail}")
+    return parse_importtime(proc.stderr.splitlines())
+
+
+def interpreter_modules(python: str = sys.executable) -> set:
+    """Modules a bare interpreter imports anyway (``site``, ``encodings`` …)."""
+    return {t.module for t in measure("sys", python)}
+
+
+def total_us(timings: List[ImportTiming], exclude: set = frozenset()) -> int:
+    """Wall cost of the import = sum of the top-level cumulative times."""
+    return sum(
+        t.cumulative_us for t in timings if t.depth == 0 and t.module not in exclude
+    )
+
+
+def _root_package(module: str) -> str:
+    return module.split(".", 1)[0]
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("target", nargs="?", default="app", help="module to import (default: app)")
+    ap.add_argument("--top", type=int, default=25, help="rows to print (default: 25)")
+    ap.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    ap.add_argument("--forbid", action="append", default=[], metavar="PKG",
+                    help="fail if PKG is imported at startup (repeatable)")
+    ap.add_argument("--budget-ms", type=float, help="fail if total import time exceeds this")
+    args = ap.parse_args(argv)
+
+    baseline = interpreter_modules()
+    timings = [t for t in measure(args.target) if t.module not in baseline]
+    total = total_us(timings)
+    ranked = sorted(timings, key=lambda t: t.cumulative_us, reverse=True)
+    leaked = sorted(
+        {t.module for t in timings if _root_package(t.module) in set(args.forbid)}
+    )
+
+    if args.json:
+        json.dump(
+            {
+                "target": args.target,
+                "total_ms": total / 1000,
+                "forbidden_imported": leaked,
+                "modules": [asdict(t) for t in ranked],
+            },
+            sys.stdout,
+            indent=2,
+        )
+        print()
+    else:
+        print(f"import {args.target}: {total / 1000:.1f} ms across {len(timings)} modules\n")
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for t in ranked[: args.top]:
+            print(f"{t.cumulative_us / 1000:>14.1f} {t.self_us / 1000:>9.1f}  {'  ' * t.depth}{t.module}")
+
+    failed = False
+    if leaked:
+        print(f"\nFAIL: eagerly imported {', '.join(leaked)}", file=sys.stderr)
+        failed = True
+    if args.budget_ms is not None and total / 1000 > args.budget_ms:
+        print(f"\nFAIL: {total / 1000:.1f} ms exceeds budget of {args.budget_ms:.1f} ms",
+              file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
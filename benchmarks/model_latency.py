@@ -0,0 +1,379 @@
+# benchmarks/model_latency.py
+"""
+Latency / throughput benchmark across models, on a fixed date workload.
+
+`check_models.py`, `debug_models.py` and `troubleshoot.py` only show that a
+model is *listed*.  This sends every chosen model the same date-shaped
+workload, built from the prompts in `src/prompts/date.py`, and measures
+how it behaves:
+
+    opener      `get_opener()`     – ``OPENING_PROMPT``
+    reply       `get_response()`   – ``RESPONSE_PROMPT`` on a scripted history
+                                     that grows by one message per reply
+    rating      `evaluate_date()`  – both agents' ratings in one job
+
+Personas and history are fixed, so every model answers identical prompts.
+Calls go through `src.models.agents` exactly as in production (backend,
+telemetry), with the response cache, hedging and the rate-limit scheduler
+off, so ``--concurrency`` alone sets the load.  ``--concurrency`` dates run
+at once per model; models are benchmarked one after another.
+
+Per model the report gives p50/p95/p99 call latency (overall and per
+call kind), completion tokens per second of call time, calls per second,
+error rate and cost per date (from the price table in
+`src.utils.metrics`; ``null`` for unpriced models), plus a recommended
+default: the lowest p95 among models under ``--max-error-rate``.
+
+Usage:
+
+    python -m benchmarks.model_latency gpt-4o "claude-3-7-sonnet-20250219 [anthropic]" \\
+        --dates 20 --concurrency 5 --json report.json --markdown report.md
+    python -m benchmarks.model_latency gpt-4o --backend stub --stub-latency 0.3   # dry run
+
+Without ``--markdown`` the Markdown report goes to stdout.  Real models cost
+real money: ``--dates`` × (``--replies`` + 2) calls per model.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_DATES = 10
+DEFAULT_REPLIES = 4
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_ERROR_RATE = 0.05
+PERCENTILES = (50, 95, 99)
+KINDS = ("opener", "reply", "rating")
+
+PERSONA_A = "28 year old product manager who climbs at the weekend and hates small talk"
+PERSONA_B = "30 year old literature PhD, vegan, obsessed with jazz records"
+SCRIPT = [
+    ("Alex", "Hi! This place is louder than the photos suggested – have you been before?"),
+    ("Sam", "Once, for a gig. The upstairs booths are quieter; the dumplings are worth it."),
+    ("Alex", "Dumplings it is. I climbed all morning so I could eat the whole menu."),
+    ("Sam", "Climbing! Indoors? I tried once and spent the hour chalking my hands."),
+    ("Alex", "Mostly indoors. Chalking up is half the sport, honestly. What are you reading?"),
+    ("Sam", "A novel about a jazz pianist in Lagos. I keep stopping to find the records."),
+    ("Alex", "That sounds like a great way to read. Any you'd recommend for a beginner?"),
+    ("Sam", "Fela, then Coltrane's Ballads. If you hate both we can still be friends."),
+]
+
+
+@dataclass
+class CallSample:
+    kind: str
+    latency_s: float
+    error: Optional[str] = None
+
+
+@dataclass
+class DateSample:
+    calls: List[CallSample]
+    wall_s: float
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: float
+
+
+# ---------------------------------------------------------------------------#
+#  Workload                                                                  #
+# ---------------------------------------------------------------------------#
+def _history(n: int) -> str:
+    return "".join(f"\n{speaker}: {text}" for speaker, text in (SCRIPT * 4)[:n])
+
+
+def _timed(calls: List[CallSample], kind: str, fn) -> None:
+    t0 = time.perf_counter()
+    try:
+        fn()
+    except Exception as exc:  # counted, the date goes on
+        calls.append(CallSample(kind, time.perf_counter() - t0, type(exc).__name__))
+    else:
+        calls.append(CallSample(kind, time.perf_counter() - t0))
+
+
+def run_date(
+    model_name: str, service_name: Optional[str], replies: int, date_id: str
+) -> DateSample:
+    """One benchmark date: opener, *replies* replies, one batched rating job."""
+    from src.models import agents
+    from src.utils.metrics import METRICS, bind
+
+    me = agents.get_agent("Alex", PERSONA_A, gender="she/her")
+    other = agents.get_agent("Sam", PERSONA_B, gender="he/him")
+    calls: List[CallSample] = []
+    t0 = time.perf_counter()
+    with bind(date_id=date_id):
+        _timed(calls, "opener", lambda: agents.get_opener(
+            model_name, me, service_name=service_name, use_cache=False,
+        ))
+        for turn in range(replies):
+            speaker, (a, b) = ("B", (other, me)) if turn % 2 == 0 else ("A", (me, other))
+            history = _history(turn + 1)
+            _timed(calls, "reply", lambda: agents.get_response(
+                model_name, a, b, turn // 2, speaker, history,
+                service_name=service_name, use_cache=False,
+            ))
+        history = _history(replies + 1)
+        _timed(calls, "rating", lambda: agents.evaluate_date(
+            model_name, [me, other], history, service_name=service_name, use_cache=False,
+        ))
+    totals = METRICS.date_totals(date_id)
+    return DateSample(
+        calls=calls,
+        wall_s=time.perf_counter() - t0,
+        prompt_tokens=totals.prompt_tokens,
+        completion_tokens=totals.completion_tokens,
+        cost_usd=totals.cost_usd,
+    )
+
+
+# ---------------------------------------------------------------------------#
+#  Statistics                                                                #
+# ---------------------------------------------------------------------------#
+def percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """Linear-interpolated percentile (as ``numpy.percentile``); ``None`` if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * p / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _latencies(calls: Sequence[CallSample]) -> Dict[str, Optional[float]]:
+    ok = [c.latency_s for c in calls if c.error is None]
+    return {f"p{p}_s": _round(percentile(ok, p)) for p in PERCENTILES}
+
+
+def _round(value: Optional[float], digits: int = 3) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def summarise(
+    model_name: str, dates: Sequence[DateSample], wall_s: float, *, priced: bool
+) -> dict:
+    """Everything the report shows for one model."""
+    calls = [c for d in dates for c in d.calls]
+    errors = [c for c in calls if c.error is not None]
+    busy_s = sum(c.latency_s for c in calls if c.error is None)
+    completion = sum(d.completion_tokens for d in dates)
+    error_types: Dict[str, int] = {}
+    for c in errors:
+        error_types[c.error] = error_types.get(c.error, 0) + 1
+    return {
+        "model": model_name,
+        "dates": len(dates),
+        "calls": len(calls),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(calls), 4) if calls else 0.0,
+        "error_types": error_types,
+        "latency": _latencies(calls),
+        "latency_by_kind": {
+            kind: _latencies([c for c in calls if c.kind == kind]) for kind in KINDS
+        },
+        "date_p50_s": _round(percentile([d.wall_s for d in dates], 50)),
+        "prompt_tokens": sum(d.prompt_tokens for d in dates),
+        "completion_tokens": completion,
+        "tokens_per_s": _round(completion / busy_s if busy_s else None, 1),
+        "calls_per_s": _round(len(calls) / wall_s if wall_s else None, 2),
+        "cost_per_date_usd": (
+            _round(sum(d.cost_usd for d in dates) / len(dates), 6) if priced and dates else None
+        ),
+    }
+
+
+def recommend(models: Dict[str, dict], max_error_rate: float = DEFAULT_MAX_ERROR_RATE) -> Optional[str]:
+    """Lowest p95 latency among models with an acceptable error rate."""
+    ok = [
+        (m["latency"]["p95_s"], name) for name, m in models.items()
+        if m["error_rate"] <= max_error_rate and m["latency"]["p95_s"] is not None
+    ]
+    return min(ok)[1] if ok else None
+
+
+# ---------------------------------------------------------------------------#
+#  Runner                                                                    #
+# ---------------------------------------------------------------------------#
+def _target(label: str) -> Tuple[str, Optional[str]]:
+    from src.models.hedging import parse_target
+
+    model_name, service_name = parse_target(label)
+    if service_name is None:
+        from src.models.backends import get_backend
+
+        if get_backend().name == "edsl":
+            from src.utils.models import get_service_map
+
+            service_name = get_service_map().get(model_name)
+    return model_name, service_name
+
+
+def run_benchmark(
+    models: Sequence[str],
+    *,
+    dates: int = DEFAULT_DATES,
+    replies: int = DEFAULT_REPLIES,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+) -> dict:
+    """Benchmark each of *models* (``"name"`` or ``"name [service]"``) in turn."""
+    from src.models.backends import get_backend
+    from src.models.hedging import hedging
+    from src.models.scheduler import Scheduler, set_scheduler
+    from src.utils.metrics import estimate_cost
+
+    run_id = time.strftime("%Y%m%d%H%M%S")
+    previous = set_scheduler(Scheduler(enabled=False))
+    results: Dict[str, dict] = {}
+    try:
+        for label in models:
+            model_name, service_name = _target(label)
+            t0 = time.perf_counter()
+            with hedging(False), ThreadPoolExecutor(concurrency) as pool:
+                samples = list(pool.map(
+                    lambda i: run_date(
+                        model_name, service_name, replies, f"bench-{run_id}-{model_name}-{i}"
+                    ),
+                    range(dates),
+                ))
+            priced = estimate_cost(model_name, 1, 1) is not None
+            results[model_name] = dict(
+                summarise(model_name, samples, time.perf_counter() - t0, priced=priced),
+                service=service_name,
+            )
+    finally:
+        set_scheduler(previous)
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": get_backend().name,
+        "workload": {
+            "dates": dates, "replies": replies, "concurrency": concurrency,
+            "calls_per_date": replies + 2,
+        },
+        "models": results,
+        "recommended": recommend(results, max_error_rate),
+        "max_error_rate": max_error_rate,
+    }
+
+
+# ---------------------------------------------------------------------------#
+#  Reports                                                                   #
+# ---------------------------------------------------------------------------#
+def _fmt(value: Optional[float], spec: str) -> str:
+    return "–" if value is None else format(value, spec)
+
+
+def to_markdown(report: dict) -> str:
+    w = report["workload"]
+    lines = [
+        "# Model latency benchmark",
+        "",
+        f"{report['created']} · backend `{report['backend']}` · {w['dates']} dates × "
+        f"{w['calls_per_date']} calls per model · concurrency {w['concurrency']}",
+        "",
+        "| model | service | calls | error rate | p50 s | p95 s | p99 s | tokens/s | calls/s | $/date |",
+        "|---|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for name, m in report["models"].items():
+        lat = m["latency"]
+        lines.append(
+            f"| {name} | {m['service'] or '–'} | {m['calls']} | {m['error_rate']:.1%} | "
+            f"{_fmt(lat['p50_s'], '.2f')} | {_fmt(lat['p95_s'], '.2f')} | "
+            f"{_fmt(lat['p99_s'], '.2f')} | {_fmt(m['tokens_per_s'], '.1f')} | "
+            f"{_fmt(m['calls_per_s'], '.2f')} | {_fmt(m['cost_per_date_usd'], '.4f')} |"
+        )
+    lines += [
+        "",
+        "## p50 / p95 latency by call (s)",
+        "",
+        "| model | " + " | ".join(KINDS) + " |",
+        "|---|" + "---:|" * len(KINDS),
+    ]
+    for name, m in report["models"].items():
+        cells = [
+            f"{_fmt(m['latency_by_kind'][k]['p50_s'], '.2f')} / "
+            f"{_fmt(m['latency_by_kind'][k]['p95_s'], '.2f')}"
+            for k in KINDS
+        ]
+        lines.append(f"| {name} | " + " | ".join(cells) + " |")
+    lines.append("")
+    if report["recommended"]:
+        lines.append(
+            f"**Recommended default:** `{report['recommended']}` – lowest p95 among models "
+            f"with at most {report['max_error_rate']:.0%} errors."
+        )
+    else:
+        lines.append(f"No model stayed under {report['max_error_rate']:.0%} errors.")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("models", nargs="+", help='model names, optionally "name [service]"')
+    ap.add_argument("--dates", type=int, default=DEFAULT_DATES,
+                    help="dates per model (default: %(default)s)")
+    ap.add_argument("--replies", type=int, default=DEFAULT_REPLIES,
+                    help="replies per date (default: %(default)s)")
+    ap.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                    help="dates in flight per model (default: %(default)s)")
+    ap.add_argument("--max-error-rate", type=float, default=DEFAULT_MAX_ERROR_RATE,
+                    help="highest error rate a recommended model may have (default: %(default)s)")
+    ap.add_argument("--json", metavar="PATH", help="write the JSON report here")
+    ap.add_argument("--markdown", metavar="PATH", help="write the Markdown report here (default: stdout)")
+    ap.add_argument("--backend", choices=("edsl", "stub"),
+                    help="answer source (default: $LOVEDJ_BACKEND or edsl)")
+    ap.add_argument("--stub-latency", type=float, default=0.0, metavar="S",
+                    help="stub: median seconds per call, log-normal tail (default: 0)")
+    ap.add_argument("--stub-failure-rate", type=float, default=0.0, metavar="P",
+                    help="stub: probability that a call fails (default: 0)")
+    args = ap.parse_args(argv)
+    for flag in ("dates", "replies", "concurrency"):
+        if getattr(args, flag) < 1:
+            ap.error(f"--{flag} must be >= 1")
+
+    from src.models.backends import Latency, StubBackend, make_backend, set_backend
+
+    previous = None
+    if args.backend == "stub":
+        previous = set_backend(StubBackend(
+            latency=Latency("lognormal", median_s=args.stub_latency),
+            failure_rate=args.stub_failure_rate,
+        ))
+    elif args.backend == "edsl":
+        previous = set_backend(make_backend("edsl"))
+    try:
+        report = run_benchmark(
+            args.models, dates=args.dates, replies=args.replies,
+            concurrency=args.concurrency, max_error_rate=args.max_error_rate,
+        )
+    finally:
+        if args.backend:
+            set_backend(previous)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+    markdown = to_markdown(report)
+    if args.markdown:
+        with open(args.markdown, "w", encoding="utf-8") as fh:
+            fh.write(markdown)
+    else:
+        sys.stdout.write(markdown)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
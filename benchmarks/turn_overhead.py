@@ -0,0 +1,429 @@
+# benchmarks/turn_overhead.py
+"""
+Micro-benchmarks for the framework overhead of one conversation turn.
+
+Everything a turn does *besides* waiting for the model is timed as its own
+case, so a regression can be pinned on one step:
+
+    scenario_fields     build the ``{{ chat }}``/persona fields for a reply
+    cache_key           hash them into the response-cache key
+    question_spec       describe the question (backend-neutral)
+    history_render      split + render a 20-message history (full / last-N / summary)
+    transcript_update   append a message to a `DateSession`
+    stub_turn           a whole `get_response()` on the zero-latency stub backend
+                        (pools, telemetry, backend dispatch – cache off)
+    model_options       the model select-box labels for a 1 000-model catalogue
+                        (paid again on every Streamlit rerun)
+
+and, when ``edsl`` is installed, the EDSL object costs themselves:
+
+    edsl_question       `QuestionFreeText(...)` – built fresh every time
+    edsl_question_reuse the backend's pooled question for the reply spec
+    edsl_scenario       `Scenario(fields)`
+    edsl_job_run        `.by(model).by(agent).by(scenario).run()` on EDSL's
+                        offline ``test`` model
+    edsl_result_select  `Results.select(name).first()`
+
+``--concurrent N`` instead runs *N* complete dates at once through
+`run_many()` on the zero-latency stub backend (cache disabled, so keys are
+still built) and reports process CPU time per model call – the per-turn
+cost that adds up when hundreds of dates share one process.
+
+Usage:
+
+    python -m benchmarks.turn_overhead                             # table
+    python -m benchmarks.turn_overhead --concurrent 300
+    python -m benchmarks.turn_overhead --save benchmarks/baselines/turn_overhead.json
+    python -m benchmarks.turn_overhead --compare benchmarks/baselines/turn_overhead.json
+
+``--compare`` prints the ratio to the baseline per case and fails (exit 1)
+if any case got slower than ``--threshold`` (default 1.5×).  Baselines are
+machine-specific: record and compare them on the same hardware.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_MIN_TIME_S = 0.05  # per repeat
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 1.5
+
+HISTORY = "".join(
+    f"\n{'Alex' if i % 2 else 'Sam'}: message {i} – the jazz bar was loud but the "
+    f"dumplings made up for it, and I'd go back for the playlist alone."
+    for i in range(20)
+)
+
+
+@dataclass
+class CaseResult:
+    name: str
+    per_op_us: float  # median over repeats
+    best_us: float
+    loops: int
+    repeats: int
+
+
+# ---------------------------------------------------------------------------#
+#  Cases – each factory returns the zero-argument callable to time           #
+# ---------------------------------------------------------------------------#
+def _agents():
+    from src.models.backends import StubAgent
+
+    traits = {"guidelines": "…", "gender": "she/her"}
+    return (
+        StubAgent("Alex", dict(traits, persona="28 year old product manager who climbs")),
+        StubAgent("Sam", dict(traits, persona="30 year old literature PhD, vegan")),
+    )
+
+
+def _fields(me, other) -> dict:
+    # mirrors the scenario built by src.models.agents.get_response
+    return {
+        "chat": HISTORY.strip(),
+        "persona": me.traits["persona"],
+        "partner_persona": other.traits["persona"],
+        "gender": me.traits.get("gender", "he/him"),
+        "partner_gender": other.traits.get("gender", "she/her"),
+    }
+
+
+def case_scenario_fields() -> Callable[[], object]:
+    me, other = _agents()
+    return lambda: _fields(me, other)
+
+
+def case_cache_key() -> Callable[[], object]:
+    from src.models.agents import _cache_key
+    from src.prompts.date import RESPONSE_PROMPT
+
+    me, other = _agents()
+    fields = _fields(me, other)
+    # the reply key, as get_response() builds it (only `chat` varies per turn)
+    return lambda: _cache_key(
+        "response", "gpt-4o", "openai", RESPONSE_PROMPT, fields, me, ("chat",)
+    )
+
+
+def case_question_spec() -> Callable[[], object]:
+    from src.models.backends import QuestionSpec
+    from src.prompts.date import RESPONSE_PROMPT
+
+    return lambda: QuestionSpec("turn", RESPONSE_PROMPT)
+
+
+def case_history_render() -> Callable[[], object]:
+    from src.models.context import ContextPolicy, split_turns
+
+    policies = [ContextPolicy(), ContextPolicy("last_n"), ContextPolicy("summary", last_n=4)]
+
+    def run():
+        turns = split_turns(HISTORY)
+        for policy in policies:
+            policy.render(turns, "They bonded over jazz.")
+
+    return run
+
+
+def case_transcript_update() -> Callable[[], object]:
+    from src.models.session import DateSession
+
+    session = DateSession()
+    entry = ("Alex", "Ha, I did not expect that! The music here is louder than I thought.")
+
+    def run():
+        if session.index >= 12:  # keep the history at a realistic length
+            session.__init__()
+        session.add(entry)
+
+    return run
+
+
+def case_stub_turn() -> Callable[[], object]:
+    from src.models import agents
+    from src.models.backends import StubBackend, set_backend
+
+    set_backend(StubBackend())
+    me, other = (
+        agents.get_agent("Alex", "28 year old product manager who climbs"),
+        agents.get_agent("Sam", "30 year old literature PhD, vegan"),
+    )
+    return lambda: agents.get_response(
+        "stub-model", me, other, 3, "B", HISTORY, use_cache=False
+    )
+
+
+def case_model_options() -> Callable[[], object]:
+    from src.utils import models
+
+    catalogue = {f"model-{i:04d}": f"service-{i % 12}" for i in range(1000)}
+    models._install(sorted(catalogue), catalogue, time.time())
+    return models.format_models_for_selectbox
+
+
+def case_edsl_question() -> Callable[[], object]:
+    from edsl import QuestionFreeText
+    from src.prompts.date import RESPONSE_PROMPT
+
+    return lambda: QuestionFreeText(question_name="turn", question_text=RESPONSE_PROMPT)
+
+
+def case_edsl_question_reuse() -> Callable[[], object]:
+    from src.models.agents import TURN_QUESTION
+    from src.models.backends import EDSLBackend
+
+    backend = EDSLBackend()
+    return lambda: backend.question(TURN_QUESTION)
+
+
+def case_edsl_scenario() -> Callable[[], object]:
+    from edsl import Scenario
+
+    fields = _fields(*_agents())
+    return lambda: Scenario(fields)
+
+
+def _edsl_job():
+    from edsl import Agent, Model, QuestionFreeText, Scenario
+    from src.prompts.date import RESPONSE_PROMPT
+
+    me, other = _agents()
+    model = Model("test", canned_response="Tell me more about the jazz bar!")
+    return (
+        QuestionFreeText(question_name="turn", question_text=RESPONSE_PROMPT)
+        .by(model)
+        .by(Agent(name=me.name, traits=me.traits))
+        .by(Scenario(_fields(me, other)))
+    )
+
+
+def case_edsl_job_run() -> Callable[[], object]:
+    job = _edsl_job()
+    return lambda: job.run(disable_remote_cache=True, disable_remote_inference=True, cache=False)
+
+
+def case_edsl_result_select() -> Callable[[], object]:
+    results = _edsl_job().run(
+        disable_remote_cache=True, disable_remote_inference=True, cache=False
+    )
+    return lambda: results.select("turn").first()
+
+
+CASES: Dict[str, Callable[[], Callable[[], object]]] = {
+    "scenario_fields": case_scenario_fields,
+    "cache_key": case_cache_key,
+    "question_spec": case_question_spec,
+    "history_render": case_history_render,
+    "transcript_update": case_transcript_update,
+    "stub_turn": case_stub_turn,
+    "model_options": case_model_options,
+}
+EDSL_CASES: Dict[str, Callable[[], Callable[[], object]]] = {
+    "edsl_question": case_edsl_question,
+    "edsl_question_reuse": case_edsl_question_reuse,
+    "edsl_scenario": case_edsl_scenario,
+    "edsl_job_run": case_edsl_job_run,
+    "edsl_result_select": case_edsl_result_select,
+}
+
+
+# ---------------------------------------------------------------------------#
+#  Runner                                                                    #
+# ---------------------------------------------------------------------------#
+def time_case(
+    name: str,
+    fn: Callable[[], object],
+    *,
+    min_time_s: float = DEFAULT_MIN_TIME_S,
+    repeats: int = DEFAULT_REPEATS,
+) -> CaseResult:
+    """Calibrate a loop count that takes *min_time_s*, then time *repeats* runs."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - t0 >= min_time_s or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    per_op = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_op.append((time.perf_counter() - t0) / loops * 1e6)
+    return CaseResult(name, statistics.median(per_op), min(per_op), loops, repeats)
+
+
+def run_suite(
+    names: Optional[List[str]] = None,
+    *,
+    min_time_s: float = DEFAULT_MIN_TIME_S,
+    repeats: int = DEFAULT_REPEATS,
+) -> Dict[str, CaseResult]:
+    """Run the selected cases (EDSL ones only if ``edsl`` is importable)."""
+    from src.models.backends import set_backend
+
+    available = dict(CASES)
+    if importlib.util.find_spec("edsl") is not None:
+        available.update(EDSL_CASES)
+    selected = names or list(available)
+    unknown = [n for n in selected if n not in CASES and n not in EDSL_CASES]
+    if unknown:
+        raise ValueError(f"unknown case(s): {', '.join(unknown)}")
+
+    previous = set_backend(None)
+    try:
+        results = {}
+        for name in selected:
+            if name not in available:
+                continue  # EDSL case without EDSL installed
+            results[name] = time_case(
+                name, available[name](), min_time_s=min_time_s, repeats=repeats
+            )
+        return results
+    finally:
+        set_backend(previous)
+
+
+def measure_concurrent(
+    dates: int = 300, *, rounds: int = 3, max_concurrency: int = 100
+) -> dict:
+    """CPU seconds per call for *dates* concurrent stub dates (distinct personas)."""
+    import asyncio
+
+    from src.models.backends import StubBackend, set_backend
+    from src.models.cache import ResponseCache, set_cache
+    from src.models.simulation import run_many
+
+    pairs = [
+        dict(
+            name_a="Alex", profile_a=f"product manager who climbs (#{i})", gender_a="she/her",
+            name_b="Sam", profile_b=f"literature PhD, vegan (#{i})", gender_b="he/him",
+            rounds=rounds, model_name="stub-model",
+        )
+        for i in range(dates)
+    ]
+    calls = dates * (2 + 2 * rounds)  # opener, B/A replies, one batched evaluation
+
+    previous_backend = set_backend(StubBackend())
+    previous_cache = set_cache(ResponseCache(enabled=False))
+    try:
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        asyncio.run(run_many(pairs, max_concurrency=max_concurrency))
+        cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    finally:
+        set_backend(previous_backend)
+        set_cache(previous_cache)
+    return {
+        "dates": dates,
+        "calls": calls,
+        "cpu_s": cpu,
+        "wall_s": wall,
+        "cpu_us_per_call": cpu / calls * 1e6,
+    }
+
+
+def snapshot(results: Dict[str, CaseResult]) -> dict:
+    """JSON-serialisable record of *results* plus the environment."""
+    try:
+        from importlib.metadata import version
+
+        edsl_version = version("edsl")
+    except Exception:
+        edsl_version = None
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "edsl": edsl_version,
+        "cases": {name: asdict(r) for name, r in results.items()},
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """Per-case ``current / baseline`` ratios; ``regressed`` when above *threshold*."""
+    rows = []
+    for name, case in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            rows.append({"name": name, "ratio": None, "regressed": False})
+            continue
+        ratio = case["per_op_us"] / base["per_op_us"] if base["per_op_us"] else float("inf")
+        rows.append({"name": name, "ratio": ratio, "regressed": ratio > threshold})
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("cases", nargs="*", help="case names (default: all available)")
+    ap.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    ap.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME_S,
+                    help="seconds per repeat (default: %(default)s)")
+    ap.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    ap.add_argument("--save", metavar="PATH", help="write the results as a baseline JSON")
+    ap.add_argument("--compare", metavar="PATH", help="diff against a baseline JSON")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="fail if a case is this many times slower (default: %(default)s)")
+    ap.add_argument("--concurrent", type=int, metavar="N",
+                    help="run N stub dates concurrently and report CPU per call")
+    args = ap.parse_args(argv)
+
+    if args.concurrent:
+        result = measure_concurrent(args.concurrent)
+        if args.json:
+            json.dump(result, sys.stdout, indent=2)
+            print()
+        else:
+            print(
+                f"{result['dates']} concurrent dates · {result['calls']} calls · "
+                f"{result['cpu_s']:.2f} s CPU ({result['wall_s']:.2f} s wall) · "
+                f"{result['cpu_us_per_call']:.1f} µs CPU per call"
+            )
+        return 0
+
+    current = snapshot(run_suite(args.cases, min_time_s=args.min_time, repeats=args.repeats))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    rows = {r["name"]: r for r in compare(current, baseline, args.threshold)} if baseline else {}
+
+    if args.json:
+        json.dump(dict(current, comparison=list(rows.values()) or None), sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'case':<20} {'median µs':>11} {'best µs':>10} {'loops':>8}" + ("  vs baseline" if rows else ""))
+        for name, case in current["cases"].items():
+            line = f"{name:<20} {case['per_op_us']:>11.2f} {case['best_us']:>10.2f} {case['loops']:>8}"
+            row = rows.get(name)
+            if row is not None:
+                line += "  (new)" if row["ratio"] is None else f"  {row['ratio']:.2f}×"
+                line += "  REGRESSED" if row["regressed"] else ""
+            print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(current, fh, indent=2)
+            fh.write("\n")
+
+    regressed = [r["name"] for r in rows.values() if r["regressed"]]
+    if regressed:
+        print(f"\nFAIL: slower than {args.threshold}× baseline: {', '.join(regressed)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
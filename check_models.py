@@ -6,6 +6,8 @@ This script retrieves all available models from EDSL using the same approach
 as the main application, and prints them in a readable format for debugging.
 
 Run this script to verify what models EDSL is actually returning.
+To compare how listed models actually perform (latency, tokens/s, errors,
+cost per date), use ``python -m benchmarks.model_latency``.
 """
 import json
 import logging
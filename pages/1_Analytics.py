@@ -0,0 +1,14 @@
+# pages/1_Analytics.py
+"""
+Second page of the app (Streamlit lists files in ``pages/`` in the sidebar).
+
+All UI logic lives in *src/ui/analytics.py*.  Logging is configured here
+too, as in ``app.py``: this page may be the first one a session opens.
+"""
+
+from src.utils.logs import setup_logging
+from src.ui.analytics import main
+
+if __name__ == "__main__":
+    setup_logging()
+    main()
@@ -0,0 +1,450 @@
+# src/cli.py
+"""
+Headless command line for *love.dj* sweeps.
+
+    python -m src.cli simulate --pairs pairs.jsonl --workers 8 --out results.jsonl
+
+Each line of ``--pairs`` is one date, as JSON::
+
+    {"id": "p1", "name_a": "Alex", "profile_a": "…", "gender_a": "she/her",
+     "name_b": "Sam", "profile_b": "…", "gender_b": "he/him",
+     "age_a": 28, "age_b": 30, "rounds": 3, "theme": "a rooftop bar",
+     "model_name": "gpt-4o", "service_name": "openai"}
+
+Only the profiles are required; ``id`` defaults to the line number (ids
+must be unique) and ``model_name`` / ``service_name`` / ``rounds`` to the
+command-line options.
+Dates run on ``--workers`` threads using the same step-wise helpers as the
+Streamlit app (`initialize_date` → `get_opening_message` →
+`get_next_response` … → `get_date_ratings`), each in its own session.
+
+Every finished date is appended to ``--out`` straight away, so a crashed
+sweep loses at most the dates in flight.  Ctrl-C stops starting new dates
+and finishes (and writes) the ones in flight; a second Ctrl-C abandons
+them, each stopping before its next model call.  Re-running the same
+command resumes: ids already written successfully are skipped (failed ones
+are retried).  Progress, throughput and ETA go to stderr.
+
+``--store DIR`` also appends every finished date to a `DateStore` (the
+same on-disk store the app writes, read by the analytics page).
+
+``--rate-limits SPEC`` sets per-service request/token budgets for the
+sweep (see `src.models.scheduler`; default ``$LOVEDJ_RATE_LIMITS``), and
+the progress line shows any service that is queueing or being throttled.
+
+``--backend stub`` swaps EDSL for the offline `StubBackend` (sampled
+latency, injected failures) to load-test the whole pipeline for free.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Set, TextIO, Tuple
+
+from src.models.agents import pool_summary
+from src.models.backends import Latency, StubBackend, make_backend, set_backend
+from src.models.simulation import (
+    end_date,
+    get_date_ratings,
+    get_next_response,
+    get_opening_message,
+    get_session,
+    initialize_date,
+)
+from src.models.scheduler import Scheduler, get_scheduler, parse_limits, set_scheduler
+from src.models.store import DateStore, date_record, open_for_append
+from src.utils.logs import setup_logging
+from src.utils.metrics import export_metrics
+
+REQUIRED = ("profile_a", "profile_b")
+PROGRESS_EVERY_S = 1.0
+
+
+# ---------------------------------------------------------------------------#
+#  Input / output                                                            #
+# ---------------------------------------------------------------------------#
+def read_pairs(path: str) -> List[dict]:
+    """
+    Parse the pairs file; ``id`` defaults to the 1-based line number.
+
+    Ids must be unique – they name each date's session and key resume.
+    """
+    pairs = []
+    seen: dict = {}  # id → line it was first used on
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                pair = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{lineno}: invalid JSON ({exc.msg})") from None
+            missing = [k for k in REQUIRED if k not in pair]
+            if missing:
+                raise ValueError(f"{path}:{lineno}: missing {', '.join(missing)}")
+            pair["id"] = str(pair.get("id", lineno))
+            if pair["id"] in seen:
+                raise ValueError(
+                    f"{path}:{lineno}: duplicate id {pair['id']!r} (first on line {seen[pair['id']]})"
+                )
+            seen[pair["id"]] = lineno
+            pairs.append(pair)
+    return pairs
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids already written without an error (a torn last line is ignored)."""
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in record and "id" in record:
+                done.add(str(record["id"]))
+    return done
+
+
+# ---------------------------------------------------------------------------#
+#  One date                                                                  #
+# ---------------------------------------------------------------------------#
+def simulate_pair(
+    pair: dict,
+    *,
+    model_name: str,
+    service_name: Optional[str] = None,
+    rounds: int = 3,
+    rating_samples: int = 1,
+    abandon: Optional[threading.Event] = None,
+) -> dict:
+    """
+    Run one live date for *pair* and return its output record.
+
+    Once *abandon* is set the date raises `CancelledError` before its next
+    model call instead of paying for the rest of the conversation.
+    """
+
+    def check() -> None:
+        if abandon is not None and abandon.is_set():
+            raise CancelledError(f"date {pair['id']!r} abandoned")
+
+    model_name = pair.get("model_name", model_name)
+    service_name = pair.get("service_name", service_name)
+    rounds = int(pair.get("rounds", rounds))
+    session_id = f"cli-{pair['id']}"
+
+    profile_a, profile_b = pair["profile_a"], pair["profile_b"]
+    if "age_a" in pair:
+        profile_a = f"{pair['age_a']} year old {profile_a}"
+    if "age_b" in pair:
+        profile_b = f"{pair['age_b']} year old {profile_b}"
+
+    t0 = time.perf_counter()
+    agent_a, agent_b, disp_a, disp_b = initialize_date(
+        profile_a,
+        profile_b,
+        pair.get("name_a", ""),
+        pair.get("name_b", ""),
+        model_name,
+        pair.get("theme"),
+        service_name,
+        pair.get("gender_a", "she/her"),
+        pair.get("gender_b", "he/him"),
+        rounds,
+        session_id=session_id,
+    )
+    try:
+        session = get_session(session_id)  # its transcript is the output
+        check()
+        _, history = get_opening_message(
+            agent_a, disp_a, model_name, service_name, session_id=session_id
+        )
+        for turn in range(rounds):
+            for speaker, me, other, display in (
+                ("B", agent_b, agent_a, disp_b),
+                ("A", agent_a, agent_b, disp_a),
+            ):
+                check()
+                _, history = get_next_response(
+                    me, other, display, turn, speaker, history,
+                    model_name, service_name, session_id=session_id,
+                )
+
+        check()
+        score_a, score_b = get_date_ratings(
+            agent_a, agent_b, history, model_name, service_name,
+            session_id=session_id, samples=rating_samples,
+        )
+    finally:
+        end_date(session_id)
+
+    return {
+        "id": pair["id"],
+        "date_id": session.date_id,
+        "name_a": disp_a,
+        "name_b": disp_b,
+        "model_name": model_name,
+        "service_name": service_name,
+        "rounds": rounds,
+        "transcript": session.transcript.to_records(),
+        "score_a": score_a,
+        "score_b": score_b,
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
+
+
+# ---------------------------------------------------------------------------#
+#  Progress                                                                  #
+# ---------------------------------------------------------------------------#
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else f"{m}m{s:02d}s" if m else f"{s}s"
+
+
+class Progress:
+    """Throughput / ETA reporter (rate-limited to one line per second)."""
+
+    def __init__(self, total: int, stream: Optional[TextIO] = None) -> None:
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, ok: bool) -> None:
+        self.done += 1
+        self.failed += not ok
+        now = time.perf_counter()
+        if now - self._last >= PROGRESS_EVERY_S or self.done == self.total:
+            self._last = now
+            print(self.line(now), file=self.stream, flush=True)
+
+    def line(self, now: Optional[float] = None) -> str:
+        elapsed = (now or time.perf_counter()) - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        eta = _fmt_duration(remaining / rate) if rate else "?"
+        line = (
+            f"{self.done}/{self.total} dates · {rate:.2f} dates/s · "
+            f"{self.failed} failed · elapsed {_fmt_duration(elapsed)} · ETA {eta}"
+        )
+        limits = get_scheduler().summary()
+        return f"{line} · {limits}" if limits else line
+
+
+# ---------------------------------------------------------------------------#
+#  simulate                                                                  #
+# ---------------------------------------------------------------------------#
+class Interrupt:
+    """
+    Ctrl-C state shared by `_iter_results` and its consumer.
+
+    The first interrupt *drains*: no new date starts, and the ones in flight
+    finish and are still yielded, so the calls already paid for are kept.
+    The second re-raises `KeyboardInterrupt`; the dates still in flight are
+    then abandoned (see `simulate_pair`) and the sweep exits without
+    waiting for them.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.draining = False
+        self.abandon = threading.Event()
+        self.in_flight = 0
+        self.stream = stream or sys.stderr
+
+    def __call__(self) -> None:
+        if self.draining:
+            raise KeyboardInterrupt
+        self.draining = True
+        print(
+            f"\ninterrupted – finishing {self.in_flight} date(s) in flight; "
+            "Ctrl-C again to abandon them",
+            file=self.stream,
+            flush=True,
+        )
+
+
+def _iter_results(
+    pairs: List[dict], workers: int, interrupt: Optional[Interrupt] = None, **options
+) -> Iterator[Tuple[dict, Optional[dict], Optional[BaseException]]]:
+    """Yield ``(pair, record, error)`` as dates finish, *workers* at a time."""
+    interrupt = interrupt or Interrupt()
+    todo = iter(pairs)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lovedj-cli")
+    running = {}
+
+    def submit_next() -> None:
+        pair = None if interrupt.draining else next(todo, None)
+        if pair is not None:
+            future = pool.submit(simulate_pair, pair, abandon=interrupt.abandon, **options)
+            running[future] = pair
+        interrupt.in_flight = len(running)
+
+    try:
+        for _ in range(workers):  # bounded look-ahead: never queue the whole file
+            submit_next()
+        while running:
+            try:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                interrupt()  # drains, or re-raises on the second Ctrl-C
+                continue
+            for future in finished:
+                pair = running.pop(future)
+                submit_next()
+                error = future.exception()
+                yield pair, (None if error else future.result()), error
+    finally:
+        # normally a no-op; when abandoned (or the consumer stops early) the
+        # dates in flight give up at their next call and nothing waits on them
+        interrupt.abandon.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _stored(pair: dict, record: dict) -> dict:
+    """The `DateStore` record for a finished CLI date."""
+    return date_record(
+        transcript=record["transcript"],
+        score_a=record["score_a"],
+        score_b=record["score_b"],
+        model_name=record["model_name"],
+        service_name=record["service_name"],
+        name_a=record["name_a"],
+        name_b=record["name_b"],
+        profile_a=pair["profile_a"],
+        profile_b=pair["profile_b"],
+        gender_a=pair.get("gender_a", "she/her"),
+        gender_b=pair.get("gender_b", "he/him"),
+        theme=pair.get("theme"),
+        rounds=record["rounds"],
+        elapsed_s=record["elapsed_s"],
+        date_id=record["date_id"],
+        source="cli",
+    )
+
+
+def simulate(args: argparse.Namespace) -> int:
+    pairs = read_pairs(args.pairs)
+    done = completed_ids(args.out)
+    todo = [p for p in pairs if p["id"] not in done]
+    skipped = len(pairs) - len(todo)
+    if args.limit is not None:
+        todo = todo[: args.limit]
+    print(
+        f"{len(pairs)} pairs · {skipped} already done · "
+        f"{len(todo)} to run on {args.workers} workers",
+        file=sys.stderr,
+    )
+    if not todo:
+        return 0
+
+    progress = Progress(len(todo))
+    store = DateStore(args.store) if args.store else None
+    interrupt = Interrupt()
+    results = _iter_results(
+        todo,
+        args.workers,
+        interrupt,
+        model_name=args.model,
+        service_name=args.service,
+        rounds=args.rounds,
+        rating_samples=args.rating_samples,
+    )
+    with open_for_append(args.out) as out:
+        try:
+            while True:
+                try:
+                    for pair, record, error in results:
+                        if error is not None:
+                            record = {"id": pair["id"], "error": f"{type(error).__name__}: {error}"}
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        out.flush()  # one complete line per finished date
+                        if store is not None and error is None:
+                            store.append(_stored(pair, record))
+                        progress.update(error is None)
+                    break
+                except KeyboardInterrupt:
+                    interrupt()  # between dates: drain, or abandon on the second
+        except KeyboardInterrupt:
+            results.close()
+            print(f"\nabandoned – {progress.line()}; re-run to resume", file=sys.stderr)
+            return 130
+        finally:
+            export_metrics()  # no-op unless LOVEDJ_METRICS_DIR is set
+            if store is not None:
+                store.close()
+
+    if interrupt.draining:
+        print(f"interrupted – {progress.line()}; re-run to resume", file=sys.stderr)
+        return 130
+    reuse = pool_summary()
+    if reuse:
+        print(f"object reuse – {reuse}", file=sys.stderr)
+    return 1 if progress.failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.cli", description=__doc__.split("\n\n")[0])
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    sim = sub.add_parser("simulate", help="run live dates for every pair in a JSONL file")
+    sim.add_argument("--pairs", required=True, help="input JSONL, one pair per line")
+    sim.add_argument("--out", required=True, help="output JSONL (appended to; resumable)")
+    sim.add_argument("--workers", type=int, default=4, help="dates in flight (default: 4)")
+    sim.add_argument("--model", default="gpt-4o", help="default model (default: gpt-4o)")
+    sim.add_argument("--service", help="default inference service for --model")
+    sim.add_argument("--rounds", type=int, default=3, help="default B/A rounds per date (default: 3)")
+    sim.add_argument("--rating-samples", type=int, default=1, metavar="K",
+                     help="ratings per agent, averaged, asked in the same job (default: 1)")
+    sim.add_argument("--limit", type=int, help="run at most this many remaining pairs")
+    sim.add_argument("--store", metavar="DIR",
+                     help="also append finished dates to this date store (e.g. .lovedj_dates)")
+    sim.add_argument("--rate-limits", metavar="SPEC",
+                     help='per-service budgets, e.g. "openai:rpm=500,tpm=150000;anthropic:rpm=50" '
+                          "(default: $LOVEDJ_RATE_LIMITS)")
+    sim.add_argument("--backend", choices=("edsl", "stub"),
+                     help="answer source (default: $LOVEDJ_BACKEND or edsl)")
+    sim.add_argument("--stub-latency", type=float, default=0.0, metavar="S",
+                     help="stub: median seconds per call, log-normal tail (default: 0)")
+    sim.add_argument("--stub-failure-rate", type=float, default=0.0, metavar="P",
+                     help="stub: probability that a call fails (default: 0)")
+    sim.set_defaults(func=simulate)
+
+    args = ap.parse_args(argv)
+    if getattr(args, "workers", 1) < 1:
+        ap.error("--workers must be >= 1")
+    if getattr(args, "rating_samples", 1) < 1:
+        ap.error("--rating-samples must be >= 1")
+    setup_logging()  # queued JSON log with rotation, as in the app
+    try:
+        if getattr(args, "rate_limits", None):
+            set_scheduler(Scheduler(parse_limits(args.rate_limits)))
+        if getattr(args, "backend", None) == "stub":
+            set_backend(
+                StubBackend(
+                    latency=Latency("lognormal", median_s=args.stub_latency),
+                    failure_rate=args.stub_failure_rate,
+                )
+            )
+        elif getattr(args, "backend", None) == "edsl":
+            set_backend(make_backend("edsl"))  # explicit, ignoring $LOVEDJ_BACKEND
+        return args.func(args)
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,21 +5,77 @@ Agent helpers and prompting logic for *love.dj*.
 Public API
 ----------
 create_agent(...)    → returns an EDSL Agent with persona + guidelines
+get_agent(...)       → same, but interned: one Agent per distinct persona
 get_opener(...)      → first line of the date
 get_response(...)    → subsequent replies
 get_rating(...)      → 1-10 score from the agent at the end
+evaluate_date(...)   → every rater's score (+ optional debrief, K samples) in one batched job
+get_summary(...)     → short neutral recap used by the rolling-summary context
+
+pool_stats()         → reuse counters for the Model/Agent pools
+pool_summary()       → the same as one line (for logs and the CLI)
+
+Questions go to the active backend from `src.models.backends` – EDSL by
+default, or the offline stub (``LOVEDJ_BACKEND=stub``) for load tests.
+Answers are memoised in the on-disk cache from `src.models.cache`; pass
+``use_cache=False`` (or set ``LOVEDJ_CACHE=off``) to always hit the model.
+`Model` and `Agent` objects are interned in the pools from `src.models.pool`.
+Each call is timed and its token usage recorded by `src.utils.metrics`, and
+waits for its service's budget in `src.models.scheduler`.  Replies can be
+hedged against slow responses (`src.models.hedging`).
 """
 
-from edsl import (
-    Agent,
-    Model,
-    Scenario,
-    QuestionFreeText,
-    QuestionLinearScale,
-)
+from __future__ import annotations
+
+import functools
+import hashlib
+from typing import TYPE_CHECKING, Sequence
+
+# `edsl` is imported by the backend on first use: it costs seconds at import
+# time and the UI must be able to render before the first model call.
+if TYPE_CHECKING:  # pragma: no cover
+    from edsl import Agent
 
 # Prompt text is centralised in src/prompts/date.py
-from src.prompts.date import GUIDELINES, OPENING_PROMPT, RESPONSE_PROMPT, RATING_PROMPT
+from src.prompts.date import (
+    GUIDELINES,
+    OPENING_PROMPT,
+    RESPONSE_PROMPT,
+    RATING_PROMPT,
+    RATIONALE_PROMPT,
+    SEE_AGAIN_PROMPT,
+    SUMMARY_PROMPT,
+)
+from src.models.backends import QuestionSpec, get_backend
+from src.models.context import ContextPolicy, estimate_tokens, split_turns
+from src.models.cache import get_cache, make_key
+from src.models.hedging import get_hedger
+from src.models.pool import ObjectPool
+from src.models.ratings import estimate_ratings, majority
+from src.models.scheduler import get_scheduler
+from src.prompts.templates import PROMPT_VERSION, compile_prompt
+from src.utils.metrics import track_call
+
+MAX_POOLED_AGENTS = 1024  # distinct personas kept (least recently used dropped)
+_AGENT_POOL = ObjectPool("agents", max_size=MAX_POOLED_AGENTS)
+EXPECTED_COMPLETION_TOKENS = 150  # per answer, charged up front to token budgets
+
+RATING_QUESTION = QuestionSpec(
+    "rating",
+    RATING_PROMPT,
+    type="linear_scale",
+    options=tuple(range(1, 11)),  # 1-10 inclusive
+    labels=((1, "Terrible"), (10, "Amazing")),
+)
+DEBRIEF_QUESTIONS = (
+    QuestionSpec("see_again", SEE_AGAIN_PROMPT, type="yes_no"),
+    QuestionSpec("rationale", RATIONALE_PROMPT),
+)
+OPENER_QUESTION = QuestionSpec("opener", OPENING_PROMPT)
+# One reply question for every turn, so the backend can reuse its question
+# object; the turn/speaker only matter to the transcript, not the prompt.
+TURN_QUESTION = QuestionSpec("turn", RESPONSE_PROMPT)
+SUMMARY_QUESTION = QuestionSpec("summary", SUMMARY_PROMPT)
 
 # ---------------------------------------------------------------------------#
 #  Default personas (used when the user leaves the profile box empty)        #
@@ -41,45 +97,197 @@ DEFAULT_PROFILES = {
 #  Public helpers                                                            #
 # ---------------------------------------------------------------------------#
 def create_agent(name: str, profile: str, default_profile: str) -> Agent:
-    """Return an EDSL Agent with persona + conversation guidelines."""
-    return Agent(
-        name=name,
-        traits={
+    """Return an Agent (EDSL's, or the stub's) with persona + conversation guidelines."""
+    return get_backend().make_agent(
+        name,
+        {
             "persona": profile or default_profile,
             "guidelines": GUIDELINES,
         },
     )
 
 
+def get_agent(
+    name: str,
+    persona: str,
+    *,
+    gender: str | None = None,
+    guidelines: str = GUIDELINES,
+) -> Agent:
+    """
+    Return the process-wide Agent for this exact name/persona/guidelines.
+
+    The returned object is shared – treat its traits as read-only.
+    """
+    backend = get_backend()
+
+    def build() -> Agent:
+        traits = {"persona": persona, "guidelines": guidelines}
+        if gender is not None:
+            traits["gender"] = gender
+        return backend.make_agent(name, traits)
+
+    digest = hashlib.sha256(
+        "\x1f".join((backend.name, name, persona, guidelines, gender or "")).encode("utf-8")
+    ).hexdigest()
+    return _AGENT_POOL.get(digest, build)
+
+
+def pool_stats() -> dict:
+    """Objects built, reuses and construction seconds saved, per pool."""
+    pools = [_AGENT_POOL]
+    models = getattr(get_backend(), "models", None)  # EDSLBackend's Model pool
+    if models is not None:
+        pools.insert(0, models)
+    return {p.name: p.stats() for p in pools}
+
+
+def pool_summary() -> str:
+    """One line per pool that has been used: builds, reuses and seconds saved."""
+    parts = []
+    for name, s in pool_stats().items():
+        if s["builds"] or s["hits"]:
+            parts.append(
+                f"{name}: {s['builds']} built, {s['hits']} reused, "
+                f"{s['saved_s']:.2f}s construction saved"
+            )
+    return "; ".join(parts)
+
+
 # ---------------------------------------------------------------------------#
 #  Turn helpers                                                              #
 # ---------------------------------------------------------------------------#
-def _build_model(model_name: str, service_name: str | None) -> Model:
-    return (
-        Model(model_name, service_name=service_name)
-        if service_name
-        else Model(model_name)
+def _backend_part() -> dict:
+    """Extra cache-key part so non-EDSL answers never mix with real ones."""
+    name = get_backend().name
+    return {} if name == "edsl" else {"backend": name}
+
+
+def _tokens_for(questions: Sequence[QuestionSpec], scenario_fields: dict) -> int:
+    """Rough tokens for one answer to each of *questions* (for the rate limiter)."""
+    return sum(
+        estimate_tokens(compile_prompt(q.text).render(scenario_fields)) + EXPECTED_COMPLETION_TOKENS
+        for q in questions
     )
 
 
+def _ask(question: QuestionSpec, scenario_fields: dict, agent, model_name, service_name):
+    """One question through the active backend, within the service's rate limits."""
+    with get_scheduler().slot(
+        model_name, service_name,
+        tokens=lambda: _tokens_for((question,), scenario_fields),
+    ):
+        return get_backend().ask(
+            question, scenario_fields, agent=agent,
+            model_name=model_name, service_name=service_name,
+        )
+
+
+@functools.lru_cache(maxsize=4096)
+def _static_digest(kind, model_name, service_name, question_text, static, traits, backend) -> str:
+    """Digest of the key parts that stay fixed for a whole date (memoised)."""
+    parts = dict(
+        kind=kind,
+        model=model_name,
+        service=service_name,
+        question=question_text,
+        scenario=dict(static),
+        traits=dict(traits),
+        version=PROMPT_VERSION,
+    )
+    if backend != "edsl":
+        parts["backend"] = backend
+    return make_key(**parts)
+
+
+def _cache_key(
+    kind: str,
+    model_name: str,
+    service_name: str | None,
+    question_text: str,
+    scenario_fields: dict,
+    agent: Agent | None,
+    dynamic: tuple = (),
+) -> str:
+    """Response-cache key; see `_cached()` for the role of *dynamic*."""
+    traits = dict(agent.traits) if agent is not None else {}
+    if not dynamic:
+        return make_key(
+            kind=kind,
+            model=model_name,
+            service=service_name,
+            question=question_text,
+            scenario=scenario_fields,
+            traits=traits,
+            **_backend_part(),
+        )
+    prefix = _static_digest(
+        kind, model_name, service_name, question_text,
+        tuple(sorted((k, v) for k, v in scenario_fields.items() if k not in dynamic)),
+        tuple(sorted(traits.items())),
+        get_backend().name,
+    )
+    blob = "\x1f".join([prefix] + [str(scenario_fields[k]) for k in dynamic])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _cached(
+    kind: str,
+    model_name: str,
+    service_name: str | None,
+    question_text: str,
+    scenario_fields: dict,
+    agent: Agent | None,
+    use_cache: bool,
+    compute,
+    *,
+    dynamic: tuple = (),
+):
+    """
+    Serve *compute()* from the response cache when the inputs match.
+
+    Scenario fields named in *dynamic* change every turn; everything else
+    (prompt, personas, traits) is digested once per date and reused, so a
+    turn only hashes the fields that actually changed.
+
+    Every call – hit or miss – is timed and recorded in the telemetry.
+    """
+    with track_call(kind, model_name, service_name) as rec:
+        if not use_cache:
+            return compute()
+
+        def miss():
+            rec.cache_hit = False
+            return compute()
+
+        rec.cache_hit = True
+        key = _cache_key(
+            kind, model_name, service_name, question_text, scenario_fields, agent, dynamic
+        )
+        return get_cache().get_or_compute(key, miss)
+
+
 def get_opener(
-    model_name: str, agent: Agent, *, service_name: str | None = None
+    model_name: str,
+    agent: Agent,
+    *,
+    service_name: str | None = None,
+    use_cache: bool = True,
 ) -> str:
     """First message on the date."""
-    model = _build_model(model_name, service_name)
-
     scenario_fields = {"persona": agent.traits["persona"]}
     if "gender" in agent.traits:
         scenario_fields["gender"] = agent.traits["gender"]
 
-    return (
-        QuestionFreeText("opener", OPENING_PROMPT)
-        .by(model)
-        .by(agent)
-        .by(Scenario(scenario_fields))
-        .run()
-        .select("opener")
-        .first()
+    def ask() -> str:
+        return _ask(
+            OPENER_QUESTION,
+            scenario_fields, agent, model_name, service_name,
+        )
+
+    return _cached(
+        "opener", model_name, service_name, OPENING_PROMPT,
+        scenario_fields, agent, use_cache, ask,
     )
 
 
@@ -92,9 +300,20 @@ def get_response(
     history_txt: str,
     *,
     service_name: str | None = None,
+    use_cache: bool = True,
+    context_policy: ContextPolicy | None = None,
+    summary: str = "",
 ) -> str:
-    """Generate the next reply given the conversation so far."""
-    model = _build_model(model_name, service_name)
+    """
+    Generate the next reply given the conversation so far.
+
+    With a *context_policy* only part of *history_txt* (plus an optional
+    rolling *summary*) is sent; by default the whole history goes out.
+    With hedging on, a reply slower than the model's recent p95 is also
+    requested from an equivalent model (see `src.models.hedging`).
+    """
+    if context_policy is not None:
+        history_txt = context_policy.render(split_turns(history_txt), summary)
 
     scenario_fields = {
         "chat": history_txt.strip(),
@@ -104,14 +323,15 @@ def get_response(
         "partner_gender": agent_other.traits.get("gender", "she/her"),
     }
 
-    return (
-        QuestionFreeText(f"turn_{turn}_{speaker}", RESPONSE_PROMPT)
-        .by(model)
-        .by(agent_self)
-        .by(Scenario(scenario_fields))
-        .run()
-        .select(f"turn_{turn}_{speaker}")
-        .first()
+    def ask() -> str:
+        return get_hedger().call(
+            model_name, service_name,
+            lambda model, service: _ask(TURN_QUESTION, scenario_fields, agent_self, model, service),
+        )
+
+    return _cached(
+        "response", model_name, service_name, RESPONSE_PROMPT,
+        scenario_fields, agent_self, use_cache, ask, dynamic=("chat",),
     )
 
 
@@ -121,30 +341,166 @@ def get_rating(
     history_txt: str,
     *,
     service_name: str | None = None,
+    use_cache: bool = True,
 ) -> int:
     """Ask the agent to rate the date on a 1-10 scale."""
-    model = _build_model(model_name, service_name)
-
-    result = (
-        QuestionLinearScale(
-            question_name="rating",
-            question_text=RATING_PROMPT,
-            question_options=list(range(1, 11)),  # 1-10 inclusive
-            option_labels={1: "Terrible", 10: "Amazing"},
+    scenario_fields = {"history": history_txt}
+
+    def ask() -> int | None:
+        return _parse_rating(
+            _ask(RATING_QUESTION, scenario_fields, agent, model_name, service_name)
         )
-        .by(model)
-        .by(agent)
-        .by(Scenario({"history": history_txt}))
-        .run()
-        .select("rating")
-        .first()
+
+    score = _cached(
+        "rating", model_name, service_name, RATING_PROMPT,
+        scenario_fields, agent, use_cache, ask,
     )
+    return 5 if score is None else score  # default midpoint (never cached)
+
 
-    # Robust parsing to ensure we always return an int 1-10
+def _parse_rating(result) -> int | None:
+    """Robust parsing so a rating is always an int 1-10 (or None)."""
     try:
         return int(result)  # type: ignore[arg-type]
     except Exception:
         import re
 
         numbers = re.findall(r"\d+", str(result) if result is not None else "")
-        return int(numbers[0]) if numbers else 5  # default midpoint
+        return int(numbers[0]) if numbers else None
+
+
+def _parse_yes_no(answer) -> bool | None:
+    return None if answer is None else str(answer).strip().lower() == "yes"
+
+
+def evaluate_date(
+    model_name: str,
+    agents: Sequence[Agent],
+    history_txt: str,
+    *,
+    service_name: str | None = None,
+    use_cache: bool = True,
+    debrief: bool = False,
+    samples: int = 1,
+) -> list[dict]:
+    """
+    Post-date evaluation for every agent in **one** backend job.
+
+    The rating (and, with *debrief*, "see them again?" + a short rationale)
+    is asked as a single survey run over all agents (an EDSL `AgentList`
+    on the default backend), so both raters are
+    answered in parallel by one job instead of one sequential job each.
+
+    Returns one dict per agent, in order: ``{"rating": int}`` plus
+    ``"see_again"`` (bool | None) and ``"rationale"`` (str | None) when
+    *debrief* is set.  Unparseable ratings fall back to 5 (never cached).
+
+    With ``samples=K`` every agent answers K times inside the same job
+    (EDSL ``run(n=K)``): ``rating`` becomes the mean of the parseable
+    samples, ``rating_estimate`` adds variance and a 95 % interval (see
+    `src.models.ratings`), and ``see_again`` is the majority vote.
+    """
+    if samples < 1:
+        raise ValueError("samples must be >= 1")
+    questions = [RATING_QUESTION] + (list(DEBRIEF_QUESTIONS) if debrief else [])
+    scenario_fields = {"history": history_txt}
+
+    keys = [
+        make_key(
+            kind="evaluation",
+            model=model_name,
+            service=service_name,
+            question="\x1f".join(q.text for q in questions),
+            scenario=scenario_fields,
+            traits=dict(agent.traits),
+            **_backend_part(),
+            **({"samples": samples} if samples > 1 else {}),
+        )
+        for agent in agents
+    ]
+
+    def ask(batch: Sequence[Agent]) -> list[dict]:
+        backend = get_backend()
+        calls = len(batch) * samples  # interviews; each asks every question
+        with get_scheduler().slot(
+            model_name, service_name,
+            requests=calls * len(questions),
+            tokens=lambda: calls * _tokens_for(questions, scenario_fields),
+        ):
+            if samples == 1:
+                answers = [
+                    [answer] for answer in backend.ask_survey(
+                        questions, scenario_fields, agents=batch,
+                        model_name=model_name, service_name=service_name,
+                    )
+                ]
+            else:
+                answers = backend.ask_samples(
+                    questions, scenario_fields, agents=batch, samples=samples,
+                    model_name=model_name, service_name=service_name,
+                )
+        ratings = [[_parse_rating(a.get("rating")) for a in rows] for rows in answers]
+        estimates = estimate_ratings(ratings) if samples > 1 else None
+        out = []
+        for i, rows in enumerate(answers):
+            if estimates is None:
+                evaluation = {"rating": ratings[i][0]}
+            else:
+                evaluation = {
+                    "rating": estimates[i].mean,
+                    "rating_estimate": estimates[i].as_dict(),
+                }
+            if debrief:
+                votes = [_parse_yes_no(a.get("see_again")) for a in rows]
+                evaluation["see_again"] = votes[0] if samples == 1 else majority(votes)
+                evaluation["rationale"] = next(
+                    (a["rationale"] for a in rows if a.get("rationale")),
+                    rows[0].get("rationale"),
+                )
+            out.append(evaluation)
+        return out
+
+    cache = get_cache()
+    evaluations: list = [None] * len(agents)
+    with track_call("evaluation", model_name, service_name) as rec:
+        todo = []
+        for i, key in enumerate(keys):
+            hit, value = cache.get(key) if use_cache else (False, None)
+            if hit:
+                evaluations[i] = value
+            else:
+                todo.append(i)
+        rec.cache_hit = not todo
+        if todo:
+            fresh = ask([agents[i] for i in todo])
+            for i, evaluation in zip(todo, fresh):
+                evaluations[i] = evaluation
+                if use_cache and evaluation["rating"] is not None:
+                    cache.set(keys[i], evaluation)
+
+    return [
+        dict(e, rating=5) if e["rating"] is None else e  # default midpoint
+        for e in evaluations
+    ]
+
+
+def get_summary(
+    model_name: str,
+    history_txt: str,
+    *,
+    service_name: str | None = None,
+    use_cache: bool = True,
+) -> str:
+    """Condense part of the conversation for the rolling-summary context."""
+    scenario_fields = {"history": history_txt.strip()}
+
+    def ask() -> str:
+        return _ask(
+            SUMMARY_QUESTION,
+            scenario_fields, None, model_name, service_name,
+        )
+
+    return _cached(
+        "summary", model_name, service_name, SUMMARY_PROMPT,
+        scenario_fields, None, use_cache, ask,
+    )
@@ -0,0 +1,471 @@
+# src/models/backends.py
+"""
+LLM backends behind the helpers in `src.models.agents`.
+
+A backend turns question specs plus scenario fields into answers.  Every
+cache, telemetry, context and concurrency layer sits *above* it, so
+swapping the backend changes where answers come from and nothing else:
+
+• `EDSLBackend` – the default; runs real EDSL jobs (``Model`` × ``Agent`` ×
+  ``Scenario``) and reports token usage to `src.utils.metrics`.
+• `StubBackend` – local and deterministic: templated replies, seeded
+  ratings, sampled latency and injected failures.  No network, no EDSL,
+  so the real turn loop can be load-tested at full speed.
+
+Public API
+----------
+QuestionSpec           → backend-neutral description of one question
+Backend                → the protocol both implementations follow
+Latency                → latency distribution for the stub
+get_backend()          → process-wide backend (``LOVEDJ_BACKEND``)
+set_backend(backend)   → swap it (returns the previous one)
+make_backend(name,…)   → build one by name ("edsl" / "stub")
+
+Environment
+-----------
+LOVEDJ_BACKEND=stub    use `StubBackend()` with its defaults
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Protocol, Sequence, Union
+
+from src.models.context import estimate_tokens
+from src.models.pool import ObjectPool
+from src.prompts.templates import PROMPT_VERSION, compile_prompt
+from src.utils.metrics import record_usage
+
+
+class BackendError(RuntimeError):
+    """A (real or injected) failure of the model provider."""
+
+
+@dataclass(frozen=True)
+class QuestionSpec:
+    """One question, independent of how a backend asks it."""
+
+    name: str
+    text: str
+    type: str = "free_text"  # "free_text" | "linear_scale" | "yes_no"
+    options: tuple = ()
+    labels: tuple = ()  # ((option, label), …) – a tuple keeps the spec hashable
+
+
+class Backend(Protocol):
+    name: str
+
+    def make_agent(self, name: str, traits: dict) -> Any:
+        """Build the backend's agent object (exposes ``.name`` / ``.traits``)."""
+
+    def ask(
+        self,
+        question: QuestionSpec,
+        scenario_fields: dict,
+        *,
+        agent: Any = None,
+        model_name: str,
+        service_name: Optional[str] = None,
+    ) -> Any:
+        """Answer one question as *agent* (or as no one)."""
+
+    def ask_survey(
+        self,
+        questions: Sequence[QuestionSpec],
+        scenario_fields: dict,
+        *,
+        agents: Sequence[Any],
+        model_name: str,
+        service_name: Optional[str] = None,
+    ) -> list:
+        """Answer every question for every agent in one job; answer dicts in *agents* order."""
+
+    def ask_samples(
+        self,
+        questions: Sequence[QuestionSpec],
+        scenario_fields: dict,
+        *,
+        agents: Sequence[Any],
+        samples: int,
+        model_name: str,
+        service_name: Optional[str] = None,
+    ) -> list:
+        """Like `ask_survey`, but *samples* independent answer dicts per agent (a list each)."""
+
+
+# ---------------------------------------------------------------------------#
+#  EDSL                                                                      #
+# ---------------------------------------------------------------------------#
+_USAGE_COLUMNS = (
+    ("prompt_tokens", "input_tokens"),
+    ("completion_tokens", "output_tokens"),
+    ("cost_usd", "cost"),
+)
+
+
+class EDSLBackend:
+    """Real model calls through EDSL (imported on first use)."""
+
+    name = "edsl"
+
+    def __init__(self) -> None:
+        self.models = ObjectPool("models")
+        self.questions = ObjectPool("questions")
+
+    def make_agent(self, name: str, traits: dict) -> Any:
+        from edsl import Agent
+
+        return Agent(name=name, traits=traits)
+
+    def model(self, model_name: str, service_name: Optional[str]) -> Any:
+        def build():
+            from edsl import Model
+
+            return (
+                Model(model_name, service_name=service_name)
+                if service_name
+                else Model(model_name)
+            )
+
+        return self.models.get((model_name, service_name), build)
+
+    def question(self, spec: QuestionSpec) -> Any:
+        """The EDSL question for *spec*, built once per prompt version."""
+        return self.questions.get((PROMPT_VERSION, spec), lambda: self._build_question(spec))
+
+    @staticmethod
+    def _build_question(spec: QuestionSpec) -> Any:
+        import edsl
+
+        if spec.type == "linear_scale":
+            return edsl.QuestionLinearScale(
+                question_name=spec.name,
+                question_text=spec.text,
+                question_options=list(spec.options),
+                option_labels=dict(spec.labels),
+            )
+        if spec.type == "yes_no":
+            return edsl.QuestionYesNo(question_name=spec.name, question_text=spec.text)
+        return edsl.QuestionFreeText(question_name=spec.name, question_text=spec.text)
+
+    def ask(self, question, scenario_fields, *, agent=None, model_name, service_name=None):
+        from edsl import Scenario
+
+        job = self.question(question).by(self.model(model_name, service_name))
+        if agent is not None:
+            job = job.by(agent)
+        results = job.by(Scenario(scenario_fields)).run()
+        record_usage(**self._usage_of(results, question.name))
+        return results.select(question.name).first()
+
+    def ask_survey(self, questions, scenario_fields, *, agents, model_name, service_name=None):
+        rows = self.ask_samples(
+            questions, scenario_fields, agents=agents, samples=1,
+            model_name=model_name, service_name=service_name,
+        )
+        return [answers[0] for answers in rows]
+
+    def ask_samples(
+        self, questions, scenario_fields, *, agents, samples, model_name, service_name=None
+    ):
+        from edsl import AgentList, Scenario, Survey
+
+        job = (
+            Survey([self.question(q) for q in questions])
+            .by(Scenario(scenario_fields))
+            .by(AgentList(list(agents)))
+            .by(self.model(model_name, service_name))
+        )
+        # n > 1: EDSL runs the K iterations of every interview inside this one job
+        results = job.run(n=samples) if samples > 1 else job.run()
+
+        usage: dict = {}
+        answers = []
+        for rows in self._rows_by_agent(results, agents, samples):
+            mine = []
+            for row in rows:
+                raw = getattr(row, "raw_model_response", None) or {}
+                for field_, column in _USAGE_COLUMNS:
+                    for q in questions:
+                        value = raw.get(f"{q.name}_{column}")
+                        if value is not None:
+                            usage[field_] = usage.get(field_, 0) + (
+                                float(value) if field_ == "cost_usd" else int(value)
+                            )
+                mine.append(dict(getattr(row, "answer", None) or {}))
+            answers.append(mine)
+        record_usage(**usage)
+        return answers
+
+    @staticmethod
+    def _usage_of(results, question_name: str) -> dict:
+        """Token counts / cost EDSL reports for *question_name*, where available."""
+        usage = {}
+        for field_, column in _USAGE_COLUMNS:
+            try:
+                value = results.select(f"raw_model_response.{question_name}_{column}").first()
+            except Exception:  # column absent in this EDSL version
+                value = None
+            if value is not None:
+                usage[field_] = float(value) if field_ == "cost_usd" else int(value)
+        return usage
+
+    @staticmethod
+    def _rows_by_agent(results, agents: Sequence[Any], per_agent: int = 1) -> list:
+        """*per_agent* `Result`s per agent, in *agents* order (positional if unmatched)."""
+        rows = list(results)
+        taken = set()
+        grouped = []
+        for agent in agents:
+            mine = [
+                i for i, r in enumerate(rows)
+                if i not in taken and getattr(r, "agent", None) == agent
+            ][:per_agent]
+            taken.update(mine)
+            grouped.append([rows[i] for i in mine])
+        if any(len(group) != per_agent for group in grouped):
+            rows += [None] * (len(agents) * per_agent - len(rows))
+            grouped = [rows[i * per_agent:(i + 1) * per_agent] for i in range(len(agents))]
+        return grouped
+
+
+# ---------------------------------------------------------------------------#
+#  Stub                                                                      #
+# ---------------------------------------------------------------------------#
+@dataclass(frozen=True)
+class Latency:
+    """
+    Per-job latency distribution, in seconds.
+
+    ``fixed``      always *median_s*
+    ``uniform``    between *min_s* and *max_s*
+    ``lognormal``  median *median_s*, shape *sigma* (a realistic long tail),
+                   clipped to [*min_s*, *max_s*]
+    """
+
+    dist: str = "fixed"
+    median_s: float = 0.0
+    sigma: float = 0.5
+    min_s: float = 0.0
+    max_s: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.dist not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"unknown latency distribution {self.dist!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.dist == "fixed":
+            value = self.median_s
+        elif self.dist == "uniform":
+            value = rng.uniform(self.min_s, self.max_s if self.max_s is not None else self.median_s * 2)
+        else:
+            value = self.median_s * math.exp(rng.gauss(0.0, self.sigma)) if self.median_s else 0.0
+        value = max(self.min_s, value)
+        return min(value, self.max_s) if self.max_s is not None else value
+
+
+Reply = Union[str, Sequence[str], Callable[[QuestionSpec, dict], str]]
+
+DEFAULT_STUB_REPLIES: Dict[str, Reply] = {
+    "opener": "Hi! I'm {agent_name} – this place smells of fresh coffee. What brings you here?",
+    "turn": (
+        "That's lovely – it reminds me of something I did last spring. What about you?",
+        "Ha, I did not expect that! *laughs* The music here is louder than I thought.",
+        "I know exactly what you mean. I spent most of last weekend doing the same.",
+        "Really? Tell me more – I've always wanted to try that.",
+    ),
+    "summary": "They traded small stories and seem at ease; nothing is planned yet.",
+    "rationale": "It felt easy and warm, with a few genuinely funny moments.",
+}
+
+
+class _Fields(dict):
+    def __missing__(self, key: str) -> str:  # unknown placeholders stay visible
+        return "{" + key + "}"
+
+
+class StubAgent:
+    """Minimal agent for the stub backend (``.name`` + ``.traits``)."""
+
+    __slots__ = ("name", "traits")
+
+    def __init__(self, name: str, traits: dict) -> None:
+        self.name = name
+        self.traits = dict(traits)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, StubAgent)
+            and (self.name, self.traits) == (other.name, other.traits)
+        )
+
+    __hash__ = None  # mutable traits
+
+    def __repr__(self) -> str:
+        return f"StubAgent({self.name!r})"
+
+
+class StubBackend:
+    """
+    Offline backend with deterministic answers and simulated cost.
+
+    *replies* maps a question name (``opener``, ``turn``, ``summary``,
+    ``rationale``; anything else uses ``turn``) to a template – formatted with the scenario fields plus
+    ``agent_name`` / ``question`` – to a sequence of templates (one is
+    picked per answer), or to a callable ``(spec, fields)``.
+    Ratings are drawn uniformly from *rating_range*; "see them again?" is
+    yes when the rating is above the midpoint.  Answers depend only on
+    *seed* and the inputs, never on thread scheduling.
+
+    Each job sleeps one *latency* sample and fails with *failure_rate*
+    probability (raising `BackendError`).  Token usage is estimated from
+    the prompt and answer sizes.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        *,
+        replies: Optional[Mapping[str, Reply]] = None,
+        latency: Latency = Latency(),
+        failure_rate: float = 0.0,
+        rating_range: tuple = (4, 9),
+        seed: int = 0,
+    ) -> None:
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError("failure_rate must be within [0, 1]")
+        self.replies = {**DEFAULT_STUB_REPLIES, **(replies or {})}
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rating_range = rating_range
+        self.seed = seed
+        self.jobs = 0
+        self.failures = 0
+        self._timing = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def make_agent(self, name: str, traits: dict) -> StubAgent:
+        return StubAgent(name, traits)
+
+    def ask(self, question, scenario_fields, *, agent=None, model_name, service_name=None):
+        answers = self.ask_survey(
+            [question], scenario_fields, agents=[agent],
+            model_name=model_name, service_name=service_name,
+        )
+        return answers[0][question.name]
+
+    def ask_survey(self, questions, scenario_fields, *, agents, model_name, service_name=None):
+        rows = self.ask_samples(
+            questions, scenario_fields, agents=agents, samples=1,
+            model_name=model_name, service_name=service_name,
+        )
+        return [answers[0] for answers in rows]
+
+    def ask_samples(
+        self, questions, scenario_fields, *, agents, samples, model_name, service_name=None
+    ):
+        with self._lock:  # timing/failures: one seeded stream for the process
+            delay = self.latency.sample(self._timing)
+            failed = self._timing.random() < self.failure_rate
+            self.jobs += 1
+            self.failures += failed
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise BackendError(f"stub: injected failure ({model_name})")
+
+        prompt_tokens = completion_tokens = 0
+        prompts = [compile_prompt(q.text) for q in questions]
+        answers = []
+        for agent in agents:
+            mine = []
+            for sample in range(samples):
+                rng = self._rng(model_name, agent, questions, scenario_fields, sample)
+                row: Dict[str, Any] = {}
+                for q, prompt in zip(questions, prompts):
+                    row[q.name] = self._answer(q, scenario_fields, agent, rng, row)
+                    prompt_tokens += estimate_tokens(prompt.render(scenario_fields))
+                    completion_tokens += estimate_tokens(str(row[q.name]))
+                mine.append(row)
+            answers.append(mine)
+        record_usage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return answers
+
+    def _rng(
+        self, model_name: str, agent: Any, questions, fields: dict, sample: int = 0
+    ) -> random.Random:
+        """Answer RNG seeded from the inputs only (not from thread scheduling)."""
+        traits = getattr(agent, "traits", None) or {}
+        parts = [str(self.seed), model_name, getattr(agent, "name", "") or "",
+                 str(traits.get("persona", ""))]
+        parts += [q.name for q in questions]
+        parts += [f"{k}={fields[k]}" for k in sorted(fields)]
+        if sample:  # sample 0 answers exactly as a plain `ask_survey`
+            parts.append(f"#sample={sample}")
+        digest = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).digest()
+        return random.Random(int.from_bytes(digest, "big"))
+
+    def _answer(self, q: QuestionSpec, fields: dict, agent: Any, rng: random.Random, row: dict):
+        if q.type == "linear_scale":
+            lo, hi = self.rating_range
+            options = [o for o in q.options if lo <= o <= hi] or list(q.options)
+            return rng.choice(options)
+        if q.type == "yes_no":
+            rating = row.get("rating")
+            if isinstance(rating, int):
+                return "Yes" if rating > sum(self.rating_range) / 2 else "No"
+            return rng.choice(["Yes", "No"])
+
+        template = self.replies.get(q.name, self.replies["turn"])
+        if callable(template):
+            return template(q, fields)
+        if not isinstance(template, str):  # several canned lines: pick one
+            template = rng.choice(list(template))
+        return template.format_map(
+            _Fields(fields, agent_name=getattr(agent, "name", "") or "", question=q.name)
+        )
+
+
+# ---------------------------------------------------------------------------#
+#  Process-wide selection                                                    #
+# ---------------------------------------------------------------------------#
+_BACKENDS = {"edsl": EDSLBackend, "stub": StubBackend}
+_BACKEND: Optional[Backend] = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def make_backend(name: str, **options: Any) -> Backend:
+    """Build a backend by name; *options* go to its constructor."""
+    try:
+        return _BACKENDS[name](**options)
+    except KeyError:
+        raise ValueError(f"unknown backend {name!r} (choose from {sorted(_BACKENDS)})") from None
+
+
+def get_backend() -> Backend:
+    """The shared backend, built from ``LOVEDJ_BACKEND`` on first use."""
+    global _BACKEND
+    if _BACKEND is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                _BACKEND = make_backend(os.environ.get("LOVEDJ_BACKEND", "edsl").lower())
+    return _BACKEND
+
+
+def set_backend(backend: Optional[Backend]) -> Optional[Backend]:
+    """
+    Install *backend* process-wide and return the one it replaced.
+
+    ``None`` resets to the ``LOVEDJ_BACKEND`` default on next use.
+    """
+    global _BACKEND
+    with _BACKEND_LOCK:
+        previous, _BACKEND = _BACKEND, backend
+    return previous
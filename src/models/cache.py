@@ -0,0 +1,225 @@
+# src/models/cache.py
+"""
+Persistent, content-addressed cache for EDSL answers.
+
+Every opener / reply / rating is keyed on the exact inputs that produce it
+(model, service, question text, scenario fields, agent traits), so an
+identical request – a sweep rerun, or a Streamlit rerun with the default
+personas – is answered from a local SQLite file instead of the provider.
+
+Public API
+----------
+make_key(**parts)     → stable SHA-256 hex digest of the inputs
+ResponseCache(...)    → SQLite-backed store with size/age eviction + counters
+get_cache()           → process-wide cache configured from the environment
+set_cache(cache)      → swap it (returns the previous one)
+
+Environment
+-----------
+LOVEDJ_CACHE_PATH     location of the SQLite file (default ``.lovedj_cache.sqlite3``)
+LOVEDJ_CACHE=off      bypass the cache entirely (reads *and* writes)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+DEFAULT_CACHE_PATH = ".lovedj_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MAX_AGE_S = 30 * 24 * 3600  # 30 days
+_EVICT_EVERY = 256  # writes between eviction sweeps
+
+_MISSING = object()
+
+
+def make_key(**parts: Any) -> str:
+    """Hash the keyword arguments into a stable cache key."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Small SQLite key → JSON-value store.
+
+    • entries older than *max_age_s* are dropped
+    • beyond *max_entries* the least recently used rows are dropped
+    • ``enabled=False`` turns every lookup into a miss and every write into
+      a no-op, without touching the file
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age_s: float = DEFAULT_MAX_AGE_S,
+        enabled: bool = True,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_s = max_age_s
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    # -- connection ---------------------------------------------------------
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # -- public API ---------------------------------------------------------
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(hit, value)``; *value* is ``None`` on a miss."""
+        if not self.enabled:
+            return False, None
+
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_s:
+                self.misses += 1
+                return False, None
+            db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            db.commit()
+            self.hits += 1
+        return True, json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store *value* (must be JSON-serialisable) under *key*."""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            db.commit()
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._evict_locked(now)
+
+    def get_or_compute(self, key: str, compute) -> Any:
+        """Return the cached value for *key*, calling *compute()* on a miss."""
+        hit, value = self.get(key)
+        if hit:
+            return value
+        value = compute()
+        if value is not None:  # never pin a failed/empty answer
+            self.set(key, value)
+        return value
+
+    def evict(self) -> int:
+        """Apply the age and size limits now; return the number of rows dropped."""
+        with self._lock:
+            return self._evict_locked(time.time())
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM responses")
+            db.commit()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus the current number of stored entries."""
+        with self._lock:
+            entries = (
+                self._db().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if self.enabled
+                else 0
+            )
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": entries,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -- internal -----------------------------------------------------------
+    def _evict_locked(self, now: float) -> int:
+        db = self._db()
+        dropped = db.execute(
+            "DELETE FROM responses WHERE created < ?", (now - self.max_age_s,)
+        ).rowcount
+        excess = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            dropped += db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (excess,),
+            ).rowcount
+        db.commit()
+        return dropped
+
+
+# --------------------------------------------------------------------------- #
+#  Process-wide instance                                                      #
+# --------------------------------------------------------------------------- #
+_CACHE: ResponseCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """Lazily build the shared cache from the ``LOVEDJ_CACHE*`` variables."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ResponseCache(
+                    os.environ.get("LOVEDJ_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    enabled=os.environ.get("LOVEDJ_CACHE", "on").lower()
+                    not in {"0", "off", "false", "no"},
+                )
+    return _CACHE
+
+
+def set_cache(cache: ResponseCache | None) -> ResponseCache | None:
+    """
+    Install *cache* process-wide and return the one it replaced.
+
+    ``None`` resets to the environment-configured cache on next use.
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        previous, _CACHE = _CACHE, cache
+    return previous
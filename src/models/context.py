@@ -0,0 +1,91 @@
+# src/models/context.py
+"""
+How much of the conversation is sent back in the ``{{ chat }}`` slot.
+
+Re-sending the full history every turn makes prompt size grow linearly per
+turn (and cost quadratically per date).  A `ContextPolicy` bounds it:
+
+    ContextPolicy("full")                    → whole history (default)
+    ContextPolicy("last_n", last_n=6)        → only the last 6 messages
+    ContextPolicy("summary", last_n=4,       → rolling summary of everything
+                  summary_every=4)             older, plus the last 4 messages
+
+In ``summary`` mode the summary is refreshed once at least *summary_every*
+messages have fallen out of the verbatim window since the last refresh, so
+the summariser runs every k turns rather than every turn.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, List, Sequence
+
+MODES = ("full", "last_n", "summary")
+CHARS_PER_TOKEN = 4  # rough English average; good enough for budgeting
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_turns(history_txt: str) -> List[str]:
+    """Split a ``"\\nSpeaker: msg"`` history string into one entry per message."""
+    return [line for line in history_txt.strip().split("\n") if line.strip()]
+
+
+@dataclass(frozen=True)
+class ContextPolicy:
+    mode: str = "full"
+    last_n: int = 6
+    summary_every: int = 4
+
+    def __post_init__(self) -> None:
+        if self.mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, not {self.mode!r}")
+        if self.last_n < 1 or self.summary_every < 1:
+            raise ValueError("last_n and summary_every must be >= 1")
+
+    # -- rendering ----------------------------------------------------------
+    def window(self, turns: Sequence[str]) -> List[str]:
+        """The messages that are sent verbatim."""
+        if self.mode == "full":
+            return list(turns)
+        return list(turns[-self.last_n :])
+
+    def render(self, turns: Sequence[str], summary: str = "") -> str:
+        """Build the text for the ``{{ chat }}`` slot."""
+        recent = "\n".join(self.window(turns))
+        if self.mode == "summary" and summary:
+            return f"Earlier in the date: {summary}\n\n{recent}"
+        return recent
+
+    # -- rolling summary ----------------------------------------------------
+    def needs_summary(self, turns: Sequence[str], summarised: int) -> bool:
+        """True once enough messages have left the window since the last refresh."""
+        if self.mode != "summary":
+            return False
+        return len(turns) - self.last_n - summarised >= self.summary_every
+
+    def refresh_summary(
+        self,
+        turns: Sequence[str],
+        summary: str,
+        summarised: int,
+        summarise: Callable[[str], str],
+    ) -> tuple[str, int]:
+        """
+        Fold messages that left the window into *summary*.
+
+        Returns ``(new_summary, messages_now_summarised)``; a no-op unless
+        `needs_summary()` is true.
+        """
+        if not self.needs_summary(turns, summarised):
+            return summary, summarised
+        upto = len(turns) - self.last_n
+        fresh = "\n".join(turns[summarised:upto])
+        text = f"Summary so far: {summary}\n\n{fresh}" if summary else fresh
+        return summarise(text), upto
+
+
+FULL_CONTEXT = ContextPolicy()
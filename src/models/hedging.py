@@ -0,0 +1,447 @@
+# src/models/hedging.py
+"""
+Hedged requests and latency-aware fallback for interactive replies.
+
+One slow provider response used to stall a whole live date.  With hedging
+on, `get_response()` sends its request through `Hedger.call()`, which
+
+• starts the request on its own thread and waits, from the moment it
+  starts, until the model's *deadline* – the p95 of its recent successful
+  latencies, clamped to
+  ``[min_deadline_s, max_deadline_s]`` (``default_deadline_s`` until
+  ``min_samples`` replies have been seen),
+• past the deadline fires one *hedge* request at the fastest member of the
+  model's equivalence class (the same model if it has none, or if it is
+  itself the fastest) and returns whichever answer arrives first,
+• on an error, falls back at once to the fastest *other* member of the
+  class, if there is one.
+
+Each attempt gets a thread of its own rather than a slot in a shared pool,
+so with many dates in flight a primary never waits behind other requests
+and misses its deadline before it has even started.
+
+The losing request is not cancelled (a blocking HTTP call cannot be); its
+answer is discarded but its latency still feeds the tracker, so slow tails
+are not hidden.  Hedges are recorded in `src.utils.metrics` as calls of
+kind ``hedge`` (``fallback`` after an error), so their tokens and cost
+show up per model.  The primary's usage goes on the caller's own call
+record while the caller is still waiting for it; a primary that finishes
+after the caller has returned is recorded as a call of kind ``primary``,
+so a lost race is still paid for in the totals.  `Hedger.stats()` /
+`summary()` report the hedge rate and how often the hedge won.  A hedged
+reply is cached under the requested model's key.
+
+Public API
+----------
+HedgePolicy             → deadline percentile / bounds, on or off
+LatencyTracker          → recent latencies per model, `percentile()` / `median()`
+ModelRouter(classes)    → equivalence classes, ranked by observed latency
+Hedger(policy, router)  → call() / stats() / summary()
+hedging(enabled)        → context manager turning hedging on/off for a block
+get_hedger()            → process-wide hedger configured from the environment
+set_hedger(h)           → swap it (returns the previous one)
+
+Environment
+-----------
+LOVEDJ_HEDGE            ``on``, or `HedgePolicy` fields such as
+                        ``"percentile=95,max_deadline_s=20"``; unset / ``off``
+                        leaves hedging off unless a block enables it.
+LOVEDJ_MODEL_CLASSES    equivalence classes, e.g.
+                        ``"gpt-4o,claude-3-5-sonnet-20241022;gpt-4o-mini,claude-3-haiku-20240307"``
+                        (``model [service]`` pins a service).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from src.utils.metrics import METRICS, CallRecord, current_call, track_call
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+Target = Tuple[str, Optional[str]]  # (model_name, service_name)
+
+_ENABLED: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar(
+    "lovedj_hedging", default=None
+)
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to hedge (``enabled`` is the default for blocks that don't choose)."""
+
+    enabled: bool = False
+    percentile: float = 95.0
+    min_samples: int = 20  # replies seen before the percentile is trusted
+    default_deadline_s: float = 10.0
+    min_deadline_s: float = 1.0
+    max_deadline_s: float = 30.0
+    window: int = 200  # recent latencies kept per model
+
+
+def parse_policy(spec: str) -> HedgePolicy:
+    """``"on"``, ``"off"`` or ``"field=value,…"`` (which implies on)."""
+    spec = spec.strip()
+    if spec.lower() in {"", "0", "off", "false", "no"}:
+        return HedgePolicy()
+    if spec.lower() in {"1", "on", "true", "yes"}:
+        return HedgePolicy(enabled=True)
+    known = {f.name for f in fields(HedgePolicy)}
+    values: dict = {"enabled": True}
+    for item in filter(None, (i.strip() for i in spec.split(","))):
+        key, _, value = item.partition("=")
+        key = key.strip()
+        if key not in known or key == "enabled":
+            raise ValueError(f"unknown hedging setting {key!r}")
+        values[key] = int(value) if key in {"min_samples", "window"} else float(value)
+    return replace(HedgePolicy(), **values)
+
+
+def parse_target(label: str) -> Target:
+    """``"gpt-4o [openai]"`` → ``("gpt-4o", "openai")``; bare names keep ``None``."""
+    label = label.strip()
+    if label.endswith("]") and " [" in label:
+        model, _, service = label[:-1].rpartition(" [")
+        return model.strip(), service.strip() or None
+    return label, None
+
+
+def parse_classes(spec: str) -> List[List[Target]]:
+    """``"a,b;c,d"`` → two classes of `parse_target` entries."""
+    classes = []
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        members = [parse_target(m) for m in part.split(",") if m.strip()]
+        if members:
+            classes.append(members)
+    return classes
+
+
+class LatencyTracker:
+    """Recent successful latencies per model (bounded, thread-safe)."""
+
+    def __init__(self, window: int = 200) -> None:
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._sorted: Dict[str, Tuple[int, List[float]]] = {}  # model → (version, sorted)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_name: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(model_name)
+            if samples is None:
+                samples = self._samples[model_name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._versions[model_name] = self._versions.get(model_name, 0) + 1
+
+    def count(self, model_name: str) -> int:
+        samples = self._samples.get(model_name)
+        return len(samples) if samples else 0
+
+    def percentile(self, model_name: str, p: float) -> Optional[float]:
+        """The *p*-th percentile (nearest rank) of recent latencies, or ``None``."""
+        with self._lock:
+            samples = self._samples.get(model_name)
+            if not samples:
+                return None
+            version = self._versions[model_name]
+            cached = self._sorted.get(model_name)
+            if cached is None or cached[0] != version:
+                cached = self._sorted[model_name] = (version, sorted(samples))
+        ordered = cached[1]
+        rank = min(len(ordered) - 1, max(0, math.ceil(p / 100.0 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def median(self, model_name: str) -> Optional[float]:
+        return self.percentile(model_name, 50)
+
+
+class ModelRouter:
+    """
+    Equivalence classes of interchangeable models.
+
+    `rank()` orders a model's class by recent median latency; models not
+    seen yet sort after measured ones, in class order.
+    """
+
+    def __init__(self, classes: Iterable[Iterable[Target]] = ()) -> None:
+        self.classes: List[List[Target]] = [list(c) for c in classes]
+        self._by_model: Dict[str, List[Target]] = {}
+        for members in self.classes:
+            for model_name, _ in members:
+                self._by_model.setdefault(model_name, members)
+
+    def members(self, model_name: str, service_name: Optional[str] = None) -> List[Target]:
+        """The model's class (just the model itself if it has none)."""
+        return self._by_model.get(model_name) or [(model_name, service_name)]
+
+    def rank(
+        self, model_name: str, service_name: Optional[str], tracker: LatencyTracker
+    ) -> List[Target]:
+        """The class, fastest first; the requested model keeps its *service_name*."""
+        members = [
+            (m, service_name) if m == model_name and service_name else (m, s)
+            for m, s in self.members(model_name, service_name)
+        ]
+
+        def key(item: Tuple[int, Target]):
+            i, (m, _) = item
+            median = tracker.median(m)
+            return (median is None, median or 0.0, i)
+
+        return [t for _, t in sorted(enumerate(members), key=key)]
+
+    def hedge_target(
+        self, model_name: str, service_name: Optional[str], tracker: LatencyTracker
+    ) -> Target:
+        """Fastest member of the class – possibly the model itself."""
+        return self.rank(model_name, service_name, tracker)[0]
+
+    def fallback(
+        self, model_name: str, service_name: Optional[str], tracker: LatencyTracker
+    ) -> Optional[Target]:
+        """Fastest *other* member of the class, or ``None``."""
+        for target in self.rank(model_name, service_name, tracker):
+            if target[0] != model_name:
+                return target
+        return None
+
+
+@dataclass
+class _Counters:
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    fallbacks: int = 0
+    errors: int = 0
+
+
+@contextlib.contextmanager
+def hedging(enabled: bool) -> Iterator[None]:
+    """Turn hedging on or off for calls made inside the block (and its workers)."""
+    token = _ENABLED.set(enabled)
+    try:
+        yield
+    finally:
+        _ENABLED.reset(token)
+
+
+class Hedger:
+    """Runs requests with a latency deadline, a hedge and an error fallback."""
+
+    def __init__(
+        self,
+        policy: Optional[HedgePolicy] = None,
+        router: Optional[ModelRouter] = None,
+    ) -> None:
+        self.policy = policy or HedgePolicy()
+        self.router = router or ModelRouter()
+        self.tracker = LatencyTracker(self.policy.window)
+        self._counters: Dict[str, _Counters] = {}
+        self._lock = threading.Lock()
+
+    def enabled(self) -> bool:
+        choice = _ENABLED.get()
+        return self.policy.enabled if choice is None else choice
+
+    def deadline(self, model_name: str) -> float:
+        """Seconds to wait for *model_name* before hedging."""
+        p = self.policy
+        if self.tracker.count(model_name) < p.min_samples:
+            return p.default_deadline_s
+        value = self.tracker.percentile(model_name, p.percentile)
+        return min(p.max_deadline_s, max(p.min_deadline_s, value))
+
+    def _count(self, model_name: str) -> _Counters:
+        counters = self._counters.get(model_name)
+        if counters is None:
+            counters = self._counters.setdefault(model_name, _Counters())
+        return counters
+
+    def call(
+        self,
+        model_name: str,
+        service_name: Optional[str],
+        fn: Callable[[str, Optional[str]], T],
+    ) -> T:
+        """
+        ``fn(model_name, service_name)``, hedged if hedging is enabled.
+
+        *fn* must be safe to run twice at once (for different models).
+        """
+        if not self.enabled():
+            return fn(model_name, service_name)
+
+        done: "queue.SimpleQueue" = queue.SimpleQueue()
+        started = threading.Event()
+        tracker = self.tracker
+        caller = current_call()
+        settled = [False]  # set once the caller has returned or raised
+        settle_lock = threading.Lock()
+
+        def attempt(target: Target, role: str) -> None:
+            m, s = target
+            if role == "primary":
+                started.set()
+            t0 = time.monotonic()
+            try:
+                # the primary's record is handed over below, not recorded here
+                with track_call(role, m, s, metrics=None if role == "primary" else METRICS) as rec:
+                    queued = rec.queue_s
+                    result = fn(m, s)
+            except BaseException as exc:  # handed to the waiting caller
+                if role == "primary":
+                    self._settle_primary(rec, rec.queue_s - queued, caller, settled, settle_lock)
+                done.put((role, None, exc))
+                return
+            tracker.record(m, time.monotonic() - t0)
+            if role == "primary":
+                self._settle_primary(rec, rec.queue_s - queued, caller, settled, settle_lock)
+            done.put((role, result, None))
+
+        def launch(target: Target, role: str) -> None:
+            ctx = contextvars.copy_context()  # date id / hedging choice
+            threading.Thread(
+                target=ctx.run, args=(attempt, target, role),
+                name=f"lovedj-{role}", daemon=True,
+            ).start()
+
+        with self._lock:
+            self._count(model_name).calls += 1
+        launch((model_name, service_name), "primary")
+        started.wait()  # the deadline runs from the request's start
+        try:
+            return self._race(model_name, service_name, done, launch)
+        finally:
+            with settle_lock:
+                settled[0] = True
+
+    @staticmethod
+    def _settle_primary(
+        rec: CallRecord,
+        extra_queue_s: float,
+        caller: Optional[CallRecord],
+        settled: list,
+        lock: threading.Lock,
+    ) -> None:
+        """Put the primary's usage on the caller's record, or record it on its own."""
+        with lock:
+            if not settled[0]:  # still awaited: part of the caller's call
+                if caller is not None:
+                    caller.prompt_tokens = rec.prompt_tokens
+                    caller.completion_tokens = rec.completion_tokens
+                    caller.cost_usd = rec.cost_usd
+                    caller.queue_s += extra_queue_s
+                return
+        METRICS.record(rec)  # the caller has moved on: count the losing request
+
+    def _race(self, model_name, service_name, done, launch):
+        """Wait for the first good answer, hedging past the deadline / falling back on errors."""
+        tracker = self.tracker
+        pending, second, error = 1, False, None
+        timeout: Optional[float] = self.deadline(model_name)
+        while True:
+            try:
+                role, result, exc = done.get(timeout=timeout)
+            except queue.Empty:
+                target = self.router.hedge_target(model_name, service_name, tracker)
+                log.info("%s slower than %.1fs; hedging on %s", model_name, timeout, target[0])
+                with self._lock:
+                    self._count(model_name).hedged += 1
+                launch(target, "hedge")
+                pending, second, timeout = pending + 1, True, None
+                continue
+            pending -= 1
+            if exc is None:
+                if role == "hedge":
+                    with self._lock:
+                        self._count(model_name).hedge_wins += 1
+                return result
+            error = error or exc
+            if not second:
+                target = self.router.fallback(model_name, service_name, tracker)
+                if target is not None:
+                    log.warning("%s failed (%s); falling back to %s", model_name, exc, target[0])
+                    with self._lock:
+                        self._count(model_name).fallbacks += 1
+                    launch(target, "fallback")
+                    pending, second, timeout = pending + 1, True, None
+                    continue
+            if pending == 0:
+                with self._lock:
+                    self._count(model_name).errors += 1
+                raise error
+
+    def stats(self) -> Dict[str, dict]:
+        """Per requested model: calls, hedges, hedge rate / wins, fallbacks, deadline."""
+        with self._lock:
+            counters = {m: replace(c) for m, c in self._counters.items()}
+        out = {}
+        for model_name, c in sorted(counters.items()):
+            p95 = self.tracker.percentile(model_name, self.policy.percentile)
+            out[model_name] = {
+                "calls": c.calls,
+                "hedged": c.hedged,
+                "hedge_rate": round(c.hedged / c.calls, 4) if c.calls else 0.0,
+                "hedge_wins": c.hedge_wins,
+                "fallbacks": c.fallbacks,
+                "errors": c.errors,
+                f"p{self.policy.percentile:g}_s": None if p95 is None else round(p95, 3),
+                "deadline_s": round(self.deadline(model_name), 3),
+            }
+        return out
+
+    def summary(self) -> str:
+        """One line: hedged share of calls, hedges won and fallbacks taken."""
+        stats = list(self.stats().values())
+        calls = sum(s["calls"] for s in stats)
+        if not calls:
+            return ""
+        hedged = sum(s["hedged"] for s in stats)
+        wins = sum(s["hedge_wins"] for s in stats)
+        line = f"hedged {hedged}/{calls} replies ({hedged / calls:.1%}), {wins} won"
+        fallbacks = sum(s["fallbacks"] for s in stats)
+        return f"{line}, {fallbacks} fell back" if fallbacks else line
+
+
+# --------------------------------------------------------------------------- #
+#  Process-wide instance                                                      #
+# --------------------------------------------------------------------------- #
+_HEDGER: Hedger | None = None
+_HEDGER_LOCK = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    """Lazily build the shared hedger from ``LOVEDJ_HEDGE`` / ``LOVEDJ_MODEL_CLASSES``."""
+    global _HEDGER
+    if _HEDGER is None:
+        with _HEDGER_LOCK:
+            if _HEDGER is None:
+                _HEDGER = Hedger(
+                    parse_policy(os.environ.get("LOVEDJ_HEDGE", "")),
+                    ModelRouter(parse_classes(os.environ.get("LOVEDJ_MODEL_CLASSES", ""))),
+                )
+    return _HEDGER
+
+
+def set_hedger(hedger: Hedger | None) -> Hedger | None:
+    """
+    Install *hedger* process-wide and return the one it replaced.
+
+    ``None`` resets to the environment-configured hedger on next use.
+    """
+    global _HEDGER
+    with _HEDGER_LOCK:
+        previous, _HEDGER = _HEDGER, hedger
+    return previous
@@ -0,0 +1,120 @@
+# src/models/pool.py
+"""
+Interned object pool for expensive-to-build EDSL objects.
+
+`src.models.agents` keeps one pool for `Model`s (keyed on model + service)
+and one for `Agent`s (keyed on a hash of name + persona + guidelines), so
+each distinct object is built once per process and then shared across
+turns, dates and Streamlit sessions.
+
+The pool is thread-safe: concurrent requests for the *same* key wait for a
+single build, while different keys build in parallel.  With *max_size* it
+is an LRU: past that many objects the least recently used one is dropped
+(and rebuilt if it is asked for again), so a long-running server that sees
+a stream of distinct personas stays bounded.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class ObjectPool:
+    """Build-once registry with hit counters and construction-time accounting."""
+
+    def __init__(self, name: str, max_size: Optional[int] = None) -> None:
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.name = name
+        self.max_size = max_size
+        self._objects: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._build_s: Dict[Hashable, float] = {}  # per pooled key
+        self._key_locks: Dict[Hashable, threading.Lock] = {}  # builds in progress
+        self._lock = threading.Lock()
+        # running totals, kept when keys are evicted
+        self._hits = 0
+        self._builds = 0
+        self._total_build_s = 0.0
+        self._saved_s = 0.0
+        self.evictions = 0
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the pooled object for *key*, calling *factory()* on first use."""
+        obj = self._objects.get(key)
+        if obj is not None:
+            self._hit(key)
+            return obj
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            obj = self._objects.get(key)
+            if obj is not None:  # another thread built it while we waited
+                self._hit(key)
+                return obj
+
+            t0 = time.perf_counter()
+            try:
+                obj = factory()
+            except BaseException:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+                raise
+            elapsed = time.perf_counter() - t0
+
+            with self._lock:
+                self._objects[key] = obj
+                self._build_s[key] = elapsed
+                self._builds += 1
+                self._total_build_s += elapsed
+                self._key_locks.pop(key, None)  # later callers hit `_objects`
+                while self.max_size is not None and len(self._objects) > self.max_size:
+                    old, _ = self._objects.popitem(last=False)
+                    self._build_s.pop(old, None)
+                    self.evictions += 1
+        return obj
+
+    def _hit(self, key: Hashable) -> None:
+        with self._lock:
+            self._hits += 1
+            self._saved_s += self._build_s.get(key, 0.0)
+            if key in self._objects:
+                self._objects.move_to_end(key)
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._objects
+
+    def clear(self) -> None:
+        with self._lock:
+            self._objects.clear()
+            self._build_s.clear()
+            self._key_locks.clear()
+            self._hits = self._builds = self.evictions = 0
+            self._total_build_s = self._saved_s = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Builds, reuses and the construction time reuse avoided.
+
+        ``saved_s`` charges every hit with the time its key originally took
+        to build – i.e. what the caller would have paid without the pool.
+        ``build_s`` is the construction time actually spent (evicted and
+        rebuilt objects included).
+        """
+        with self._lock:
+            return {
+                "pool": self.name,
+                "objects": len(self._objects),
+                "builds": self._builds,
+                "hits": self._hits,
+                "evictions": self.evictions,
+                "build_s": self._total_build_s,
+                "saved_s": self._saved_s,
+            }
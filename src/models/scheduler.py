@@ -0,0 +1,388 @@
+# src/models/scheduler.py
+"""
+Per-service rate limiting with adaptive concurrency.
+
+Dates run on many threads (the async engine, the batch CLI, browser tabs),
+and nothing used to coordinate their calls – a large sweep simply ran into
+provider 429s.  Every backend call from `src.models.agents` now passes
+through `get_scheduler().slot(...)`, which for the call's service
+
+• waits for a free slot in an AIMD concurrency window – the window grows
+  by one per window's worth of successful calls and halves on a throttle
+  (or shrinks gently when latency exceeds the service's target),
+• charges requests and estimated tokens to per-minute token buckets and
+  sleeps until both budgets allow the call,
+• backs the whole service off after a throttle (``Retry-After`` when the
+  error carries one, else exponential from 1 s).
+
+Time spent waiting is added to the call's ``queue_s`` in
+`src.utils.metrics`; queue depth, the current window and throttle counts
+are in `Scheduler.stats()`.
+
+Only services with a budget are scheduled: with ``LOVEDJ_RATE_LIMITS``
+unset, `slot()` is a no-op and callers keep their own concurrency.  A
+``default`` entry applies to every service without one of its own.
+
+Services are the names from the model catalogue (``openai``,
+``anthropic`` …); a call without one is looked up there by model – from
+memory or the catalogue file only, never by starting discovery, and not at
+all on the offline stub backend.
+
+Public API
+----------
+ServiceLimits          → budgets + AIMD bounds for one service
+Scheduler(limits)      → slot() / stats() / summary()
+parse_limits(spec)     → limits from ``"openai:rpm=500,tpm=150000;anthropic:rpm=50"``
+get_scheduler()        → process-wide scheduler configured from the environment
+set_scheduler(s)       → swap it (returns the previous one)
+
+Environment
+-----------
+LOVEDJ_RATE_LIMITS     budgets per service (format above); ``off`` or unset
+                       disables scheduling.  Services without an entry use
+                       ``default`` if given, else are not scheduled.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Callable, ContextManager, Dict, Mapping, Optional, Union
+
+from src.utils.metrics import add_queue_time
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SERVICE = "default"
+_MAX_BACKOFF_S = 60.0
+Tokens = Union[int, Callable[[], int]]
+_THROTTLE_TEXT = re.compile(r"\b429\b|rate[ _-]?limit|too many requests", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ServiceLimits:
+    """Budgets for one service (``None`` = no budget)."""
+
+    rpm: Optional[float] = None  # requests per minute
+    tpm: Optional[float] = None  # tokens per minute (prompt + expected completion)
+    concurrency: int = 8  # initial AIMD window
+    min_concurrency: int = 1
+    max_concurrency: int = 64
+    target_latency_s: Optional[float] = None  # slower calls shrink the window a little
+
+
+def parse_limits(spec: str) -> Dict[str, ServiceLimits]:
+    """
+    Parse ``"service:key=value,…;service:…"`` into `ServiceLimits`.
+
+    Keys are the `ServiceLimits` fields; ``default`` sets the fallback.
+    """
+    known = {f.name: f.type for f in fields(ServiceLimits)}
+    limits: Dict[str, ServiceLimits] = {}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        service, _, body = part.partition(":")
+        values = {}
+        for item in filter(None, (i.strip() for i in body.split(","))):
+            key, _, value = item.partition("=")
+            key = key.strip()
+            if key not in known:
+                raise ValueError(f"unknown rate-limit setting {key!r} for {service!r}")
+            values[key] = int(value) if "concurrency" in key else float(value)
+        service = service.strip()
+        base = limits.get(service) or limits.get(DEFAULT_SERVICE) or ServiceLimits()
+        limits[service] = replace(base, **values)
+    return limits
+
+
+def is_throttle(exc: BaseException) -> bool:
+    """Does *exc* look like a provider rate-limit response?"""
+    if getattr(exc, "status_code", None) == 429 or getattr(exc, "status", None) == 429:
+        return True
+    if "ratelimit" in type(exc).__name__.lower():
+        return True
+    return bool(_THROTTLE_TEXT.search(str(exc)))
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    value = getattr(exc, "retry_after", None)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Refills at ``per_minute / 60`` per second up to *burst*.
+
+    `reserve()` always takes the amount – going into debt if needed – and
+    returns how long the caller must wait, so waiters are served in
+    reservation order and a request larger than the burst still goes through.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be > 0")
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute / 6.0  # 10 s of budget
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+
+class ServiceScheduler:
+    """Concurrency window + token buckets + counters for one service."""
+
+    def __init__(self, service: str, limits: ServiceLimits) -> None:
+        self.service = service
+        self.limits = limits
+        self.window = float(max(limits.min_concurrency, min(limits.concurrency, limits.max_concurrency)))
+        self.requests = TokenBucket(limits.rpm) if limits.rpm else None
+        self.tokens = TokenBucket(limits.tpm) if limits.tpm else None
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self.queued_s = 0.0
+        self.latency_s = 0.0  # EWMA of successful calls
+        self._backoff_s = 0.0
+        self._blocked_until = 0.0
+        self._cond = threading.Condition(threading.Lock())
+
+    def slot(self, *, requests: int = 1, tokens: Tokens = 0) -> "_Slot":
+        """Context manager holding one concurrency slot, once the budgets allow it."""
+        return _Slot(self, requests, tokens)
+
+    def _enter(self, requests: int, tokens: Tokens) -> float:
+        """Take a slot and charge the buckets; return the seconds to wait first."""
+        if self.tokens is not None and callable(tokens):
+            tokens = tokens()  # estimated only when there is a token budget
+        with self._cond:
+            if self.in_flight >= int(self.window):
+                self.waiting += 1
+                try:
+                    while self.in_flight >= int(self.window):
+                        self._cond.wait()
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+            now = time.monotonic()
+            return max(
+                self._blocked_until - now,
+                self.requests.reserve(requests, now) if self.requests else 0.0,
+                self.tokens.reserve(tokens, now) if self.tokens else 0.0,
+                0.0,
+            )
+
+    def _finish(self, queued_s: float, latency_s: float, error: Optional[BaseException]) -> None:
+        limits = self.limits
+        with self._cond:
+            self.in_flight -= 1
+            self.calls += 1
+            self.queued_s += queued_s
+            if error is not None and is_throttle(error):
+                self.throttled += 1
+                self.window = max(float(limits.min_concurrency), self.window / 2)
+                self._backoff_s = min(_MAX_BACKOFF_S, self._backoff_s * 2 or 1.0)
+                pause = _retry_after(error) or self._backoff_s
+                self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+                log.warning(
+                    "%s throttled; window %.1f, pausing %.1fs", self.service, self.window, pause
+                )
+            elif error is not None:
+                self.errors += 1
+            else:
+                self._backoff_s = 0.0
+                self.latency_s = latency_s if not self.latency_s else (
+                    0.8 * self.latency_s + 0.2 * latency_s
+                )
+                if limits.target_latency_s and latency_s > limits.target_latency_s:
+                    self.window = max(float(limits.min_concurrency), self.window * 0.9)
+                else:
+                    self.window = min(
+                        float(limits.max_concurrency), self.window + 1.0 / self.window
+                    )
+            if self.waiting:
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "window": round(self.window, 2),
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "calls": self.calls,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "queued_s": round(self.queued_s, 3),
+                "latency_s": round(self.latency_s, 3),
+            }
+
+
+class _Slot:
+    """`ServiceScheduler.slot()` – a plain class, as it wraps every call."""
+
+    __slots__ = ("_sched", "_requests", "_tokens", "_t0", "_started")
+
+    def __init__(self, sched: ServiceScheduler, requests: int, tokens: Tokens) -> None:
+        self._sched, self._requests, self._tokens = sched, requests, tokens
+
+    def __enter__(self) -> None:
+        self._t0 = time.monotonic()
+        delay = self._sched._enter(self._requests, self._tokens)
+        if delay:
+            try:
+                time.sleep(delay)
+            except BaseException as exc:
+                self._sched._finish(time.monotonic() - self._t0, 0.0, exc)
+                raise
+        self._started = time.monotonic()
+        add_queue_time(self._started - self._t0)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        now = time.monotonic()
+        self._sched._finish(self._started - self._t0, now - self._started, exc)
+
+
+def _catalogue_service(model_name: str) -> Optional[str]:
+    from src.models.backends import get_backend
+    from src.utils.models import known_service
+
+    if get_backend().name == "stub":  # offline: no catalogue, no network
+        return None
+    try:
+        return known_service(model_name)
+    except Exception:  # pragma: no cover – unreadable catalogue
+        return None
+
+
+class Scheduler:
+    """One `ServiceScheduler` per service, created on first use."""
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, ServiceLimits]] = None,
+        *,
+        enabled: bool = True,
+        resolve: Callable[[str], Optional[str]] = _catalogue_service,
+    ) -> None:
+        self.limits = dict(limits or {})
+        self.enabled = enabled and bool(self.limits)
+        self._resolve = resolve
+        self._services: Dict[str, ServiceScheduler] = {}
+        self._by_model: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def service_for(self, model_name: str, service_name: Optional[str]) -> str:
+        """
+        *service_name*, else the catalogue's service for *model_name*.
+
+        Only successful lookups are memoised: a model the catalogue does not
+        know yet (not loaded, or not listed) is looked up again next call.
+        """
+        if service_name:
+            return service_name
+        service = self._by_model.get(model_name)
+        if service is None:
+            service = self._resolve(model_name)
+            if service is None:
+                return DEFAULT_SERVICE
+            self._by_model[model_name] = service
+        return service
+
+    def limits_for(self, service: str) -> Optional[ServiceLimits]:
+        """*service*'s budget, else the ``default`` one, else ``None`` (unscheduled)."""
+        return self.limits.get(service) or self.limits.get(DEFAULT_SERVICE)
+
+    def for_service(self, service: str) -> Optional[ServiceScheduler]:
+        """The scheduler for *service*, or ``None`` if it has no budget."""
+        sched = self._services.get(service)
+        if sched is None:
+            limits = self.limits_for(service)
+            if limits is None:
+                return None
+            with self._lock:
+                sched = self._services.get(service)
+                if sched is None:
+                    sched = self._services[service] = ServiceScheduler(service, limits)
+        return sched
+
+    def slot(
+        self,
+        model_name: str,
+        service_name: Optional[str],
+        *,
+        requests: int = 1,
+        tokens: Tokens = 0,
+    ) -> ContextManager[None]:
+        """
+        Context manager running its block as *requests* calls to the model's service.
+
+        *tokens* may be a zero-argument callable, evaluated only if the
+        service has a token budget.  Services without a budget run at once.
+        """
+        if not self.enabled:
+            return contextlib.nullcontext()
+        sched = self.for_service(self.service_for(model_name, service_name))
+        if sched is None:
+            return contextlib.nullcontext()
+        return sched.slot(requests=requests, tokens=tokens)
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-service window, in-flight, queue depth and throttle counters."""
+        return {name: s.stats() for name, s in sorted(self._services.items())}
+
+    def summary(self) -> str:
+        """One-line status for services that are queueing or were throttled."""
+        parts = []
+        for name, s in self.stats().items():
+            if s["queue_depth"] or s["throttled"]:
+                parts.append(
+                    f"{name}: {s['queue_depth']} queued, {s['throttled']} throttled, "
+                    f"window {s['window']:g}"
+                )
+        return "; ".join(parts)
+
+
+# --------------------------------------------------------------------------- #
+#  Process-wide instance                                                      #
+# --------------------------------------------------------------------------- #
+_SCHEDULER: Scheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """Lazily build the shared scheduler from ``LOVEDJ_RATE_LIMITS``."""
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULER is None:
+                spec = os.environ.get("LOVEDJ_RATE_LIMITS", "")
+                if spec.lower() in {"", "0", "off", "false", "no"}:
+                    _SCHEDULER = Scheduler(enabled=False)
+                else:
+                    _SCHEDULER = Scheduler(parse_limits(spec))
+    return _SCHEDULER
+
+
+def set_scheduler(scheduler: Scheduler | None) -> Scheduler | None:
+    """
+    Install *scheduler* process-wide and return the one it replaced.
+
+    ``None`` resets to the environment-configured scheduler on next use.
+    """
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        previous, _SCHEDULER = _SCHEDULER, scheduler
+    return previous
@@ -0,0 +1,160 @@
+# src/models/session.py
+"""
+Per-date state for the step-wise helpers in `src.models.simulation`.
+
+A `DateSession` owns one date's agents and its `Transcript` (which also
+renders the history text).
+Sessions live in a `SessionStore` keyed by the Streamlit session id, so
+concurrent browser tabs served by one process never share history.  The
+store is bounded: once `max_sessions` is reached the least recently used
+*finished* date is dropped.  A date that is still running is kept (the
+store may briefly exceed its cap) unless it has been idle for ``idle_s`` –
+an abandoned tab – since dropping it mid-date would silently restart its
+history.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from src.models.transcript import Transcript
+
+DEFAULT_SESSION_ID = "default"  # used outside Streamlit (CLI, tests, scripts)
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_IDLE_S = 30 * 60  # a running date untouched this long may be evicted
+
+
+class UnknownSession(LookupError):
+    """No `DateSession` for this id: never started, already ended, or evicted."""
+
+
+class DateSession:
+    """Agents + transcript + history text for one date."""
+
+    def __init__(
+        self,
+        agent_a: Any = None,
+        agent_b: Any = None,
+        display_a: str = "A",
+        display_b: str = "B",
+        model_name: Optional[str] = None,
+        service_name: Optional[str] = None,
+        rounds: int = 3,
+    ) -> None:
+        self.agent_a = agent_a
+        self.agent_b = agent_b
+        self.display_a = display_a
+        self.display_b = display_b
+        self.model_name = model_name
+        self.service_name = service_name
+        self.rounds = rounds
+        self.date_id = uuid.uuid4().hex[:12]  # telemetry / log correlation id
+        self.transcript = Transcript()
+        self.index = 0  # messages added so far (read every turn)
+        # rolling-summary context (see src.models.context)
+        self.summary = ""
+        self.summarised = 0  # messages folded into `summary`
+        self.context_tokens: List[int] = []  # est. tokens sent as chat, per turn
+        self.finished = False  # set once the date has been rated
+        self.created = self.last_used = time.time()
+
+    def add(self, entry: Tuple[str, str]) -> str:
+        """Append one message; return the updated history text."""
+        self.index += 1
+        return self.transcript.add(entry)
+
+    @property
+    def history_txt(self) -> str:
+        """``"\\nSpeaker: text"`` per message (memoised by the transcript)."""
+        return self.transcript.as_history_text()
+
+    def __repr__(self) -> str:
+        return (
+            f"DateSession({self.display_a!r} & {self.display_b!r}, "
+            f"{len(self.transcript)} messages, model={self.model_name!r})"
+        )
+
+
+class SessionStore:
+    """Thread-safe LRU map of session id → `DateSession`."""
+
+    def __init__(
+        self, max_sessions: int = DEFAULT_MAX_SESSIONS, idle_s: float = DEFAULT_IDLE_S
+    ) -> None:
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be >= 1")
+        self.max_sessions = max_sessions
+        self.idle_s = idle_s
+        self.evictions = 0
+        self._sessions: "OrderedDict[str, DateSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[DateSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_used = time.time()
+            return session
+
+    def put(self, session_id: str, session: DateSession) -> DateSession:
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            if len(self._sessions) > self.max_sessions:
+                self._evict(time.time())
+        return session
+
+    def _evict(self, now: float) -> None:
+        """Drop least recently used finished (or long idle) dates down to the cap."""
+        excess = len(self._sessions) - self.max_sessions
+        victims = [
+            sid for sid, s in self._sessions.items()
+            if s.finished or now - s.last_used > self.idle_s
+        ][:excess]
+        for sid in victims:
+            del self._sessions[sid]
+        self.evictions += len(victims)
+
+    def require(self, session_id: str) -> DateSession:
+        """Like `get()`, but raise `UnknownSession` instead of returning ``None``."""
+        session = self.get(session_id)
+        if session is None:
+            raise UnknownSession(
+                f"no date session {session_id!r} (not started, ended or evicted); "
+                "call initialize_date() first"
+            )
+        return session
+
+    def pop(self, session_id: str) -> Optional[DateSession]:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+
+def current_session_id() -> str:
+    """
+    Id of the Streamlit session running this script, else the default id.
+
+    Must be called on the script thread – worker threads have no Streamlit
+    context, so resolve the id first and pass it along explicitly.
+    """
+    if "streamlit" not in sys.modules:  # don't import Streamlit for CLI use
+        return DEFAULT_SESSION_ID
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+    except Exception:  # pragma: no cover – very old/new Streamlit
+        ctx = None
+    return ctx.session_id if ctx is not None else DEFAULT_SESSION_ID
@@ -2,20 +2,34 @@
 """
 Conversation-simulation helpers for *love.dj*.
 
-The file now has **two layers**:
+The file now has **three layers**:
 
 1.  A *deterministic* `run_date()` used by the pytest suite
     (no external API cost – unchanged).
 2.  A set of step-by-step helpers (`initialize_date`, `get_next_response`,
     etc.) that **call EDSL live** via `src.models.agents`, enabling the
-    streaming UI.
+    streaming UI.  Their state lives in one `DateSession` per Streamlit
+    session (see `src.models.session`), so concurrent users stay isolated.
+    `ReplyPipeline` runs those helpers on a worker so the next request is
+    in flight while the previous reply is still being painted.
+3.  An asyncio engine (`run_date_async`, `run_many`) that keeps many
+    independent dates in flight at once for batch sweeps.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import contextvars
+import logging
+import queue
 import random
-from typing import List, Tuple, Optional
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Iterable, List, Tuple, Optional
 
+log = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------#
 #  Section 1 – deterministic implementation used by the tests                #
@@ -54,19 +68,22 @@ def run_date(
 # ---------------------------------------------------------------------------#
 #  Section 2 – **live** helpers for the Streamlit UI                         #
 # ---------------------------------------------------------------------------#
-from .agents import (  # heavy imports kept separate so the tests above remain cheap
-    create_agent,
+from src.prompts.date import GUIDELINES
+from .agents import (  # light: EDSL itself is only imported on the first call
+    get_agent,
     get_opener,
     get_response,
-    get_rating,
+    evaluate_date,
+    get_summary,
     DEFAULT_PROFILES,
 )
+from .context import FULL_CONTEXT, ContextPolicy, estimate_tokens, split_turns
+from .session import DateSession, SessionStore, current_session_id
+from .streaming import DEFAULT_STREAMER, ReplyStream
+from src.utils.metrics import bind, export_metrics
 
-# Caches for the “legacy”/step-wise API
-_cached_agents: Tuple | None = None
-_cached_transcript: List[Tuple[str, str]] = []
-_cached_index: int = 0
-_cached_history_txt: str = ""
+# Per-date state for the step-wise API, one DateSession per Streamlit session
+_SESSIONS = SessionStore()
 
 
 def initialize_date(
@@ -80,35 +97,43 @@ def initialize_date(
     gender_a: str,
     gender_b: str,
     rounds: int = 3,
+    *,
+    session_id: Optional[str] = None,
 ):
     """
     Build the two agents **with EDSL traits** and return them together with
-    display-names.  Side-effect: fills the module-level caches so subsequent
+    display-names.  Side-effect: starts a fresh `DateSession` for
+    *session_id* (default: the current Streamlit session) so subsequent
     calls to `get_opening_message()` / `get_next_response()` have context.
     """
-    global _cached_agents, _cached_transcript, _cached_index, _cached_history_txt
+    agent_a, agent_b, display_a, display_b = _build_agents(
+        profile_a, profile_b, name_a, name_b, theme, gender_a, gender_b
+    )
 
-    display_a = name_a.strip() if name_a else "A"
-    display_b = name_b.strip() if name_b else "B"
+    _SESSIONS.put(
+        session_id or current_session_id(),
+        DateSession(
+            agent_a, agent_b, display_a, display_b, model_name, service_name, rounds
+        ),
+    )
 
-    # create EDSL Agents
-    agent_a = create_agent(display_a, profile_a, DEFAULT_PROFILES["default_a"])
-    agent_a.traits["gender"] = gender_a
-    agent_b = create_agent(display_b, profile_b, DEFAULT_PROFILES["default_b"])
-    agent_b.traits["gender"] = gender_b
+    return agent_a, agent_b, display_a, display_b
 
-    # Add theme/location context if provided
-    if theme:
-        theme_intro = f"You are on a date at {theme}. "
-        agent_a.traits["guidelines"] = theme_intro + agent_a.traits.get("guidelines", "")
-        agent_b.traits["guidelines"] = theme_intro + agent_b.traits.get("guidelines", "")
 
-    _cached_agents = (agent_a, agent_b, display_a, display_b, model_name, service_name)
-    _cached_transcript = []
-    _cached_index = 0
-    _cached_history_txt = ""
+def get_session(session_id: Optional[str] = None) -> DateSession:
+    """
+    The `DateSession` for *session_id*.
 
-    return agent_a, agent_b, display_a, display_b
+    Raises `UnknownSession` if it was never started with `initialize_date()`
+    (or was ended / evicted) – rather than silently continuing the date
+    with an empty history.
+    """
+    return _SESSIONS.require(session_id or current_session_id())
+
+
+def end_date(session_id: Optional[str] = None) -> Optional[DateSession]:
+    """Drop the `DateSession` for *session_id* and return it (if any)."""
+    return _SESSIONS.pop(session_id or current_session_id())
 
 
 def get_opening_message(
@@ -116,12 +141,15 @@ def get_opening_message(
     display_a: str,
     model_name: str,
     service_name: Optional[str],
+    *,
+    session_id: Optional[str] = None,
 ):
     """Ask **Agent A** for the opening line."""
-    opener = get_opener(model_name, agent_a, service_name=service_name)
+    session = get_session(session_id)
+    with bind(date_id=session.date_id, turn=session.index):
+        opener = get_opener(model_name, agent_a, service_name=service_name)
     entry = (display_a, opener)
-    _update_history(entry)
-    return entry, _cached_history_txt
+    return entry, session.add(entry)
 
 
 def get_next_response(
@@ -133,20 +161,83 @@ def get_next_response(
     history_txt: str,
     model_name: str,
     service_name: Optional[str],
+    *,
+    session_id: Optional[str] = None,
+    context_policy: Optional[ContextPolicy] = None,
 ):
-    """Ask the current speaker for their reply."""
-    response = get_response(
-        model_name,
-        agent_self,
-        agent_other,
-        turn,
-        speaker,
-        history_txt,
-        service_name=service_name,
-    )
+    """
+    Ask the current speaker for their reply.
+
+    *context_policy* bounds how much history is re-sent (default: all of
+    it); the estimated tokens sent are appended to the session's
+    ``context_tokens``.
+    """
+    session = get_session(session_id)
+    with bind(date_id=session.date_id, turn=session.index):
+        chat = _context_for_turn(
+            session, history_txt, context_policy or FULL_CONTEXT, model_name, service_name
+        )
+        response = get_response(
+            model_name,
+            agent_self,
+            agent_other,
+            turn,
+            speaker,
+            chat,
+            service_name=service_name,
+        )
     entry = (display_self, response)
-    _update_history(entry)
-    return entry, _cached_history_txt
+    return entry, session.add(entry)
+
+
+def stream_next_response(
+    agent_self,
+    agent_other,
+    display_self: str,
+    turn: int,
+    speaker: str,
+    history_txt: str,
+    model_name: str,
+    service_name: Optional[str],
+    *,
+    session_id: Optional[str] = None,
+    context_policy: Optional[ContextPolicy] = None,
+    streamer=None,
+) -> ReplyStream:
+    """
+    Streaming twin of `get_next_response()`.
+
+    Returns a `ReplyStream`: iterate it to receive the reply in chunks.
+    Once exhausted, the reply is appended to the session and
+    ``stream.result`` holds ``(entry, history_txt)`` – the same pair
+    `get_next_response()` returns.
+    """
+    session = get_session(session_id)
+    streamer = streamer or DEFAULT_STREAMER
+
+    def chunks():
+        with bind(date_id=session.date_id, turn=session.index):
+            chat = _context_for_turn(
+                session, history_txt, context_policy or FULL_CONTEXT, model_name, service_name
+            )
+            yield from streamer.stream_reply(
+                model_name,
+                agent_self,
+                agent_other,
+                turn,
+                speaker,
+                chat,
+                service_name=service_name,
+            )
+
+    def done(text: str):
+        entry = (display_self, text)
+        return entry, session.add(entry)
+
+    return ReplyStream(
+        chunks(), done, model_name=model_name, service_name=service_name,
+        replayed=not getattr(streamer, "native", True),
+    )
 
 
 def get_date_ratings(
@@ -155,17 +246,373 @@ def get_date_ratings(
     history_txt: str,
     model_name: str,
     service_name: Optional[str],
+    *,
+    session_id: Optional[str] = None,
+    samples: int = 1,
+):
+    """
+    Fetch linear-scale scores (1–10) from both agents in one batched job.
+
+    With ``samples=K`` each score is the mean of K samples from that job.
+    """
+    eval_a, eval_b = get_date_evaluation(
+        agent_a, agent_b, history_txt, model_name, service_name,
+        session_id=session_id, debrief=False, samples=samples,
+    )
+    return eval_a["rating"], eval_b["rating"]
+
+
+def get_date_evaluation(
+    agent_a,
+    agent_b,
+    history_txt: str,
+    model_name: str,
+    service_name: Optional[str],
+    *,
+    session_id: Optional[str] = None,
+    debrief: bool = True,
+    samples: int = 1,
+):
+    """
+    Both agents' post-date evaluations, asked as one EDSL job.
+
+    Returns ``(eval_a, eval_b)`` dicts – see `evaluate_date()`; with
+    *debrief* they also carry ``see_again`` and ``rationale``, and with
+    ``samples > 1`` a ``rating_estimate``.
+    """
+    session = get_session(session_id)
+    with bind(date_id=session.date_id):
+        eval_a, eval_b = evaluate_date(
+            model_name, [agent_a, agent_b], history_txt,
+            service_name=service_name, debrief=debrief, samples=samples,
+        )
+    session.finished = True  # may now be evicted
+    return eval_a, eval_b
+
+
+class PipelinedReply:
+    """
+    One reply produced by a `ReplyPipeline`.
+
+    Iterating yields its chunks as the worker receives them (blocking until
+    each arrives); afterwards `result` is ``(entry, history_txt)``.
+    """
+
+    _END = object()
+
+    def __init__(self, turn: int, speaker: str, display: str) -> None:
+        self.turn = turn
+        self.speaker = speaker
+        self.display = display
+        self.result: Optional[Tuple[Tuple[str, str], str]] = None
+        self.error: Optional[BaseException] = None
+        self._chunks: "queue.Queue" = queue.Queue()
+
+    def __iter__(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is self._END:
+                break
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+        self._chunks.put(self._END)
+
+
+class ReplyPipeline:
+    """
+    Drive all B/A replies of a date on a background worker.
+
+    The worker requests each reply as soon as the previous reply's text is
+    known – it never waits for the UI to finish painting – so model latency
+    overlaps with rendering and any cosmetic pacing on the render side.
+    Iterate the pipeline to get the `PipelinedReply` objects in turn order.
+
+    The worker starts on construction.  Use it as a context manager (or call
+    `close()`) so an abandoned date – e.g. a Streamlit rerun – stops issuing
+    new requests.  The session id is resolved here, on the calling thread,
+    because worker threads have no Streamlit context.
+    """
+
+    def __init__(
+        self,
+        agent_a,
+        agent_b,
+        display_a: str,
+        display_b: str,
+        rounds: int,
+        history_txt: str,
+        model_name: str,
+        service_name: Optional[str],
+        *,
+        session_id: Optional[str] = None,
+        context_policy: Optional[ContextPolicy] = None,
+        streamer=None,
+    ) -> None:
+        self.session_id = session_id or current_session_id()
+        self.model_name = model_name
+        self.service_name = service_name
+        self.context_policy = context_policy
+        self.streamer = streamer
+        self._cancelled = threading.Event()
+
+        self._plan = []
+        for turn in range(rounds):
+            for speaker, me, other, display in (
+                ("B", agent_b, agent_a, display_b),
+                ("A", agent_a, agent_b, display_a),
+            ):
+                self._plan.append((PipelinedReply(turn, speaker, display), me, other))
+
+        self._worker = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._run, history_txt),
+            name="lovedj-reply-pipeline",
+            daemon=True,
+        )
+        self._worker.start()
+
+    def _run(self, history_txt: str) -> None:
+        for i, (reply, me, other) in enumerate(self._plan):
+            if self._cancelled.is_set():
+                error: BaseException = RuntimeError("reply pipeline closed")
+                for rest, _, _ in self._plan[i:]:
+                    rest._finish(error)
+                return
+            try:
+                stream = stream_next_response(
+                    me,
+                    other,
+                    reply.display,
+                    reply.turn,
+                    reply.speaker,
+                    history_txt,
+                    self.model_name,
+                    self.service_name,
+                    session_id=self.session_id,
+                    context_policy=self.context_policy,
+                    streamer=self.streamer,
+                )
+                for chunk in stream:
+                    reply._chunks.put(chunk)
+            except BaseException as exc:  # surface on the consumer's thread
+                for rest, _, _ in self._plan[i:]:
+                    rest._finish(exc)
+                return
+            reply.result = stream.result
+            history_txt = stream.result[1]
+            reply._finish()
+
+    def __iter__(self):
+        for reply, _, _ in self._plan:
+            yield reply
+
+    def close(self) -> None:
+        """Stop requesting further replies (the one in flight completes)."""
+        self._cancelled.set()
+
+    def __enter__(self) -> "ReplyPipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ───────── internal helpers ─────────────────────────────────────────────────
+def _build_agents(
+    profile_a: str,
+    profile_b: str,
+    name_a: str,
+    name_b: str,
+    theme: Optional[str],
+    gender_a: str,
+    gender_b: str,
 ):
-    """Fetch linear-scale scores (1–10) from both agents."""
-    score_a = get_rating(model_name, agent_a, history_txt, service_name=service_name)
-    score_b = get_rating(model_name, agent_b, history_txt, service_name=service_name)
-    return score_a, score_b
-
-
-# ───────── internal helper ──────────────────────────────────────────────────
-def _update_history(entry: Tuple[str, str]) -> None:
-    """Append the new message to the module-level history string."""
-    global _cached_history_txt
-    speaker, msg = entry
-    _cached_history_txt += f"\n{speaker}: {msg}"
-    _cached_transcript.append(entry)
+    """
+    Fetch both EDSL agents (persona, pronouns, optional theme) from the
+    agent pool, so repeat dates with the same inputs reuse the same objects.
+    """
+    display_a = name_a.strip() if name_a else "A"
+    display_b = name_b.strip() if name_b else "B"
+
+    # Add theme/location context if provided
+    guidelines = f"You are on a date at {theme}. {GUIDELINES}" if theme else GUIDELINES
+
+    agent_a = get_agent(
+        display_a,
+        profile_a or DEFAULT_PROFILES["default_a"],
+        gender=gender_a,
+        guidelines=guidelines,
+    )
+    agent_b = get_agent(
+        display_b,
+        profile_b or DEFAULT_PROFILES["default_b"],
+        gender=gender_b,
+        guidelines=guidelines,
+    )
+    return agent_a, agent_b, display_a, display_b
+
+
+
+def _context_for_turn(
+    session: DateSession,
+    history_txt: str,
+    policy: ContextPolicy,
+    model_name: str,
+    service_name: Optional[str],
+) -> str:
+    """Apply *policy* (refreshing the rolling summary if due); record tokens."""
+    if policy.mode == "full":
+        chat = history_txt
+    else:
+        # the session's own history: reuse its rendered lines, don't re-split
+        turns = (
+            session.transcript.lines()
+            if history_txt == session.history_txt
+            else split_turns(history_txt)
+        )
+        session.summary, session.summarised = policy.refresh_summary(
+            turns,
+            session.summary,
+            session.summarised,
+            lambda text: get_summary(model_name, text, service_name=service_name),
+        )
+        chat = policy.render(turns, session.summary)
+
+    tokens = estimate_tokens(chat)
+    session.context_tokens.append(tokens)
+    log.debug("turn %d: ~%d context tokens (%s)", len(session.context_tokens), tokens, policy.mode)
+    return chat
+
+
+# ---------------------------------------------------------------------------#
+#  Section 3 – concurrent async engine for sweeps                            #
+# ---------------------------------------------------------------------------#
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+async def run_date_async(
+    *,
+    name_a: str,
+    profile_a: str,
+    gender_a: str,
+    name_b: str,
+    profile_b: str,
+    gender_b: str,
+    rounds: int = 3,
+    theme: Optional[str] = None,
+    model_name: str = "gpt-4o",
+    service_name: Optional[str] = None,
+    semaphore: asyncio.Semaphore | None = None,
+    executor: Executor | None = None,
+    context_policy: Optional[ContextPolicy] = None,
+) -> Tuple[List[Tuple[str, str]], int, int]:
+    """
+    Run one complete **live** date without blocking the event loop.
+
+    Turns are still taken strictly in order (opener, then B/A per round,
+    then one batched job for both ratings); only the blocking EDSL calls
+    are pushed onto *executor*.  Unlike the step-wise helpers above, the `DateSession` is
+    private to this call, so any number of dates can run side by side.
+
+    If *semaphore* is given the date holds one slot for its whole lifetime,
+    which is how `run_many()` caps the number of dates in flight.
+    """
+    loop = asyncio.get_running_loop()
+
+    async with semaphore or contextlib.nullcontext():
+        agent_a, agent_b, display_a, display_b = _build_agents(
+            profile_a, profile_b, name_a, name_b, theme, gender_a, gender_b
+        )
+
+        # private session: never registered in the shared store
+        session = DateSession(
+            agent_a, agent_b, display_a, display_b, model_name, service_name, rounds
+        )
+
+        def call(fn, *args, **kwargs):
+            """Run *fn* on the executor, tagged with this date and its queue wait."""
+            submitted = time.perf_counter()
+
+            def run():
+                queued = time.perf_counter() - submitted
+                with bind(date_id=session.date_id, queue_s=queued, turn=session.index):
+                    return fn(*args, **kwargs)
+
+            return loop.run_in_executor(executor, contextvars.copy_context().run, run)
+
+        opener = await call(get_opener, model_name, agent_a, service_name=service_name)
+        session.add((display_a, opener))
+
+        for turn in range(rounds):
+            for speaker, me, other, display in (
+                ("B", agent_b, agent_a, display_b),
+                ("A", agent_a, agent_b, display_a),
+            ):
+                chat = await call(
+                    _context_for_turn,
+                    session,
+                    session.history_txt,
+                    context_policy or FULL_CONTEXT,
+                    model_name,
+                    service_name,
+                )
+                reply = await call(
+                    get_response,
+                    model_name,
+                    me,
+                    other,
+                    turn,
+                    speaker,
+                    chat,
+                    service_name=service_name,
+                )
+                session.add((display, reply))
+
+        eval_a, eval_b = await call(
+            evaluate_date,
+            model_name,
+            [agent_a, agent_b],
+            session.history_txt,
+            service_name=service_name,
+        )
+        score_a, score_b = eval_a["rating"], eval_b["rating"]
+
+    return session.transcript.entries(), score_a, score_b
+
+
+async def run_many(
+    pairs: Iterable[dict],
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    return_exceptions: bool = False,
+) -> list:
+    """
+    Run many dates concurrently, at most *max_concurrency* at a time.
+
+    Each item of *pairs* is a dict of `run_date_async()` keyword arguments.
+    Results come back in input order; with ``return_exceptions=True`` a
+    failed date yields its exception instead of cancelling the sweep.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # A date awaits each call before making the next (both ratings are one
+    # batched job), so it never has more than one task on the executor: one
+    # thread per in-flight date, instead of the default executor's small cap.
+    with ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="lovedj-date"
+    ) as executor:
+        results = await asyncio.gather(
+            *(
+                run_date_async(**pair, semaphore=semaphore, executor=executor)
+                for pair in pairs
+            ),
+            return_exceptions=return_exceptions,
+        )
+    export_metrics()  # no-op unless LOVEDJ_METRICS_DIR is set
+    return results
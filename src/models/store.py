@@ -0,0 +1,491 @@
+# src/models/store.py
+"""
+Append-only, on-disk store of every finished date.
+
+The Streamlit page forgets a date as soon as it reruns; the store keeps it.
+Records (personas, theme, model, transcript, ratings, timing) go to
+numbered *segments* in one directory:
+
+    index.json               segment list, row counts, time ranges, string dictionaries
+    seg-000001.jsonl.gz      sealed: full records, gzip JSON lines
+    seg-000001.cols          sealed: fixed-width numeric columns (see below)
+    seg-000002.jsonl         active: plain JSON lines, appended one per date
+
+The active segment is sealed (compressed + columnised) once it holds
+*segment_rows* dates.  A crash loses nothing that was flushed: a torn last
+line is skipped, and a half-finished seal is simply redone on the next open.
+
+Analytics never parse JSON for sealed segments.  ``.cols`` files hold one
+contiguous little-endian array per `COLUMNS` entry (strings such as the
+model are dictionary-encoded against the store-wide ``index.json``
+dictionaries) and are read through `mmap`, so `columns()` over millions of
+dates is a handful of memory copies.  Full records stay available through
+`records()`.
+
+One process writes a store directory at a time (the app *or* a CLI sweep);
+any number may read it.
+
+Public API
+----------
+date_record(...)      → the record dict for one finished date
+DateStore(...)        → append / seal / columns / records / stats
+get_store()           → process-wide store configured from the environment
+set_store(store)      → swap it (returns the previous one)
+
+Environment
+-----------
+LOVEDJ_STORE_DIR      store directory (default ``.lovedj_dates``)
+LOVEDJ_STORE=off      do not persist dates
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from src.models.transcript import Transcript
+
+DEFAULT_STORE_DIR = ".lovedj_dates"
+DEFAULT_SEGMENT_ROWS = 10_000
+
+# column name → array typecode
+COLUMNS: Dict[str, str] = {
+    "ts": "d",          # finished at, epoch seconds
+    "score_a": "d",
+    "score_b": "d",
+    "elapsed_s": "d",
+    "rounds": "H",
+    "messages": "H",
+    "chars": "I",       # transcript characters
+    "model": "I",       # code into categories("model")
+    "service": "I",     # code into categories("service")
+    "theme": "I",       # code into categories("theme")
+}
+CATEGORICAL = {"model": "model_name", "service": "service_name", "theme": "theme"}
+MISSING = float("nan")  # numeric columns with no value (e.g. a failed rating)
+
+_COLS_HEADER = struct.Struct("<4sII")  # magic, rows, header-json length
+_COLS_MAGIC = b"LDC1"
+
+
+def date_record(
+    *,
+    transcript: Any,
+    score_a: Any,
+    score_b: Any,
+    model_name: Optional[str],
+    service_name: Optional[str] = None,
+    name_a: str = "",
+    name_b: str = "",
+    profile_a: str = "",
+    profile_b: str = "",
+    gender_a: Optional[str] = None,
+    gender_b: Optional[str] = None,
+    theme: Optional[str] = None,
+    rounds: Optional[int] = None,
+    elapsed_s: Optional[float] = None,
+    date_id: Optional[str] = None,
+    source: str = "app",
+    ts: Optional[float] = None,
+) -> dict:
+    """
+    The stored record for one finished date.
+
+    *transcript* may be a `Transcript` or ``(speaker, text)`` pairs.
+    """
+    if not isinstance(transcript, Transcript):
+        transcript = Transcript(tuple(e) for e in transcript)
+    return {
+        "date_id": date_id or uuid.uuid4().hex[:12],
+        "ts": time.time() if ts is None else ts,
+        "source": source,
+        "name_a": name_a,
+        "name_b": name_b,
+        "profile_a": profile_a,
+        "profile_b": profile_b,
+        "gender_a": gender_a,
+        "gender_b": gender_b,
+        "theme": theme,
+        "model_name": model_name,
+        "service_name": service_name,
+        "rounds": rounds,
+        "transcript": transcript.to_records(),
+        "score_a": score_a,
+        "score_b": score_b,
+        "elapsed_s": elapsed_s,
+    }
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return MISSING
+
+
+class DateStore:
+    """
+    Segmented, append-only date store.
+
+    • `append()` writes one JSON line to the active segment and flushes
+    • `seal()` turns the active segment into ``.jsonl.gz`` + ``.cols``
+    • `columns()` reads numeric/categorical columns (mmap for sealed segments)
+    • ``enabled=False`` makes `append()` a no-op and reads empty
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_STORE_DIR,
+        *,
+        segment_rows: int = DEFAULT_SEGMENT_ROWS,
+        enabled: bool = True,
+    ) -> None:
+        if segment_rows < 1:
+            raise ValueError("segment_rows must be >= 1")
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.enabled = enabled
+        self._lock = threading.RLock()
+        self._index: Optional[dict] = None
+        self._index_mtime: Optional[int] = None
+        self._active_rows = 0
+        self._active_fh = None
+
+    # -- paths / index ------------------------------------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _active_name(self) -> str:
+        return f"seg-{self._index['next']:06d}"
+
+    def _load(self) -> dict:
+        """Read ``index.json`` (again if another process sealed) and recover."""
+        path = self._path("index.json")
+        mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        if self._index is not None and mtime == self._index_mtime:
+            return self._index
+        self._index_mtime = mtime
+        if mtime is not None:
+            with open(path, encoding="utf-8") as fh:
+                self._index = json.load(fh)
+        else:
+            self._index = {"version": 1, "next": 1, "segments": [],
+                           "categories": {name: [] for name in CATEGORICAL}}
+        for seg in self._index["segments"]:  # leftovers of a seal that finished
+            stale = self._path(seg["name"] + ".jsonl")
+            if os.path.exists(stale):
+                os.remove(stale)
+        self._active_rows = sum(1 for _ in self._active_lines())
+        return self._index
+
+    def _save_index(self) -> None:
+        tmp = self._path("index.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self._index, fh, ensure_ascii=False)
+        os.replace(tmp, self._path("index.json"))
+
+    def _active_lines(self) -> Iterator[dict]:
+        path = self._path(self._active_name() + ".jsonl")
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:  # torn last line after a crash
+                    continue
+
+    # -- writing ------------------------------------------------------------
+    def append(self, record: dict) -> None:
+        """Persist one `date_record()`; seals the segment when it is full."""
+        if not self.enabled:
+            return
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._load()
+            if self._active_fh is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._active_fh = open_for_append(self._path(self._active_name() + ".jsonl"))
+            self._active_fh.write(line)
+            self._active_fh.flush()
+            self._active_rows += 1
+            if self._active_rows >= self.segment_rows:
+                self.seal()
+
+    def seal(self) -> Optional[str]:
+        """Compress and columnise the active segment; return its name (if any)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            index = self._load()
+            if self._active_fh is not None:
+                self._active_fh.close()
+                self._active_fh = None
+            rows = list(self._active_lines())
+            if not rows:
+                return None
+            name = self._active_name()
+            with gzip.open(self._path(name + ".jsonl.gz"), "wt", encoding="utf-8") as gz:
+                for row in rows:
+                    gz.write(json.dumps(row, ensure_ascii=False) + "\n")
+            cols = self._columnise(rows, index["categories"])
+            _write_cols(self._path(name + ".cols"), cols, len(rows))
+            ts = cols["ts"]
+            index["segments"].append({
+                "name": name, "rows": len(rows),
+                "t_min": min(ts), "t_max": max(ts),
+            })
+            index["next"] += 1
+            self._save_index()
+            self._index_mtime = os.stat(self._path("index.json")).st_mtime_ns
+            os.remove(self._path(name + ".jsonl"))
+            self._active_rows = 0
+            return name
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active_fh is not None:
+                self._active_fh.close()
+                self._active_fh = None
+
+    # -- reading ------------------------------------------------------------
+    def _columnise(
+        self, rows: Sequence[dict], categories: Dict[str, List[str]]
+    ) -> Dict[str, array]:
+        """Build every column for *rows*; new values are appended to *categories*."""
+        codes = {col: {v: i for i, v in enumerate(categories[col])} for col in CATEGORICAL}
+        out = {name: array(code) for name, code in COLUMNS.items()}
+        for row in rows:
+            transcript = row.get("transcript") or ()
+            out["ts"].append(_number(row.get("ts")))
+            out["score_a"].append(_number(row.get("score_a")))
+            out["score_b"].append(_number(row.get("score_b")))
+            out["elapsed_s"].append(_number(row.get("elapsed_s")))
+            out["rounds"].append(min(int(row.get("rounds") or 0), 0xFFFF))
+            out["messages"].append(min(len(transcript), 0xFFFF))
+            out["chars"].append(min(sum(len(m[1]) for m in transcript), 0xFFFFFFFF))
+            for col, field in CATEGORICAL.items():
+                value = str(row.get(field) or "")
+                code = codes[col].get(value)
+                if code is None:
+                    code = codes[col][value] = len(categories[col])
+                    categories[col].append(value)
+                out[col].append(code)
+        return out
+
+    def columns(
+        self, names: Optional[Iterable[str]] = None, *, since: Optional[float] = None
+    ) -> Dict[str, array]:
+        """
+        Column arrays over every stored date (oldest first).
+
+        Sealed segments are read through `mmap`; only the small active
+        segment is parsed.  Categorical columns hold codes into
+        `categories()`.  *since* drops dates finished before that time.
+        """
+        names = list(COLUMNS) if names is None else list(names)
+        unknown = [n for n in names if n not in COLUMNS]
+        if unknown:
+            raise KeyError(f"unknown column(s): {', '.join(unknown)}")
+        wanted = names + ["ts"] if since is not None and "ts" not in names else names
+        out = {name: array(COLUMNS[name]) for name in wanted}
+        if not self.enabled:
+            return {name: out[name] for name in names}
+        with self._lock:
+            index = self._load()
+            for seg in index["segments"]:
+                if since is not None and seg["t_max"] < since:
+                    continue
+                _read_cols(self._path(seg["name"] + ".cols"), out)
+            categories = {col: list(v) for col, v in index["categories"].items()}
+            active = self._columnise(list(self._active_lines()), categories)
+        for name in wanted:
+            out[name].extend(active[name])
+        if since is not None:
+            keep = [i for i, t in enumerate(out["ts"]) if t >= since]
+            if len(keep) != len(out["ts"]):
+                out = {name: array(col.typecode, [col[i] for i in keep])
+                       for name, col in out.items()}
+        return {name: out[name] for name in names}
+
+    def categories(self, column: str) -> List[str]:
+        """Code → value for a categorical column (sealed and active segments)."""
+        if column not in CATEGORICAL:
+            raise KeyError(f"not a categorical column: {column}")
+        if not self.enabled:
+            return []
+        with self._lock:
+            index = self._load()
+            categories = {col: list(v) for col, v in index["categories"].items()}
+            self._columnise(list(self._active_lines()), categories)
+        return categories[column]
+
+    def records(self, *, since: Optional[float] = None) -> Iterator[dict]:
+        """Every stored record, oldest first (parses JSON – use for drill-down)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            index = self._load()
+            segments = [dict(s) for s in index["segments"]]
+        for seg in segments:
+            if since is not None and seg["t_max"] < since:
+                continue
+            with gzip.open(self._path(seg["name"] + ".jsonl.gz"), "rt", encoding="utf-8") as fh:
+                for line in fh:
+                    row = json.loads(line)
+                    if since is None or _number(row.get("ts")) >= since:
+                        yield row
+        with self._lock:
+            active = list(self._active_lines())
+        for row in active:
+            if since is None or _number(row.get("ts")) >= since:
+                yield row
+
+    def fingerprint(self) -> Tuple[Optional[int], int]:
+        """Cheap change marker (index mtime, active segment size) for caches."""
+        if not self.enabled:
+            return None, 0
+        with self._lock:
+            index = self._load()
+            path = self._path(f"seg-{index['next']:06d}.jsonl")
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            return self._index_mtime, size
+
+    def __len__(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            index = self._load()
+            return sum(s["rows"] for s in index["segments"]) + self._active_rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load() if self.enabled else {"segments": []}
+            size = 0
+            if self.enabled and os.path.isdir(self.directory):
+                size = sum(
+                    os.path.getsize(self._path(f)) for f in os.listdir(self.directory)
+                )
+            return {
+                "enabled": self.enabled,
+                "dates": len(self),
+                "sealed_segments": len(index["segments"]),
+                "active_rows": self._active_rows if self.enabled else 0,
+                "bytes": size,
+            }
+
+
+# --------------------------------------------------------------------------- #
+#  .cols files                                                                #
+# --------------------------------------------------------------------------- #
+def _write_cols(path: str, cols: Dict[str, array], rows: int) -> None:
+    layout: List[Tuple[str, str, int]] = []
+    blobs: List[bytes] = []
+    offset = 0
+    for name, col in cols.items():
+        data = array(col.typecode, col)
+        if sys.byteorder != "little":  # pragma: no cover – stored little-endian
+            data.byteswap()
+        blob = data.tobytes()
+        blob += b"\0" * (-len(blob) % 8)  # keep every column 8-byte aligned
+        layout.append((name, col.typecode, offset))
+        blobs.append(blob)
+        offset += len(blob)
+    head = json.dumps({"columns": layout}).encode("utf-8")
+    head += b" " * (-(len(head) + _COLS_HEADER.size) % 8)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_COLS_HEADER.pack(_COLS_MAGIC, rows, len(head)))
+        fh.write(head)
+        for blob in blobs:
+            fh.write(blob)
+    os.replace(tmp, path)
+
+
+def _read_cols(path: str, out: Dict[str, array]) -> None:
+    """Append the requested columns of one ``.cols`` file to *out*."""
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, rows, head_len = _COLS_HEADER.unpack_from(mm)
+        if magic != _COLS_MAGIC:
+            raise ValueError(f"{path}: not a column file")
+        base = _COLS_HEADER.size + head_len
+        layout = json.loads(mm[_COLS_HEADER.size:base])["columns"]
+        view = memoryview(mm)
+        try:
+            for name, typecode, offset in layout:
+                col = out.get(name)
+                if col is None:
+                    continue
+                start = base + offset
+                chunk = view[start:start + rows * array(typecode).itemsize]
+                if sys.byteorder == "little" and typecode == col.typecode:
+                    col.frombytes(chunk)  # one copy, straight from the page cache
+                else:  # pragma: no cover – big-endian host or an older column type
+                    tmp = array(typecode)
+                    tmp.frombytes(chunk)
+                    if sys.byteorder != "little":
+                        tmp.byteswap()
+                    col.extend(tmp)
+                chunk.release()
+        finally:
+            view.release()
+
+
+def open_for_append(path: str) -> TextIO:
+    """
+    Open the JSONL file *path* for appending.
+
+    A crash's partial last line (no trailing newline) is kept on a line of
+    its own, so the next record is not glued onto it.
+    """
+    torn = False
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb") as fh:
+            fh.seek(-1, os.SEEK_END)
+            torn = fh.read(1) != b"\n"
+    fh = open(path, "a", encoding="utf-8")
+    if torn:
+        fh.write("\n")
+    return fh
+
+
+# --------------------------------------------------------------------------- #
+#  Process-wide instance                                                      #
+# --------------------------------------------------------------------------- #
+_STORE: DateStore | None = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> DateStore:
+    """Lazily build the shared store from the ``LOVEDJ_STORE*`` variables."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = DateStore(
+                    os.environ.get("LOVEDJ_STORE_DIR", DEFAULT_STORE_DIR),
+                    enabled=os.environ.get("LOVEDJ_STORE", "on").lower()
+                    not in {"0", "off", "false", "no"},
+                )
+    return _STORE
+
+
+def set_store(store: DateStore | None) -> DateStore | None:
+    """
+    Install *store* process-wide and return the one it replaced.
+
+    ``None`` resets to the environment-configured store on next use.
+    """
+    global _STORE
+    with _STORE_LOCK:
+        previous, _STORE = _STORE, store
+    return previous
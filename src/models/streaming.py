@@ -0,0 +1,164 @@
+# src/models/streaming.py
+"""
+Chunked (streaming) replies for the live transcript.
+
+A *stream backend* turns one reply request into an iterator of text chunks
+that the UI can paint into a placeholder as they arrive:
+
+• `EDSLStreamer` – the default, and **not** a real stream.  EDSL's Results
+  API only hands back whole completions, so it fetches the reply through
+  `get_response()` (cache, telemetry and the active backend – see
+  `src.models.backends`) and then replays it word by word.  The first
+  word appears only once the whole reply is in.
+• `StubStreamer` – canned/templated text with configurable first-chunk and
+  inter-chunk delays; no network.  Used by the tests and for UI work.
+
+Each streamer says whether its chunks arrive as the model produces them
+(``native``).  `ReplyStream` wraps the chunks, remembers the full text and
+calls a completion hook once the stream is exhausted (the simulation layer
+uses it to append the reply to the date's history).  Time-to-first-chunk is
+recorded in `src.utils.metrics` only for native streams – for a replayed
+reply it would just be the full reply latency under another name.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from src.utils.metrics import METRICS, current_date_id
+
+_WORD = re.compile(r"\s*\S+")
+
+
+def split_chunks(text: str) -> Iterator[str]:
+    """Yield *text* as word-sized chunks that join back to the original."""
+    pos = 0
+    for m in _WORD.finditer(text):
+        pos = m.end()
+        yield m.group(0)
+    if pos < len(text):  # trailing whitespace
+        yield text[pos:]
+
+
+class EDSLStreamer:
+    """Fetch the whole reply via EDSL, then replay it chunk by chunk."""
+
+    native = False  # chunks are replayed, not streamed by the provider
+
+    def stream_reply(
+        self,
+        model_name: str,
+        agent_self: Any,
+        agent_other: Any,
+        turn: int,
+        speaker: str,
+        history_txt: str,
+        *,
+        service_name: Optional[str] = None,
+    ) -> Iterator[str]:
+        from src.models.agents import get_response
+
+        yield from split_chunks(
+            get_response(
+                model_name,
+                agent_self,
+                agent_other,
+                turn,
+                speaker,
+                history_txt,
+                service_name=service_name,
+            )
+        )
+
+
+class StubStreamer:
+    """
+    Offline backend: *reply* may be a fixed string or a callable taking
+    ``(turn, speaker, history_txt)``.  Delays are in seconds.
+    """
+
+    native = True  # stands in for a provider stream
+
+    def __init__(
+        self,
+        reply: str | Callable[[int, str, str], str] = "Nice to meet you – tell me more?",
+        *,
+        first_chunk_delay: float = 0.0,
+        chunk_delay: float = 0.0,
+    ) -> None:
+        self.reply = reply
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+
+    def stream_reply(
+        self,
+        model_name: str,
+        agent_self: Any,
+        agent_other: Any,
+        turn: int,
+        speaker: str,
+        history_txt: str,
+        *,
+        service_name: Optional[str] = None,
+    ) -> Iterator[str]:
+        text = self.reply(turn, speaker, history_txt) if callable(self.reply) else self.reply
+        time.sleep(self.first_chunk_delay)
+        for i, chunk in enumerate(split_chunks(text)):
+            if i and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+
+DEFAULT_STREAMER = EDSLStreamer()
+
+
+class ReplyStream:
+    """
+    Iterable of chunks for one reply.
+
+    After iteration `text` holds the full reply, `first_chunk_s` the
+    time-to-first-chunk (``None`` for a *replayed* reply, whose first chunk
+    only comes after the full completion), and `result` whatever
+    *on_done(text)* returned.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[str],
+        on_done: Optional[Callable[[str], Any]] = None,
+        *,
+        model_name: str = "",
+        service_name: Optional[str] = None,
+        replayed: bool = False,
+    ) -> None:
+        self._chunks = chunks
+        self._on_done = on_done
+        self.model_name = model_name
+        self.service_name = service_name
+        self.replayed = replayed
+        self.text = ""
+        self.first_chunk_s: Optional[float] = None
+        self.result: Any = None
+        self.done = False
+
+    def __iter__(self) -> Iterator[str]:
+        if self.done:
+            raise RuntimeError("ReplyStream can only be consumed once")
+        parts = []
+        t0 = time.perf_counter()
+        timing = not self.replayed
+        for chunk in self._chunks:
+            if timing:
+                timing = False
+                self.first_chunk_s = time.perf_counter() - t0
+                METRICS.record_first_chunk(
+                    self.model_name, self.service_name, self.first_chunk_s, current_date_id()
+                )
+            parts.append(chunk)
+            yield chunk
+        self.text = "".join(parts)
+        self.done = True
+        if self._on_done is not None:
+            self.result = self._on_done(self.text)
@@ -0,0 +1,180 @@
+# src/models/transcript.py
+"""
+Append-only transcript of one date.
+
+Before this, every date carried its messages twice – a list of
+``(speaker, text)`` tuples *and* a ``history_txt`` string rebuilt by hand.
+A `Transcript` is the single source for both:
+
+• messages are the ``(speaker, text)`` tuples callers already hold, stored
+  by reference – appending copies nothing and renders one line
+• `as_history_text()` is memoised and extended incrementally on append,
+  so repeated reads within a turn never re-join the whole history
+• rendered ``"Speaker: text"`` lines (for windowed context) are built
+  lazily, once per message, the first time they are asked for
+• speakers are interned when a transcript is rebuilt from records or
+  bytes; `to_bytes()` / `from_bytes()` give a compact, cheap serialisation
+  for large batches (speaker table + 2-byte ids), `to_records()` /
+  `from_records()` a JSON-friendly one
+
+The rendered history keeps the historical format – one ``"\\nSpeaker: text"``
+per message – so prompts and cache keys are unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+_HEADER = struct.Struct("<4sII")  # magic, message count, header-json length
+_MAGIC = b"LDT1"
+
+
+class Transcript:
+    """Append-only ``(speaker, text)`` buffer with memoised history rendering."""
+
+    __slots__ = ("_entries", "_lines", "_full", "_windows")
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()) -> None:
+        self._entries: List[Tuple[str, str]] = []
+        self._lines: List[str] = []  # "Speaker: text", rendered on demand
+        self._full = ""  # memoised full history, extended on append
+        self._windows: Dict[int, Tuple[int, str]] = {}  # window → (len, text)
+        if entries:
+            self.extend(entries)
+
+    # -- building -----------------------------------------------------------
+    def add(self, entry: Tuple[str, str]) -> str:
+        """Add one ``(speaker, text)`` tuple; return the updated full history text."""
+        speaker, text = entry
+        self._entries.append(entry)
+        self._full = full = f"{self._full}\n{speaker}: {text}"
+        return full
+
+    def append(self, speaker: str, text: str) -> str:
+        """Add one message; return the updated full history text."""
+        return self.add((speaker, text))
+
+    def extend(self, entries: Iterable[Tuple[str, str]]) -> str:
+        """Add many messages with a single re-render; return the full history."""
+        new = [(sys.intern(speaker), text) for speaker, text in entries]
+        if new:
+            self._entries.extend(new)
+            self._full = "".join([self._full] + [f"\n{s}: {t}" for s, t in new])
+        return self._full
+
+    # -- reading ------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return iter(self._entries)
+
+    def __getitem__(self, index: int) -> Tuple[str, str]:
+        return self._entries[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Transcript):
+            return self._entries == other._entries
+        if isinstance(other, list):  # the old list-of-tuples form
+            return self._entries == [tuple(e) for e in other]
+        return NotImplemented
+
+    __hash__ = None  # mutable
+
+    @property
+    def speakers(self) -> Tuple[str, ...]:
+        """Distinct speakers, in order of first appearance."""
+        return tuple(dict.fromkeys(speaker for speaker, _ in self._entries))
+
+    def entries(self) -> List[Tuple[str, str]]:
+        """The messages as a list of ``(speaker, text)`` tuples."""
+        return list(self._entries)
+
+    def lines(self) -> Sequence[str]:
+        """Rendered ``"Speaker: text"`` lines (shared – do not mutate)."""
+        lines = self._lines
+        if len(lines) < len(self._entries):
+            lines.extend(f"{s}: {t}" for s, t in self._entries[len(lines):])
+        return lines
+
+    def as_history_text(self, window: Optional[int] = None) -> str:
+        """
+        The history as ``"\\nSpeaker: text"`` per message.
+
+        With *window*, only the last *window* messages.  Both forms are
+        memoised until the next append; the full form is extended in place
+        rather than re-joined.
+        """
+        n = len(self._entries)
+        if window is None or window >= n:
+            return self._full
+        if window <= 0:
+            return ""
+        cached = self._windows.get(window)
+        if cached is not None and cached[0] == n:
+            return cached[1]
+        text = "".join("\n" + line for line in self.lines()[-window:])
+        self._windows[window] = (n, text)
+        return text
+
+    def __repr__(self) -> str:
+        return f"Transcript({len(self)} messages, speakers={self.speakers})"
+
+    # -- serialisation ------------------------------------------------------
+    def to_records(self) -> List[List[str]]:
+        """JSON-friendly ``[[speaker, text], …]``."""
+        return [[speaker, text] for speaker, text in self]
+
+    @classmethod
+    def from_records(cls, records: Iterable[Sequence[str]]) -> "Transcript":
+        return cls((speaker, text) for speaker, text in records)
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact binary form: header, speaker table, ids, text offsets, UTF-8 blob.
+
+        No per-message JSON – a batch of transcripts packs into little more
+        than its raw text.
+        """
+        blob = [text.encode("utf-8") for _, text in self._entries]
+        offsets = array("I", [0])
+        for b in blob:
+            offsets.append(offsets[-1] + len(b))
+        ids: Dict[str, int] = {}
+        who = array("H", [ids.setdefault(s, len(ids)) for s, _ in self._entries])
+        head = json.dumps(list(ids), ensure_ascii=False).encode("utf-8")
+        n = len(self._entries)
+        if sys.byteorder != "little":  # pragma: no cover – stored little-endian
+            who.byteswap()
+            offsets.byteswap()
+        return b"".join(
+            [_HEADER.pack(_MAGIC, n, len(head)), head,
+             who.tobytes(), offsets.tobytes(), *blob]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Transcript":
+        magic, n, head_len = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("not a serialised Transcript")
+        pos = _HEADER.size
+        speakers = json.loads(data[pos:pos + head_len].decode("utf-8"))
+        pos += head_len
+        who = array("H")
+        who.frombytes(data[pos:pos + 2 * n])
+        pos += 2 * n
+        offsets = array("I")
+        offsets.frombytes(data[pos:pos + 4 * (n + 1)])
+        pos += 4 * (n + 1)
+        if sys.byteorder != "little":  # pragma: no cover
+            who.byteswap()
+            offsets.byteswap()
+        raw = data[pos:]
+        return cls(
+            (speakers[who[i]], raw[offsets[i]:offsets[i + 1]].decode("utf-8"))
+            for i in range(n)
+        )
@@ -50,3 +50,21 @@ RATING_PROMPT = (
     "On a scale of 1–10, how would you rate this date so far? "
     "Respond with just the number 1-10—no extra words."
 )
+
+# Optional debrief questions asked alongside the rating (see evaluate_date)
+SEE_AGAIN_PROMPT = (
+    "{{ history }}\n\n"
+    "Would you like to go on a second date with this person?"
+)
+
+RATIONALE_PROMPT = (
+    "{{ history }}\n\n"
+    "In one or two sentences, how did this date feel to you, and why?"
+)
+
+SUMMARY_PROMPT = (
+    "Here is part of a first-date conversation:\n\n"
+    "{{ history }}\n\n"
+    "Summarise it in ≤ 80 words for someone who will continue the conversation: "
+    "who said what about themselves, any plans or questions left open, and the overall mood."
+)
@@ -0,0 +1,65 @@
+# src/prompts/templates.py
+"""
+Compiled form of the ``{{ slot }}`` prompts in `src.prompts.date`.
+
+EDSL renders the Jinja prompts itself on every job; what *we* can avoid is
+re-parsing them and re-hashing their static parts on every turn.  A
+`PromptTemplate` splits the text into literal segments and slot names once,
+so rendering is a single join.
+
+`PROMPT_VERSION` is a short digest of every prompt in `src.prompts.date`;
+objects built from prompts (questions, cache-key prefixes) are keyed on it
+so an edited prompt never reuses a stale one.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import re
+from typing import Mapping, Tuple
+
+from src.prompts import date as _date
+
+_SLOT = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class PromptTemplate:
+    """A ``{{ slot }}`` template parsed once into literals and slot names."""
+
+    __slots__ = ("text", "_parts", "slots")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        pieces = _SLOT.split(text)  # literal, slot, literal, slot, …, literal
+        self._parts: Tuple[str, ...] = tuple(pieces)
+        self.slots: Tuple[str, ...] = tuple(dict.fromkeys(pieces[1::2]))
+
+    def render(self, fields: Mapping[str, object]) -> str:
+        """Substitute every slot (missing ones render empty, as in Jinja)."""
+        parts = list(self._parts)
+        for i in range(1, len(parts), 2):
+            parts[i] = str(fields.get(parts[i], ""))
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate(slots={self.slots})"
+
+
+@functools.lru_cache(maxsize=256)
+def compile_prompt(text: str) -> PromptTemplate:
+    """Shared compiled template for *text*."""
+    return PromptTemplate(text)
+
+
+def _version() -> str:
+    prompts = sorted(
+        (name, value)
+        for name, value in vars(_date).items()
+        if name.isupper() and isinstance(value, str)
+    )
+    blob = "\x1f".join(f"{name}={value}" for name, value in prompts)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+
+
+PROMPT_VERSION = _version()
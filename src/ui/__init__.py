@@ -5,19 +5,34 @@ Public UI façade – lets the rest of the project keep its old imports.
 All helpers are re-exported so code that does
     from src.ui.streamlit_app import setup_ui, ...
 continues to work.
+
+The re-exports are resolved lazily (PEP 562), so importing one submodule
+does not drag in the others – or Streamlit/EDSL – before they are used.
 """
 
-from .layout import setup_ui, main  # noqa: F401
-from .transcript import (  # noqa: F401
-    create_real_time_transcript_container,
-    update_transcript,
-)
-from .results import display_results  # noqa: F401
-
-__all__ = [
-    "setup_ui",
-    "main",
-    "create_real_time_transcript_container",
-    "update_transcript",
-    "display_results",
-]
+from importlib import import_module
+
+_EXPORTS = {
+    "setup_ui": ".layout",
+    "main": ".layout",
+    "create_real_time_transcript_container": ".transcript",
+    "update_transcript": ".transcript",
+    "stream_transcript": ".transcript",
+    "display_results": ".results",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # cache: later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
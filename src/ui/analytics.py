@@ -0,0 +1,114 @@
+# src/ui/analytics.py
+"""
+Streamlit page summarising every stored date (`src.models.store`).
+
+The store's columns are loaded once per change to the store
+(`st.cache_resource`, keyed on `DateStore.fingerprint()`) and shared
+read-only across reruns; each filter combination's summary is a small
+`st.cache_data` entry.  All aggregation lives in `src.utils.analytics`.
+"""
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import streamlit as st
+
+from src.models.store import get_store
+from src.utils.analytics import load_columns, select, summarise
+
+PERIODS = {
+    "All time": None,
+    "Last 24 hours": 24 * 3600,
+    "Last 7 days": 7 * 24 * 3600,
+    "Last 30 days": 30 * 24 * 3600,
+}
+
+
+@st.cache_resource(show_spinner="Loading stored dates…", max_entries=2)
+def _columns(directory: str, fingerprint: tuple) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]]]:
+    cols, categories = load_columns(get_store())
+    for col in cols.values():
+        col.flags.writeable = False  # shared by every session
+    return cols, categories
+
+
+@st.cache_data(max_entries=64)
+def _summary(
+    directory: str, fingerprint: tuple, since: Optional[float], models: Tuple[str, ...]
+) -> dict:
+    cols, categories = _columns(directory, fingerprint)
+    mask = np.ones(len(cols["ts"]), dtype=bool)
+    if since is not None:
+        mask &= cols["ts"] >= since
+    if models:
+        codes = [i for i, name in enumerate(categories["model"]) if name in models]
+        mask &= np.isin(cols["model"], codes)
+    return summarise(select(cols, mask), categories)
+
+
+def _fmt(value: float, spec: str = ".2f") -> str:
+    return "–" if np.isnan(value) else format(value, spec)
+
+
+# ────────────────────────────────────────────────────────────────────────────
+def main() -> None:
+    st.set_page_config(page_title="🎧 love.dj · analytics", page_icon="🎧", layout="wide")
+    st.title("📊 Date analytics")
+
+    store = get_store()
+    if not store.enabled:
+        st.info("The date store is disabled (`LOVEDJ_STORE=off`).")
+        return
+    fingerprint = store.fingerprint()
+    cols, categories = _columns(store.directory, fingerprint)
+    if not len(cols["ts"]):
+        st.info(
+            "No dates stored yet – finish one on the main page, or run a sweep "
+            "with `python -m src.cli simulate … --store .lovedj_dates`."
+        )
+        return
+
+    # filters ----------------------------------------------------------------
+    c1, c2 = st.columns([1, 3])
+    period = c1.selectbox("Period", list(PERIODS))
+    models = c2.multiselect("Models", sorted(m for m in categories["model"] if m))
+    window = PERIODS[period]
+    since = None if window is None else (time.time() - window) // 60 * 60  # minute steps
+    summary = _summary(store.directory, fingerprint, since, tuple(sorted(models)))
+
+    if not summary["dates"]:
+        st.info("No stored dates match these filters.")
+        return
+
+    # headline numbers -------------------------------------------------------
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Dates", f"{summary['dates']:,}")
+    m2.metric("Mean rating", _fmt(summary["rating_mean"]))
+    m3.metric("Median date time", f"{_fmt(summary['latency']['p50'], '.1f')} s")
+    m4.metric("p95 date time", f"{_fmt(summary['latency']['p95'], '.1f')} s")
+
+    # distributions ----------------------------------------------------------
+    st.subheader("Rating distribution")
+    st.bar_chart(summary["rating_histogram"], x="rating", y=["A", "B"])
+
+    st.subheader("Ratings by model")
+    st.dataframe(summary["by_model"], hide_index=True, use_container_width=True)
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("By theme")
+        st.dataframe(summary["by_theme"], hide_index=True, use_container_width=True)
+    with right:
+        st.subheader("By round count")
+        st.dataframe(summary["by_rounds"], hide_index=True, use_container_width=True)
+
+    st.subheader("Date time by model (s)")
+    st.dataframe(summary["latency_by_model"], hide_index=True, use_container_width=True)
+
+    stats = store.stats()
+    st.caption(
+        f"{stats['dates']:,} dates in `{store.directory}` · "
+        f"{stats['sealed_segments']} sealed segments · {stats['bytes'] / 1e6:.1f} MB"
+    )
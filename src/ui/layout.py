@@ -4,34 +4,66 @@ Streamlit front-end that **streams** each EDSL reply.
 
 It uses the live helpers from `src.models.simulation` and the small
 avatar/emoji transcript UI from `src.ui.transcript`.
+
+The inputs sit in an `st.form`, so typing in a field does not rerun the
+script (or interrupt a date that is still playing) until the button is
+pressed.  The model select-box options are an `st.cache_resource` entry
+keyed on the catalogue version, and the last finished date is kept in
+`st.session_state` and redrawn on later reruns instead of disappearing.
 """
 from __future__ import annotations
 
+import logging
 import time
 import streamlit as st
 from typing import List, Tuple
 
-from src.utils.models import format_models_for_selectbox, get_service_map
+from src.utils.models import (
+    catalogue_version,
+    format_models_for_selectbox,
+    get_service_map,
+)
 from src.ui.transcript import (
     create_real_time_transcript_container,
+    stream_transcript,
     update_transcript,
 )
 from src.ui.results import display_results
 from src.utils.models import DEFAULT_MODEL_LABEL
+from src.utils.metrics import export_metrics
 from src.models.simulation import (
     initialize_date,
     get_opening_message,
-    get_next_response,
     get_date_ratings,
+    get_session,
+    ReplyPipeline,
 )
+from src.models.agents import pool_summary
+from src.models.hedging import get_hedger, hedging
+from src.models.store import date_record, get_store
+
+log = logging.getLogger(__name__)
 
 
 # ────────────────────────────────────────────────────────────────────────────
+@st.cache_resource(max_entries=2)
+def _model_options(version: int) -> Tuple[List[str], int]:
+    """Select-box labels and the default model's index for one catalogue version."""
+    opts = format_models_for_selectbox()
+    return opts, (opts.index(DEFAULT_MODEL_LABEL) if DEFAULT_MODEL_LABEL in opts else 0)
+
+
 def _form() -> dict:
     """Render input widgets and return the selections."""
     st.set_page_config(page_title="🎧 love.dj", page_icon="🎧")
     st.title("🎧 love.dj")
 
+    with st.form("date"):
+        return _fields()
+
+
+def _fields() -> dict:
+    """The form's widgets (everything up to the submit button)."""
     # profiles ---------------------------------------------------------------
     c1, c2 = st.columns(2)
     with c1:
@@ -84,17 +116,26 @@ def _form() -> dict:
     with c3:
         rounds = st.slider("Back-and-forth rounds", 1, 6, 3)
 
-        opts = format_models_for_selectbox()
-        default_ix = (
-            opts.index(DEFAULT_MODEL_LABEL) if DEFAULT_MODEL_LABEL in opts else 0
-        )
+        opts, default_ix = _model_options(catalogue_version())
         chosen = st.selectbox("Language model", opts, index=default_ix)
         model_name = chosen.rsplit(" ", 1)[0]  # strip " [provider]"
 
     with c4:
         theme = st.text_input("Location / theme (optional)")
+        stream = st.checkbox(
+            "Reveal replies word by word",
+            value=True,
+            help="EDSL returns each reply whole; this paints it in gradually "
+                 "instead of all at once. It does not make the first word arrive sooner.",
+        )
+        hedge = st.checkbox(
+            "Hedge slow replies",
+            value=get_hedger().policy.enabled,
+            help="If a reply takes longer than the model's recent p95, also ask an "
+                 "equivalent model and use whichever answers first (costs extra calls).",
+        )
 
-    go = st.button("🚀 Spin the decks")
+    go = st.form_submit_button("🚀 Spin the decks")
 
     return dict(
         name_a=name_a,
@@ -108,22 +149,116 @@ def _form() -> dict:
         rounds=rounds,
         theme=theme,
         model_name=model_name,
+        stream=stream,
+        hedge=hedge,
         go=go,
     )
 
 
+# ────────────────────────────────────────────────────────────────────────────
+RENDER_PACE_S = 0.02  # cosmetic per-chunk delay; the next reply is already in flight
+
+
+def _paced(chunks):
+    """Yield *chunks* with a small typing delay – render-side only."""
+    for chunk in chunks:
+        yield chunk
+        time.sleep(RENDER_PACE_S)
+
+
+def _equivalent_model(model_name: str, provider_map: dict):
+    """Fastest equivalent of *model_name* whose service is known, or ``None``."""
+    hedger = get_hedger()
+    for model, service in hedger.router.rank(model_name, None, hedger.tracker):
+        service = service or provider_map.get(model)
+        if model != model_name and service:
+            return model, service
+    return None
+
+
+def _persist(ui: dict, session, service: str, score_a, score_b, elapsed_s: float) -> None:
+    """Append the finished date to the date store (no-op if ``LOVEDJ_STORE=off``)."""
+    try:
+        get_store().append(
+            date_record(
+                transcript=session.transcript,
+                score_a=score_a,
+                score_b=score_b,
+                model_name=ui["model_name"],
+                service_name=service,
+                name_a=ui["name_a"],
+                name_b=ui["name_b"],
+                profile_a=f"{ui['age_a']} year old {ui['profile_a']}",
+                profile_b=f"{ui['age_b']} year old {ui['profile_b']}",
+                gender_a=ui["gender_a"],
+                gender_b=ui["gender_b"],
+                theme=ui["theme"],
+                rounds=ui["rounds"],
+                elapsed_s=round(elapsed_s, 3),
+                date_id=session.date_id,
+            )
+        )
+    except OSError as exc:
+        st.warning(f"Couldn't save this date to the local store: {exc}")
+
+
+LAST_DATE_KEY = "last_date"
+
+
+def _remember(ui: dict, messages, score_a, score_b) -> None:
+    """Keep the finished date in this browser session for later reruns."""
+    st.session_state[LAST_DATE_KEY] = dict(
+        inputs={k: v for k, v in ui.items() if k != "go"},
+        messages=list(messages),
+        score_a=score_a,
+        score_b=score_b,
+    )
+
+
+def _show_last_date(ui: dict) -> None:
+    """Redraw the last finished date (if any) without calling a model."""
+    last = st.session_state.get(LAST_DATE_KEY)
+    if last is None:
+        return
+    inputs = last["inputs"]
+    if inputs != {k: v for k, v in ui.items() if k != "go"}:
+        st.caption("Last date, run with different settings:")
+    container, placeholders, messages = create_real_time_transcript_container()
+    for speaker, text in last["messages"]:
+        update_transcript(
+            container, placeholders, messages, speaker, text,
+            inputs["gender_a"], inputs["gender_b"],
+        )
+    display_results(
+        transcript=[],
+        score_a=last["score_a"],
+        score_b=last["score_b"],
+        name_a=inputs["name_a"],
+        name_b=inputs["name_b"],
+        model_name=inputs["model_name"],
+    )
+
+
 # ────────────────────────────────────────────────────────────────────────────
 def main() -> None:
     ui = _form()
     if not ui["go"]:
+        _show_last_date(ui)
         return
 
     # provider lookup --------------------------------------------------------
     provider_map = get_service_map()
     service = provider_map.get(ui["model_name"])
     if service is None:
-        st.error("Couldn't find which service hosts that model. Pick another.")
-        return
+        equivalent = _equivalent_model(ui["model_name"], provider_map)
+        if equivalent is None:
+            st.error("Couldn't find which service hosts that model. Pick another.")
+            return
+        st.warning(
+            f"Couldn't find which service hosts {ui['model_name']}; "
+            f"using the equivalent **{equivalent[0]}** instead."
+        )
+        ui["model_name"], service = equivalent
 
     st.info(f"Using **{ui['model_name']}** via *{service}* service…")
 
@@ -135,6 +270,7 @@ def main() -> None:
     enhanced_profile_b = f"{ui['age_b']} year old {ui['profile_b']}"
     
     # initialise agents & opener --------------------------------------------
+    started = time.perf_counter()
     agent_a, agent_b, disp_a, disp_b = initialize_date(
         enhanced_profile_a,
         enhanced_profile_b,
@@ -148,71 +284,50 @@ def main() -> None:
         ui["rounds"],
     )
 
+    session = get_session()  # held here: once rated it may be evicted
     opener_entry, history = get_opening_message(
         agent_a, disp_a, ui["model_name"], service
     )
-    update_transcript(
-        container,
-        placeholders,
-        messages,
-        "A",
-        opener_entry[1],
-        ui["gender_a"],
-        ui["gender_b"],
-    )
 
     # dialogue rounds --------------------------------------------------------
-    for turn in range(ui["rounds"]):
-        time.sleep(0.4)
-
-        # B's reply
-        b_entry, history = get_next_response(
-            agent_b,
-            agent_a,
-            disp_b,
-            turn,
-            "B",
-            history,
-            ui["model_name"],
-            service,
-        )
+    # The pipeline starts B's first request now, while the opener is painted,
+    # and each later request as soon as the previous reply text is known.
+    # Its worker copies the hedging choice made here.
+    with hedging(ui["hedge"]), ReplyPipeline(
+        agent_a, agent_b, disp_a, disp_b, ui["rounds"], history,
+        ui["model_name"], service,
+    ) as pipeline:
         update_transcript(
             container,
             placeholders,
             messages,
-            "B",
-            b_entry[1],
-            ui["gender_a"],
-            ui["gender_b"],
-        )
-
-        time.sleep(0.4)
-
-        # A's reply
-        a_entry, history = get_next_response(
-            agent_a,
-            agent_b,
-            disp_a,
-            turn,
             "A",
-            history,
-            ui["model_name"],
-            service,
-        )
-        update_transcript(
-            container,
-            placeholders,
-            messages,
-            "A",
-            a_entry[1],
+            opener_entry[1],
             ui["gender_a"],
             ui["gender_b"],
         )
 
+        for reply in pipeline:
+            if ui["stream"]:
+                stream_transcript(
+                    container, placeholders, messages, reply.speaker, _paced(reply),
+                    ui["gender_a"], ui["gender_b"],
+                )
+            else:
+                update_transcript(
+                    container, placeholders, messages, reply.speaker, "".join(reply),
+                    ui["gender_a"], ui["gender_b"],
+                )
+            _, history = reply.result
+
     # ratings ----------------------------------------------------------------
     score_a, score_b = get_date_ratings(
         agent_a, agent_b, history, ui["model_name"], service
     )
+    export_metrics()  # no-op unless LOVEDJ_METRICS_DIR is set
+    _persist(ui, session, service, score_a, score_b, time.perf_counter() - started)
+    _remember(ui, messages, score_a, score_b)
+    log.info("Object reuse since start: %s", pool_summary() or "none yet")
 
     display_results(
         transcript=[],  # we already printed lines live
@@ -222,6 +337,8 @@ def main() -> None:
         name_b=ui["name_b"],
         model_name=ui["model_name"],
     )
+    if ui["hedge"] and get_hedger().summary():
+        st.caption(f"Since this server started: {get_hedger().summary()}.")
 
 
 # convenience:  python -m src.ui.layout  -> launches Streamlit
@@ -234,4 +351,5 @@ if __name__ == "__main__":
 # ------------------------------------------------------------------ #
 #  Back-compat: keep the old public name "setup_ui"                  #
 # ------------------------------------------------------------------ #
-setup_ui = _form  # ← add this line
\ No newline at end of file
+setup_ui = _form  # ← add this line
+
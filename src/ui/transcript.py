@@ -1,6 +1,8 @@
 # src/ui/transcript.py
 import streamlit as st
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
+
+TYPING = "…"  # shown until the first chunk of a streamed reply arrives
 
 
 def create_real_time_transcript_container():
@@ -12,6 +14,22 @@ def create_real_time_transcript_container():
     return container, placeholders, messages
 
 
+def _placeholder(container, placeholders, messages):
+    """Pick (or make) the placeholder for the next message."""
+    if len(placeholders) <= len(messages):
+        placeholders.append(container.empty())
+    return placeholders[len(messages)]
+
+
+def _line(speaker: str, text: str, gender_a: str, gender_b: str) -> str:
+    # quick emoji from pronouns
+    def emoji(gen: str) -> str:
+        return {"he/him": "👨", "she/her": "👩"}.get(gen, "🧑")
+
+    icon = emoji(gender_a if speaker == "A" else gender_b)
+    return f"**{icon} {speaker}:** {text}"
+
+
 def update_transcript(
     container,
     placeholders,
@@ -22,16 +40,32 @@ def update_transcript(
     gender_b="she/her",
 ):
     """Append a new line of dialogue to the transcript."""
-    # pick or make placeholder
-    if len(placeholders) <= len(messages):
-        placeholders.append(container.empty())
-    ph = placeholders[len(messages)]
+    ph = _placeholder(container, placeholders, messages)
+    ph.markdown(_line(speaker, text, gender_a, gender_b))
+    messages.append((speaker, text))
 
-    # quick emoji from pronouns
-    def emoji(gen: str) -> str:
-        return {"he/him": "👨", "she/her": "👩"}.get(gen, "🧑")
 
-    icon = emoji(gender_a if speaker == "A" else gender_b)
+def stream_transcript(
+    container,
+    placeholders,
+    messages,
+    speaker: str,
+    chunks: Iterable[str],
+    gender_a="he/him",
+    gender_b="she/her",
+) -> str:
+    """
+    Append a line of dialogue that arrives in *chunks*, redrawing the same
+    placeholder in place as each chunk lands.  Returns the full text.
+    """
+    ph = _placeholder(container, placeholders, messages)
+    ph.markdown(_line(speaker, TYPING, gender_a, gender_b))
+
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        ph.markdown(_line(speaker, text + TYPING, gender_a, gender_b))
 
-    ph.markdown(f"**{icon} {speaker}:** {text}")
+    ph.markdown(_line(speaker, text, gender_a, gender_b))
     messages.append((speaker, text))
+    return text
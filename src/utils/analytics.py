@@ -0,0 +1,153 @@
+# src/utils/analytics.py
+"""
+Vectorised aggregation over the date store (`src.models.store`).
+
+`load_columns()` turns the store's column arrays into NumPy arrays without
+copying them again, and every aggregate below is a handful of whole-array
+operations (``bincount``, ``argsort``) – no Python loop per date
+– so a million stored dates summarise in well under a second.
+
+Ratings are pooled: each date contributes both ``score_a`` and
+``score_b``; unrated dates (NaN) are ignored.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models.store import CATEGORICAL, DateStore
+
+RATING_VALUES = np.arange(1, 11)
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+
+def load_columns(
+    store: DateStore, *, since: Optional[float] = None
+) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]]]:
+    """The store's columns as NumPy arrays, plus the categorical dictionaries."""
+    cols = store.columns(since=since)
+    arrays = {name: np.frombuffer(col, dtype=col.typecode) for name, col in cols.items()}
+    categories = {name: store.categories(name) for name in CATEGORICAL}
+    return arrays, categories
+
+
+def select(cols: Dict[str, np.ndarray], mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """Every column restricted to the rows where *mask* is true."""
+    return {name: col[mask] for name, col in cols.items()}
+
+
+def pooled_ratings(cols: Dict[str, np.ndarray], key: str) -> Tuple[np.ndarray, np.ndarray]:
+    """``(keys, ratings)`` with both agents' ratings stacked, keyed by *key*."""
+    keys = np.concatenate([cols[key], cols[key]])
+    ratings = np.concatenate([cols["score_a"], cols["score_b"]])
+    return keys, ratings
+
+
+def rating_histogram(ratings: np.ndarray) -> np.ndarray:
+    """Counts of each rating 1–10 (fractional ratings rounded, NaN dropped)."""
+    r = ratings[~np.isnan(ratings)]
+    r = np.clip(np.rint(r), 1, 10).astype(np.intp)
+    return np.bincount(r - 1, minlength=len(RATING_VALUES))[: len(RATING_VALUES)]
+
+
+def group_stats(keys: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Count, mean and sample variance of *values* per distinct key.
+
+    Keys are the store's small non-negative codes, so groups are
+    `bincount` slots – no sort.
+    """
+    ok = ~np.isnan(values)
+    k, v = keys[ok].astype(np.intp), values[ok]
+    n = np.bincount(k)
+    total = np.bincount(k, weights=v, minlength=len(n))
+    groups = np.flatnonzero(n)
+    mean = total / np.maximum(n, 1)
+    sq = np.bincount(k, weights=(v - mean[k]) ** 2, minlength=len(n))
+    n, mean, sq = n[groups], mean[groups], sq[groups]
+    var = np.full(len(groups), np.nan)
+    var[n > 1] = sq[n > 1] / (n[n > 1] - 1)
+    return {"group": groups, "count": n, "mean": mean, "var": var}
+
+
+def group_percentiles(
+    keys: np.ndarray, values: np.ndarray, percentiles: Sequence[float] = LATENCY_PERCENTILES
+) -> Dict[str, np.ndarray]:
+    """
+    Per-key percentiles of *values* (linear interpolation, as `np.percentile`).
+
+    One sort for all groups: rows are ordered by (key, value), and every
+    percentile is then an index into each group's contiguous slice.
+    """
+    ok = ~np.isnan(values)
+    k, v = keys[ok], values[ok]
+    order = np.argsort(v)
+    order = order[np.argsort(k[order], kind="stable")]  # radix sort on the int codes
+    k, v = k[order], v[order]
+    groups, start, count = np.unique(k, return_index=True, return_counts=True)
+    q = np.asarray(percentiles, dtype=float) / 100.0
+    pos = start[:, None] + (count[:, None] - 1) * q[None, :]
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, (start + count - 1)[:, None])
+    frac = pos - lo
+    out = {"group": groups, "count": count}
+    if len(v):
+        table = v[lo] + (v[hi] - v[lo]) * frac
+    else:
+        table = np.empty((0, len(q)))
+    for j, p in enumerate(percentiles):
+        out[f"p{p:g}"] = table[:, j]
+    return out
+
+
+def percentiles(values: np.ndarray, ps: Iterable[float] = LATENCY_PERCENTILES) -> Dict[str, float]:
+    """Overall percentiles of *values* (NaN ignored; NaN if there are none)."""
+    ps = list(ps)
+    v = values[~np.isnan(values)]
+    if not len(v):
+        return {f"p{p:g}": float("nan") for p in ps}
+    return {f"p{p:g}": float(x) for p, x in zip(ps, np.percentile(v, ps))}
+
+
+def summarise(
+    cols: Dict[str, np.ndarray], categories: Dict[str, List[str]]
+) -> Dict[str, object]:
+    """
+    Everything the analytics page shows, as plain lists/dicts.
+
+    Per-model, per-theme and per-round tables carry rating count / mean /
+    variance; ``latency_by_model`` carries per-model date latency percentiles.
+    """
+    _, ratings = pooled_ratings(cols, "model")
+    out: Dict[str, object] = {
+        "dates": int(len(cols["ts"])),
+        "rating_mean": float(np.nanmean(ratings)) if np.any(~np.isnan(ratings)) else float("nan"),
+        "rating_histogram": {
+            "rating": RATING_VALUES.tolist(),
+            "A": rating_histogram(cols["score_a"]).tolist(),
+            "B": rating_histogram(cols["score_b"]).tolist(),
+        },
+        "latency": percentiles(cols["elapsed_s"]),
+    }
+    for key in ("model", "theme", "rounds"):
+        stats = group_stats(*pooled_ratings(cols, key))
+        names = stats["group"].tolist()
+        if key in categories:
+            names = [categories[key][c] or "—" for c in names]
+        out[f"by_{key}"] = {
+            key: names,
+            "ratings": stats["count"].tolist(),
+            "mean": np.round(stats["mean"], 3).tolist(),
+            "variance": np.round(stats["var"], 3).tolist(),
+        }
+
+    lat = group_percentiles(cols["model"], cols["elapsed_s"])
+    names = [categories["model"][c] or "—" for c in lat["group"].tolist()]
+    out["latency_by_model"] = {
+        "model": names,
+        "dates": lat["count"].tolist(),
+        **{p: np.round(lat[p], 2).tolist() for p in lat if p.startswith("p")},
+    }
+    return out
@@ -0,0 +1,214 @@
+# src/utils/logs.py
+"""
+Non-blocking, structured logging for the app.
+
+`setup_logging()` – called once by each entry point (``app.py``, the
+analytics page, ``python -m src.cli``) – installs a single
+`QueueHandler` on the root logger.  Emitting a record on the request path
+only puts it on an in-memory queue; a `QueueListener` thread does the
+formatting and the disk I/O:
+
+• stderr gets the familiar one-line text format,
+• the log file gets one JSON object per line – time, level, logger,
+  message, the ``date_id`` / ``turn`` bound by `src.utils.metrics.bind()`
+  on the emitting thread, and the exception text if any – and rotates by
+  size (``RotatingFileHandler``) instead of growing without bound.
+
+High-volume DEBUG lines are sampled: only every N-th record per message
+template is kept (INFO and above are never dropped).  If the writer falls
+behind and the queue fills, new records are dropped and counted rather
+than blocking the caller.
+
+Environment
+-----------
+LOVEDJ_LOG_LEVEL         root level (default ``INFO``)
+LOVEDJ_LOG_FILE          JSON log path (default ``edsl_models.log``)
+LOVEDJ_LOG_MAX_BYTES     rotate after this many bytes (default 10 MB)
+LOVEDJ_LOG_BACKUPS       rotated files kept (default 5)
+LOVEDJ_LOG_DEBUG_SAMPLE  share of DEBUG records kept (default 0.1)
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from src.utils.metrics import current_date_id, current_turn
+
+LOG_FORMAT = "%(asctime)s  %(levelname)s  %(name)s  %(message)s"
+DEFAULT_LOG_FILE = "edsl_models.log"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+DEFAULT_DEBUG_SAMPLE = 0.1
+QUEUE_SIZE = 10_000
+
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "date_id", "turn",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; ``extra=`` fields are included as-is."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        date_id = getattr(record, "date_id", None)
+        if date_id is not None:
+            out["date_id"] = date_id
+        turn = getattr(record, "turn", None)
+        if turn is not None:
+            out["turn"] = turn
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Keep every DEBUG record's first and then every *every*-th, per template."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counters: Dict[tuple, Iterator[int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        if not self.every:
+            return False
+        key = (record.name, record.msg)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        return next(counter) % self.every == 0
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records with their date/turn context, never blocking.
+
+    `prepare()` runs on the emitting thread, so the context variables are
+    read there; the message is rendered once and the exception flattened
+    to text so the record pickles and formats anywhere.
+    """
+
+    def __init__(self, q: "queue.Queue") -> None:
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        record.date_id = current_date_id()
+        record.turn = current_turn()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# --------------------------------------------------------------------------- #
+#  Setup / teardown                                                           #
+# --------------------------------------------------------------------------- #
+_LISTENER: logging.handlers.QueueListener | None = None
+_HANDLER: ContextQueueHandler | None = None
+_LOCK = threading.Lock()
+_ATEXIT_REGISTERED = False
+
+
+def setup_logging(
+    path: Optional[str] = None,
+    *,
+    level: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    backups: Optional[int] = None,
+    debug_sample: Optional[float] = None,
+) -> None:
+    """
+    Route the root logger through a background writer (stderr + JSON file).
+
+    Arguments default to the ``LOVEDJ_LOG_*`` environment variables.
+    Repeated calls are no-ops until `shutdown_logging()`.
+    """
+    global _LISTENER, _HANDLER, _ATEXIT_REGISTERED
+    env = os.environ.get
+    with _LOCK:
+        if _LISTENER is not None:
+            return
+        path = path or env("LOVEDJ_LOG_FILE", DEFAULT_LOG_FILE)
+        level = (level or env("LOVEDJ_LOG_LEVEL", "INFO")).upper()
+        max_bytes = max_bytes if max_bytes is not None else int(
+            env("LOVEDJ_LOG_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        backups = backups if backups is not None else int(env("LOVEDJ_LOG_BACKUPS", DEFAULT_BACKUPS))
+        if debug_sample is None:
+            debug_sample = float(env("LOVEDJ_LOG_DEBUG_SAMPLE", DEFAULT_DEBUG_SAMPLE))
+
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        logfile = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+        )
+        logfile.setFormatter(JsonFormatter())
+
+        q: "queue.Queue" = queue.Queue(QUEUE_SIZE)
+        handler = ContextQueueHandler(q)
+        handler.addFilter(DebugSampler(debug_sample))
+        listener = logging.handlers.QueueListener(q, console, logfile)
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(handler)
+        listener.start()
+        _LISTENER, _HANDLER = listener, handler
+        if not _ATEXIT_REGISTERED:
+            atexit.register(shutdown_logging)  # flush what is still queued
+            _ATEXIT_REGISTERED = True
+    logging.getLogger(__name__).info("Logging to %s (JSON, rotated at %d bytes)", path, max_bytes)
+
+
+def shutdown_logging() -> None:
+    """Flush the queue, stop the writer thread and detach the handler."""
+    global _LISTENER, _HANDLER
+    with _LOCK:
+        listener, handler, _LISTENER, _HANDLER = _LISTENER, _HANDLER, None, None
+    if listener is None:
+        return
+    logging.getLogger().removeHandler(handler)
+    listener.stop()  # drains what is already queued
+    for h in listener.handlers:
+        h.close()
+    if handler.dropped:
+        logging.getLogger(__name__).warning("%d log records dropped (queue full)", handler.dropped)
+
+
+def dropped_records() -> int:
+    """Records discarded because the writer fell behind (since setup)."""
+    return _HANDLER.dropped if _HANDLER is not None else 0
@@ -0,0 +1,342 @@
+# src/utils/metrics.py
+"""
+Per-call telemetry for the EDSL hot path.
+
+Every opener / reply / rating / summary call made through
+`src.models.agents` is wrapped in `track_call()`, which records
+
+    wall time · queue time · prompt/completion tokens · cache hit · cost
+
+and attributes it to the current *date* (a context variable set with
+`bind()`).  Natively streamed replies also report their time-to-first-chunk
+via `record_first_chunk()` (replies replayed from a whole completion, as
+with EDSL, do not).  Totals are kept per model and per date, and can be exported as
+
+• JSON lines   – one object per call, appended   (``calls.jsonl``)
+• Prometheus   – text exposition format, rewritten (``lovedj.prom``)
+
+Export is explicit (`export()` / `export_metrics()`), so the request path
+never touches the disk.  Set ``LOVEDJ_METRICS_DIR`` to enable the exports
+done automatically at the end of each date.  Per-call records wait for the
+next JSONL export in a bounded buffer; when nothing exports them the oldest
+are dropped (and counted) so a long-running server does not grow.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+# USD per 1M tokens (input, output) – used only when EDSL reports no cost
+MODEL_PRICES_PER_MTOK: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "claude-3-7-sonnet-20250219": (3.00, 15.00),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+}
+
+MAX_DATES = 10_000  # per-date totals kept in memory (oldest dropped first)
+MAX_PENDING = 10_000  # call records awaiting JSONL export (oldest dropped first)
+
+_DATE_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "lovedj_date_id", default=None
+)
+_QUEUE_S: contextvars.ContextVar[float] = contextvars.ContextVar(
+    "lovedj_queue_s", default=0.0
+)
+_TURN: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "lovedj_turn", default=None
+)
+_ACTIVE: contextvars.ContextVar[Optional["CallRecord"]] = contextvars.ContextVar(
+    "lovedj_active_call", default=None
+)
+
+
+@dataclass
+class CallRecord:
+    kind: str
+    model: str
+    service: Optional[str]
+    date_id: Optional[str] = None
+    started: float = field(default_factory=time.time)
+    wall_s: float = 0.0
+    queue_s: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cost_usd: Optional[float] = None
+    cache_hit: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class Totals:
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    wall_s: float = 0.0
+    queue_s: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    streams: int = 0
+    first_chunk_s: float = 0.0  # summed time-to-first-chunk over `streams`
+
+    def add(self, rec: CallRecord) -> None:
+        self.calls += 1
+        self.errors += rec.error is not None
+        self.cache_hits += rec.cache_hit
+        self.wall_s += rec.wall_s
+        self.queue_s += rec.queue_s
+        self.prompt_tokens += rec.prompt_tokens or 0
+        self.completion_tokens += rec.completion_tokens or 0
+        self.cost_usd += rec.cost_usd or 0.0
+
+
+def estimate_cost(
+    model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]
+) -> Optional[float]:
+    """Price a call from the token counts, if the model is in the table."""
+    prices = MODEL_PRICES_PER_MTOK.get(model)
+    if prices is None or (prompt_tokens is None and completion_tokens is None):
+        return None
+    return ((prompt_tokens or 0) * prices[0] + (completion_tokens or 0) * prices[1]) / 1e6
+
+
+class Metrics:
+    """Thread-safe collector with per-model and per-date roll-ups."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Deque[CallRecord] = deque(maxlen=MAX_PENDING)  # not yet in JSONL
+        self.dropped = 0  # records pushed out of `_pending` before an export
+        self.by_model: Dict[Tuple[str, str, Optional[str]], Totals] = {}
+        self.by_date: "OrderedDict[str, Totals]" = OrderedDict()
+
+    def record(self, rec: CallRecord) -> None:
+        if rec.cost_usd is None and not rec.cache_hit:
+            rec.cost_usd = estimate_cost(rec.model, rec.prompt_tokens, rec.completion_tokens)
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(rec)
+            self.by_model.setdefault((rec.kind, rec.model, rec.service), Totals()).add(rec)
+            if rec.date_id is not None:
+                totals = self.by_date.get(rec.date_id)
+                if totals is None:
+                    totals = self.by_date[rec.date_id] = Totals()
+                    while len(self.by_date) > MAX_DATES:
+                        self.by_date.popitem(last=False)
+                totals.add(rec)
+
+    def record_first_chunk(
+        self,
+        model: str,
+        service: Optional[str],
+        seconds: float,
+        date_id: Optional[str] = None,
+    ) -> None:
+        """Record time-to-first-chunk for one streamed reply."""
+        with self._lock:
+            targets = [self.by_model.setdefault(("stream", model, service), Totals())]
+            if date_id is not None and date_id in self.by_date:
+                targets.append(self.by_date[date_id])
+            for totals in targets:
+                totals.streams += 1
+                totals.first_chunk_s += seconds
+
+    def date_totals(self, date_id: str) -> Totals:
+        with self._lock:
+            return self.by_date.get(date_id, Totals())
+
+    def model_totals(self) -> Dict[str, Totals]:
+        """Totals per model across call kinds."""
+        out: Dict[str, Totals] = {}
+        with self._lock:
+            for (_, model, _), t in self.by_model.items():
+                agg = out.setdefault(model, Totals())
+                for k, v in asdict(t).items():
+                    setattr(agg, k, getattr(agg, k) + v)
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self.dropped = 0
+            self.by_model.clear()
+            self.by_date.clear()
+
+    # -- exporters ----------------------------------------------------------
+    def write_jsonl(self, path: str) -> int:
+        """Append calls recorded since the last write; return how many."""
+        with self._lock:
+            pending, self._pending = self._pending, deque(maxlen=MAX_PENDING)
+        if pending:
+            with open(path, "a", encoding="utf-8") as fh:
+                for rec in pending:
+                    fh.write(json.dumps(asdict(rec)) + "\n")
+        return len(pending)
+
+    def prometheus_text(self) -> str:
+        """Render the per-model totals in Prometheus text exposition format."""
+        series = [
+            ("lovedj_calls_total", "counter", "EDSL calls.", "calls"),
+            ("lovedj_call_errors_total", "counter", "EDSL calls that raised.", "errors"),
+            ("lovedj_cache_hits_total", "counter", "Calls served from the response cache.", "cache_hits"),
+            ("lovedj_call_seconds_total", "counter", "Wall time spent in calls.", "wall_s"),
+            ("lovedj_queue_seconds_total", "counter", "Time calls waited before starting.", "queue_s"),
+            ("lovedj_prompt_tokens_total", "counter", "Prompt tokens sent.", "prompt_tokens"),
+            ("lovedj_completion_tokens_total", "counter", "Completion tokens received.", "completion_tokens"),
+            ("lovedj_cost_usd_total", "counter", "Reported or estimated spend in USD.", "cost_usd"),
+            ("lovedj_streams_total", "counter", "Natively streamed replies (not EDSL replays).", "streams"),
+            ("lovedj_first_chunk_seconds_total", "counter", "Summed time to first chunk of native streams.", "first_chunk_s"),
+        ]
+        with self._lock:
+            rows = list(self.by_model.items())
+            n_dates = len(self.by_date)
+            dropped = self.dropped
+
+        lines: List[str] = []
+        for name, kind, help_, attr in series:
+            lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (call_kind, model, service), totals in sorted(rows, key=lambda r: str(r[0])):
+                labels = (
+                    f'kind="{_esc(call_kind)}",model="{_esc(model)}",'
+                    f'service="{_esc(service or "")}"'
+                )
+                lines.append(f"{name}{{{labels}}} {getattr(totals, attr):g}")
+        lines.append("# HELP lovedj_dates_tracked Dates with per-date totals in memory.")
+        lines.append("# TYPE lovedj_dates_tracked gauge")
+        lines.append(f"lovedj_dates_tracked {n_dates}")
+        lines.append("# HELP lovedj_call_records_dropped_total Call records dropped before a JSONL export.")
+        lines.append("# TYPE lovedj_call_records_dropped_total counter")
+        lines.append(f"lovedj_call_records_dropped_total {dropped}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically rewrite *path* so a scraper never sees a partial file."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def export(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.write_jsonl(os.path.join(directory, "calls.jsonl"))
+        self.write_prometheus(os.path.join(directory, "lovedj.prom"))
+
+
+def _esc(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Metrics()
+
+
+# --------------------------------------------------------------------------- #
+#  Instrumentation helpers                                                    #
+# --------------------------------------------------------------------------- #
+@contextlib.contextmanager
+def bind(
+    *,
+    date_id: Optional[str] = None,
+    queue_s: Optional[float] = None,
+    turn: Optional[int] = None,
+) -> Iterator[None]:
+    """
+    Attribute calls made inside the block to *date_id* / charge *queue_s*.
+
+    *turn* (the message index within the date) only labels log records.
+    """
+    tokens = []
+    if date_id is not None:
+        tokens.append((_DATE_ID, _DATE_ID.set(date_id)))
+    if turn is not None:
+        tokens.append((_TURN, _TURN.set(turn)))
+    if queue_s is not None:
+        tokens.append((_QUEUE_S, _QUEUE_S.set(queue_s)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_date_id() -> Optional[str]:
+    return _DATE_ID.get()
+
+
+def current_turn() -> Optional[int]:
+    return _TURN.get()
+
+
+@contextlib.contextmanager
+def track_call(
+    kind: str, model: str, service: Optional[str], metrics: Optional[Metrics] = METRICS
+) -> Iterator[CallRecord]:
+    """
+    Time the block and record it; `record_usage()` inside fills tokens/cost.
+
+    With ``metrics=None`` the record is only filled in – the caller decides
+    later whether (and where) to record it.
+    """
+    rec = CallRecord(
+        kind=kind, model=model, service=service,
+        date_id=_DATE_ID.get(), queue_s=_QUEUE_S.get(),
+    )
+    token = _ACTIVE.set(rec)
+    t0 = time.perf_counter()
+    try:
+        yield rec
+    except BaseException as exc:
+        rec.error = type(exc).__name__
+        raise
+    finally:
+        rec.wall_s = time.perf_counter() - t0
+        _ACTIVE.reset(token)
+        if metrics is not None:
+            metrics.record(rec)
+
+
+def current_call() -> Optional[CallRecord]:
+    """The record of the call being tracked in this context, if any."""
+    return _ACTIVE.get()
+
+
+def record_usage(
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None,
+    cost_usd: Optional[float] = None,
+) -> None:
+    """Attach token counts / cost to the call being tracked (if any)."""
+    rec = _ACTIVE.get()
+    if rec is None:
+        return
+    rec.prompt_tokens = prompt_tokens
+    rec.completion_tokens = completion_tokens
+    rec.cost_usd = cost_usd
+
+
+def add_queue_time(seconds: float) -> None:
+    """Charge extra waiting (e.g. rate limiting) to the call being tracked."""
+    rec = _ACTIVE.get()
+    if rec is not None:
+        rec.queue_s += seconds
+
+
+def export_metrics(directory: Optional[str] = None) -> bool:
+    """Export to *directory* or ``$LOVEDJ_METRICS_DIR``; no-op if neither is set."""
+    directory = directory or os.environ.get("LOVEDJ_METRICS_DIR")
+    if not directory:
+        return False
+    METRICS.export(directory)
+    return True
@@ -4,14 +4,31 @@ Helpers around EDSL Model plus a tiny registry of *service ⇄ model* pairs.
 • get_all_models()               → flat, sorted list of model IDs
 • get_service_map()              → {model_id: service_name}
 • format_models_for_selectbox()  → human-friendly strings for a Streamlit box
+• refresh_models()               → re-run discovery (background by default)
+• configured_services()          → services this deployment has keys for
+
+Discovery results are persisted to a small JSON catalogue with a TTL so a
+fresh process can fill the dropdown instantly from the last known list.
+
+Discovery only probes the configured services (``LOVEDJ_MODEL_SERVICES``,
+else those whose API key is set), all at once, each with its own deadline
+(``LOVEDJ_MODEL_PROBE_TIMEOUT``).  Each provider's models are merged into
+the registry as soon as they arrive, replacing only that provider's
+entries, so a slow or failing provider neither delays the dropdown nor
+empties it – its last known models stay.  A cold start waits only for the
+first provider to answer.
 """
 
 from __future__ import annotations
 
+import json
 import logging
 import os
+import queue
+import threading
+import time
 from collections.abc import Sequence
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, List, Set, Tuple
 
 # ---------------------------------------------------------------------------#
 #  Global default model                                                      #
@@ -24,23 +41,27 @@ DEFAULT_MODEL_LABEL = f"{DEFAULT_MODEL_ID} [{DEFAULT_PROVIDER}]"
 # --------------------------------------------------------------------------- #
 #  Logging                                                                    #
 # --------------------------------------------------------------------------- #
-FILE = os.path.abspath(__file__)
-logging.basicConfig(
-    level=logging.INFO,
-    handlers=[logging.StreamHandler(), logging.FileHandler("edsl_models.log", "a")],
-    format="%(asctime)s  %(levelname)s  %(name)s  %(message)s",
-)
 log = logging.getLogger("edsl_models")
-log.info("Loaded helper module from %s", FILE)
+
 
 # --------------------------------------------------------------------------- #
-#  EDSL import                                                                #
+#  EDSL import (lazy – `edsl` takes seconds to import)                        #
 # --------------------------------------------------------------------------- #
-try:
-    from edsl import Model  # type: ignore
-except Exception as exc:  # pragma: no cover
-    log.error("Could not import EDSL: %s", exc)
-    Model = None  # type: ignore[assignment]
+_UNRESOLVED = object()
+Model = _UNRESOLVED  # replaced by the EDSL class (or None) on first use
+
+
+def _model_cls():
+    """Import `edsl.Model` on first use; ``None`` if EDSL is unavailable."""
+    global Model
+    if Model is _UNRESOLVED:
+        try:
+            from edsl import Model as _Model  # type: ignore
+        except Exception as exc:  # pragma: no cover
+            log.error("Could not import EDSL: %s", exc)
+            _Model = None  # type: ignore[assignment]
+        Model = _Model
+    return Model
 
 
 # --------------------------------------------------------------------------- #
@@ -76,37 +97,274 @@ def _normalise(raw) -> Tuple[List[str], Dict[str, str]]:
     return sorted(names), svc_map
 
 
+# --------------------------------------------------------------------------- #
+#  On-disk catalogue (stale-while-revalidate)                                 #
+# --------------------------------------------------------------------------- #
+CATALOGUE_PATH = os.environ.get("LOVEDJ_MODEL_CATALOGUE", ".lovedj_models.json")
+CATALOGUE_TTL_S = float(os.environ.get("LOVEDJ_MODEL_CATALOGUE_TTL", 6 * 3600))
+_RETRY_AFTER_S = 60.0  # back-off between refreshes after a failed discovery
+
+_FALLBACK: Tuple[List[str], Dict[str, str]] = (["gpt-4o"], {"gpt-4o": "openai"})
+
+
+def _load_catalogue(path: str | None = None):
+    """Return ``(models, service_map, fetched_at)`` from disk, or ``None``."""
+    path = path or CATALOGUE_PATH
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        models, svc_map = list(data["models"]), dict(data["service_map"])
+        if not models:
+            return None
+        return models, svc_map, float(data["fetched_at"])
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        log.warning("Ignoring unreadable model catalogue %s: %s", path, exc)
+        return None
+
+
+def _save_catalogue(
+    models: List[str], svc_map: Dict[str, str], path: str | None = None
+) -> None:
+    """Atomically persist the normalised catalogue next to the app."""
+    path = path or CATALOGUE_PATH
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"fetched_at": time.time(), "models": models, "service_map": svc_map},
+                fh,
+            )
+        os.replace(tmp, path)
+    except OSError as exc:
+        log.warning("Could not write model catalogue %s: %s", path, exc)
+
+
+# --------------------------------------------------------------------------- #
+#  Provider-scoped discovery                                                  #
+# --------------------------------------------------------------------------- #
+PROBE_TIMEOUT_S = float(os.environ.get("LOVEDJ_MODEL_PROBE_TIMEOUT", 20))
+
+# service → environment variables holding its credentials (any one will do)
+SERVICE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "openai": ("OPENAI_API_KEY",),
+    "anthropic": ("ANTHROPIC_API_KEY",),
+    "google": ("GOOGLE_API_KEY",),
+    "groq": ("GROQ_API_KEY",),
+    "mistral": ("MISTRAL_API_KEY",),
+    "deep_infra": ("DEEP_INFRA_API_KEY",),
+    "together": ("TOGETHER_API_KEY",),
+    "perplexity": ("PERPLEXITY_API_KEY",),
+    "xai": ("XAI_API_KEY",),
+    "deepseek": ("DEEPSEEK_API_KEY",),
+    "openrouter": ("OPENROUTER_API_KEY",),
+    "bedrock": ("AWS_ACCESS_KEY_ID",),
+    "azure": ("AZURE_ENDPOINT_URL_AND_KEY",),
+}
+
+
+def configured_services() -> List[str]:
+    """
+    Services worth probing: ``LOVEDJ_MODEL_SERVICES`` (comma-separated) if
+    set, else every service in `SERVICE_KEYS` whose key is in the
+    environment.  Empty means "unknown" – discovery then probes globally.
+    """
+    explicit = os.environ.get("LOVEDJ_MODEL_SERVICES", "")
+    if explicit.strip():
+        return [s.strip() for s in explicit.split(",") if s.strip()]
+    return [svc for svc, keys in SERVICE_KEYS.items() if any(os.environ.get(k) for k in keys)]
+
+
+def _probe(model_cls, service: str) -> Tuple[List[str], Dict[str, str]]:
+    """One provider's working models."""
+    return _normalise(model_cls.check_working_models(service=service))
+
+
+def _merge_service(service: str, svc_map: Dict[str, str]) -> None:
+    """Replace *service*'s entries in the live registry with *svc_map*."""
+    global _MODEL_CACHE, _SERVICE_CACHE
+    with _MERGE_LOCK:
+        merged = {m: s for m, s in (_SERVICE_CACHE or {}).items() if s != service}
+        for model_id, provider in svc_map.items():
+            merged.setdefault(model_id, provider)
+        # copy-on-write; the map first so readers never see a newer model list
+        _SERVICE_CACHE, _MODEL_CACHE = merged, sorted(merged)
+        _bump_version()
+    _ARRIVED.set()
+
+
+def _discover_services(
+    model_cls, services: Iterable[str], timeout: float = PROBE_TIMEOUT_S
+) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Probe *services* concurrently and merge each into the registry on arrival.
+
+    Providers that fail or miss the deadline keep their previous entries.
+    Returns the registry restricted to the probed services.
+    """
+    services = list(dict.fromkeys(services))
+    results: "queue.SimpleQueue" = queue.SimpleQueue()
+
+    def run(service: str) -> None:
+        try:
+            results.put((service, _probe(model_cls, service), None))
+        except Exception as exc:
+            results.put((service, None, exc))
+
+    for service in services:
+        # daemon threads: a provider that never answers must not block exit
+        threading.Thread(
+            target=run, args=(service,), name=f"model-probe-{service}", daemon=True
+        ).start()
+
+    deadline = time.monotonic() + timeout
+    pending, answered, reported = set(services), set(), set()
+    while pending:
+        try:
+            service, found, exc = results.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            log.warning("Model discovery timed out after %.0fs for: %s",
+                        timeout, ", ".join(sorted(pending)))
+            break
+        pending.discard(service)
+        if exc is not None or not found[0]:
+            log.warning("Model discovery failed for %s: %s", service, exc or "no models")
+            continue
+        _merge_service(service, found[1])
+        answered.add(service)
+        reported.update(found[1].values())
+        log.info("Discovered %d %s models", len(found[0]), service)
+
+    if not answered:
+        raise RuntimeError(f"no provider answered ({', '.join(services)})")
+    keep = set(services) | reported  # drops services no longer configured
+    svc_map = {m: s for m, s in (_SERVICE_CACHE or {}).items() if s in keep}
+    return sorted(svc_map), svc_map
+
+
+def _discover() -> Tuple[List[str], Dict[str, str]]:
+    """
+    Ask EDSL for the live model list (slow – seconds).
+
+    Scoped to `configured_services()` when there are any; otherwise one
+    global probe of every provider.
+    """
+    model_cls = _model_cls()
+    if model_cls is None:
+        raise RuntimeError("EDSL is not installed")
+    services = configured_services()
+    if services:
+        return _discover_services(model_cls, services)
+    models, svc_map = _normalise(model_cls.check_working_models())
+    if not models:
+        raise ValueError("Parsed zero models")
+    return models, svc_map
+
+
 # --------------------------------------------------------------------------- #
 #  Public API                                                                 #
 # --------------------------------------------------------------------------- #
 _SERVICE_CACHE: Dict[str, str] | None = None  # lazy singleton
 _MODEL_CACHE: List[str] | None = None
+_FETCHED_AT: float = 0.0  # wall-clock time of the data in the caches
+_REFRESH_LOCK = threading.Lock()
+_MERGE_LOCK = threading.Lock()
+_ARRIVED = threading.Event()  # set once models (or a failure) come back
+_LAST_ATTEMPT: float = 0.0
+_VERSION = 0  # bumped (under _MERGE_LOCK) whenever the caches are replaced
+_LABELS: Tuple[int, List[str]] = (-1, [])  # select-box labels for a version
 
 
-def get_all_models() -> List[str]:
-    """Alphabetical list of every model EDSL reports (no services)."""
-    global _MODEL_CACHE, _SERVICE_CACHE
+def _bump_version() -> None:
+    global _VERSION
+    _VERSION += 1
 
-    if _MODEL_CACHE is not None:
-        return _MODEL_CACHE
 
-    if Model is None:  # pragma: no cover
-        log.warning("EDSL missing – using fallback list")
-        _MODEL_CACHE, _SERVICE_CACHE = ["gpt-4o"], {"gpt-4o": "openai"}
-        return _MODEL_CACHE
+def _install(models: List[str], svc_map: Dict[str, str], fetched_at: float) -> None:
+    global _MODEL_CACHE, _SERVICE_CACHE, _FETCHED_AT
+    with _MERGE_LOCK:
+        # assign the map first so get_service_map() never sees a newer model list
+        _SERVICE_CACHE, _MODEL_CACHE, _FETCHED_AT = svc_map, models, fetched_at
+        _bump_version()
+
+
+def refresh_models(*, block: bool = False) -> bool:
+    """
+    Re-run discovery and update memory + disk.
+
+    Non-blocking by default: the work happens on a daemon thread and the
+    call returns ``False`` if a refresh is already running.  With
+    ``block=True`` discovery runs inline and the return value says whether
+    it succeeded.  A failed refresh keeps whatever data was already served.
+    """
+    if not _REFRESH_LOCK.acquire(blocking=block):
+        return False
+    _ARRIVED.clear()
+
+    def work() -> bool:
+        global _LAST_ATTEMPT
+        try:
+            _LAST_ATTEMPT = time.time()
+            models, svc_map = _discover()
+            _install(models, svc_map, time.time())
+            _save_catalogue(models, svc_map)
+            log.info("Discovered %d unique models", len(models))
+            return True
+        except Exception as exc:  # pragma: no cover
+            log.error("Failed to fetch models: %s", exc, exc_info=True)
+            return False
+        finally:
+            _ARRIVED.set()
+            _REFRESH_LOCK.release()
+
+    if block:
+        return work()
+    threading.Thread(target=work, name="model-catalogue-refresh", daemon=True).start()
+    return True
+
+
+def _first_models(timeout: float) -> None:
+    """Cold start: refresh in the background, return once any models are in."""
+    global _MODEL_CACHE, _SERVICE_CACHE, _FETCHED_AT
+    refresh_models()  # False if one is already running – wait for that one
+    _ARRIVED.wait(timeout)
+    with _MERGE_LOCK:
+        if _MODEL_CACHE is None:  # stale on purpose → retried later
+            _SERVICE_CACHE, _MODEL_CACHE = dict(_FALLBACK[1]), list(_FALLBACK[0])
+            _FETCHED_AT = 0.0
+            _bump_version()
+
+
+def _maybe_refresh_in_background() -> None:
+    # EDSL is imported (if at all) on the refresh thread, never here
+    now = time.time()
+    if now - _FETCHED_AT > CATALOGUE_TTL_S and now - _LAST_ATTEMPT > _RETRY_AFTER_S:
+        refresh_models()
 
-    try:
-        raw = Model.check_working_models()
-        models, _SERVICE_CACHE = _normalise(raw)
-        if not models:
-            raise ValueError("Parsed zero models")
-        _MODEL_CACHE = models
-        log.info("Discovered %d unique models", len(models))
-        return models
-    except Exception as exc:  # pragma: no cover
-        log.error("Failed to fetch models: %s", exc, exc_info=True)
-        _MODEL_CACHE, _SERVICE_CACHE = ["gpt-4o"], {"gpt-4o": "openai"}
-        return _MODEL_CACHE
+
+def get_all_models() -> List[str]:
+    """
+    Alphabetical list of every model EDSL reports (no services).
+
+    Served from memory, else from the on-disk catalogue; a stale copy is
+    returned immediately while a background thread refreshes it.  Only a
+    truly cold start (no catalogue file yet) waits on EDSL discovery, and
+    only until the first provider answers.
+    """
+    if _MODEL_CACHE is None:
+        cached = _load_catalogue()
+        if cached is not None:
+            _install(*cached)
+            log.info("Loaded %d models from %s", len(cached[0]), CATALOGUE_PATH)
+        elif _model_cls() is None:  # pragma: no cover
+            log.warning("EDSL missing – using fallback list")
+            _install(*_FALLBACK, time.time())
+        else:
+            _first_models(PROBE_TIMEOUT_S)
+
+    _maybe_refresh_in_background()
+    return _MODEL_CACHE  # type: ignore[return-value]
 
 
 def get_service_map() -> Dict[str, str]:
@@ -116,16 +374,53 @@ def get_service_map() -> Dict[str, str]:
     return _SERVICE_CACHE or {}
 
 
+def catalogue_version() -> int:
+    """
+    Counter that changes whenever the model list or service map is replaced.
+
+    Cheap to call on every Streamlit rerun; use it as the cache key for
+    anything derived from the catalogue.
+    """
+    get_all_models()  # loads on first use, schedules a refresh when stale
+    return _VERSION
+
+
+def known_service(model_name: str) -> str | None:
+    """
+    Service for *model_name* from memory or the catalogue file, else ``None``.
+
+    Unlike `get_service_map()` this never starts discovery (no EDSL import,
+    no network), so it is safe on every model call.
+    """
+    if _SERVICE_CACHE is None:
+        cached = _load_catalogue()
+        if cached is None:
+            return None
+        with _MERGE_LOCK:
+            if _SERVICE_CACHE is not None:  # installed meanwhile
+                return _SERVICE_CACHE.get(model_name)
+        _install(*cached)
+    return (_SERVICE_CACHE or {}).get(model_name)
+
+
 def format_models_for_selectbox() -> List[str]:
     """
     Produce strings like  ``"gpt-4o  [openai]"`` for a Streamlit selectbox.
+
+    The labels are rebuilt only when the catalogue changes
+    (`catalogue_version()`); treat the returned list as read-only.
     """
-    models = get_all_models()
-    svc = get_service_map()
+    global _LABELS
+    version = catalogue_version()
+    if _LABELS[0] == version:
+        return _LABELS[1]
+    with _MERGE_LOCK:  # a consistent (version, models, map) snapshot
+        version, models, svc = _VERSION, _MODEL_CACHE or [], _SERVICE_CACHE or {}
 
     labelled = [f"{m} [{svc.get(m,'?')}]" for m in models]
     labelled = sorted(labelled, key=lambda s: s.lower())
 
+    _LABELS = (version, labelled)
     log.info("Prepared %d select-box entries", len(labelled))
     return labelled
 
@@ -137,34 +432,3 @@ if __name__ == "__main__":  # pragma: no cover
     from pprint import pprint
 
     pprint(format_models_for_selectbox()[:30])
-
-# (append to the end of src/utils/models.py)
-
-
-# --------------------------------------------------------------------------- #
-#  Provider-lookup helper                                                     #
-# --------------------------------------------------------------------------- #
-def get_service_map() -> dict[str, str]:
-    """
-    Return a cached dict mapping **model_id ➜ provider/service name**.
-
-    Useful for attaching the correct `service_name` when constructing `Model`.
-    """
-    global _SERVICE_CACHE  # type: ignore
-    try:  # already built?
-        return _SERVICE_CACHE
-    except NameError:
-        raw = Model.check_working_models()
-        mapping: dict[str, str] = {}
-
-        if isinstance(raw, list):
-            for provider, model, *_ in raw:
-                mapping[str(model)] = str(provider)
-        elif isinstance(raw, dict):
-            for provider, models in raw.items():
-                for m in models:
-                    mapping[str(m)] = str(provider)
-
-        _SERVICE_CACHE = mapping
-        logger.info(f"Built service map with {len(mapping)} entries")
-        return mapping
@@ -2,6 +2,11 @@
 import unittest
 from unittest.mock import patch, MagicMock
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover – optional deps missing
+    numpy = None
+
 # Mock the edsl imports
 class MockAgent:
     def __init__(self, name, traits):
@@ -156,5 +161,102 @@ class TestAgents(unittest.TestCase):
         rating = test_get_rating("test-model", MockAgent("test", {}), "test history")
         self.assertEqual(rating, 8)  # Should extract 8 from the string
 
+
+class TestEvaluateDate(unittest.TestCase):
+    """`evaluate_date` against a minimal in-memory stand-in for EDSL."""
+
+    def _fake_edsl(self, answers):
+        jobs = []
+
+        class Row:
+            def __init__(self, agent):
+                self.agent = agent
+                self.answer = answers[agent.name]
+                self.raw_model_response = {"rating_input_tokens": 100, "rating_output_tokens": 1}
+
+        class Job:
+            def __init__(self, questions):
+                self.questions = [q.name for q in questions]
+                self.agents = []
+
+            def by(self, obj):
+                if isinstance(obj, list):
+                    self.agents = obj
+                return self
+
+            def run(self):
+                jobs.append(self)
+                return list(reversed([Row(a) for a in self.agents]))  # order not guaranteed
+
+        class Question:
+            def __init__(self, question_name, **kwargs):
+                self.name = question_name
+
+        edsl = MagicMock()
+        edsl.Survey = Job
+        edsl.AgentList = list
+        edsl.QuestionLinearScale = edsl.QuestionYesNo = edsl.QuestionFreeText = Question
+        return edsl, jobs
+
+    def test_both_raters_in_one_job_then_cached(self):
+        import tempfile
+        from src.models import agents
+        from src.models.backends import EDSLBackend, set_backend
+        from src.models.cache import ResponseCache
+
+        a, b = MockAgent("Al", {"persona": "a"}), MockAgent("Bea", {"persona": "b"})
+        edsl, jobs = self._fake_edsl({
+            "Al": {"rating": "8", "see_again": "Yes", "rationale": "Fun."},
+            "Bea": {"rating": "n/a", "see_again": "No", "rationale": "Meh."},
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(f"{tmp}/cache.sqlite3")
+            previous = set_backend(EDSLBackend())  # fresh question pool for the fake
+            try:
+                with patch.dict("sys.modules", {"edsl": edsl}), \
+                        patch.object(agents, "get_cache", lambda: cache):
+                    first = agents.evaluate_date("m", [a, b], "hist", debrief=True)
+                    again = agents.evaluate_date("m", [a, b], "hist", debrief=True)
+            finally:
+                set_backend(previous)
+                cache.close()
+
+        self.assertEqual(len(jobs), 2)  # Bea's unparseable rating is not cached
+        self.assertEqual(jobs[0].questions, ["rating", "see_again", "rationale"])
+        self.assertEqual([x.name for x in jobs[1].agents], ["Bea"])
+        self.assertEqual(first[0], {"rating": 8, "see_again": True, "rationale": "Fun."})
+        self.assertEqual(first[1], {"rating": 5, "see_again": False, "rationale": "Meh."})
+        self.assertEqual(again, first)
+
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_k_samples_in_one_job(self):
+        from src.models import agents
+        from src.models.backends import StubBackend, set_backend
+
+        stub = StubBackend(rating_range=(1, 10))
+        previous = set_backend(stub)
+        try:
+            a, b = (stub.make_agent(n, {"persona": n}) for n in ("Al", "Bea"))
+            eval_a, eval_b = agents.evaluate_date(
+                "m", [a, b], "hist", use_cache=False, debrief=True, samples=6
+            )
+            rows = stub.ask_samples(
+                [agents.RATING_QUESTION] + list(agents.DEBRIEF_QUESTIONS), {"history": "hist"},
+                agents=[a], samples=6, model_name="m",
+            )[0]
+        finally:
+            set_backend(previous)
+
+        self.assertEqual(stub.jobs, 2)  # one for both raters' 6 samples, one here
+        ratings = [r["rating"] for r in rows]
+        self.assertAlmostEqual(eval_a["rating"], sum(ratings) / 6, places=3)
+        est = eval_a["rating_estimate"]
+        self.assertEqual((est["valid"], est["samples"]), (6, 6))
+        self.assertLessEqual(est["ci_low"], est["mean"])
+        self.assertGreaterEqual(est["ci_high"], est["mean"])
+        self.assertIn(eval_b["see_again"], (True, False, None))
+
+
 if __name__ == "__main__":
     unittest.main()
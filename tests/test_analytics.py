@@ -0,0 +1,63 @@
+# tests/test_analytics.py
+import os
+import tempfile
+import unittest
+
+from src.models.store import DateStore, date_record
+
+try:
+    import numpy as np
+
+    from src.utils import analytics
+except ImportError:  # pragma: no cover – optional deps missing
+    np = analytics = None
+
+
+@unittest.skipIf(analytics is None, "numpy not installed")
+class TestAnalytics(unittest.TestCase):
+    def test_group_stats_and_percentiles_match_numpy(self):
+        rng = np.random.default_rng(0)
+        keys = rng.integers(0, 5, 1000).astype(np.uint32)
+        values = rng.random(1000) * 30
+        values[::9] = np.nan
+
+        stats = analytics.group_stats(keys, values)
+        pct = analytics.group_percentiles(keys, values, (50, 95))
+        for i, key in enumerate(stats["group"]):
+            v = values[(keys == key) & ~np.isnan(values)]
+            self.assertEqual(stats["count"][i], len(v))
+            self.assertAlmostEqual(stats["mean"][i], v.mean())
+            self.assertAlmostEqual(stats["var"][i], v.var(ddof=1))
+            self.assertAlmostEqual(pct["p50"][i], np.percentile(v, 50))
+            self.assertAlmostEqual(pct["p95"][i], np.percentile(v, 95))
+
+    def test_rating_histogram_drops_missing(self):
+        counts = analytics.rating_histogram(np.array([1.0, 10.0, 10.0, 6.6, np.nan]))
+        self.assertEqual(counts.tolist(), [1, 0, 0, 0, 0, 0, 1, 0, 0, 2])
+
+    def test_summarise_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = DateStore(os.path.join(tmp, "dates"), segment_rows=2)
+            for i, (model, theme, a, b) in enumerate([
+                ("m1", "bar", 8, 6), ("m2", None, 4, None), ("m1", "park", 7, 9),
+            ]):
+                store.append(date_record(
+                    transcript=[("A", "hi")], score_a=a, score_b=b, model_name=model,
+                    theme=theme, rounds=2 + i % 2, elapsed_s=float(i + 1), ts=float(i),
+                ))
+            cols, categories = analytics.load_columns(store)
+            summary = analytics.summarise(cols, categories)
+
+        self.assertEqual(summary["dates"], 3)
+        self.assertAlmostEqual(summary["rating_mean"], 34 / 5)
+        self.assertEqual(summary["by_model"]["model"], ["m1", "m2"])
+        self.assertEqual(summary["by_model"]["ratings"], [4, 1])
+        self.assertEqual(summary["by_model"]["mean"], [7.5, 4.0])
+        self.assertEqual(summary["by_theme"]["theme"], ["bar", "—", "park"])
+        self.assertEqual(summary["by_rounds"]["rounds"], [2, 3])
+        self.assertEqual(summary["latency_by_model"]["p50"], [2.0, 2.0])
+        self.assertEqual(summary["rating_histogram"]["A"][7], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
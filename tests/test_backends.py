@@ -0,0 +1,143 @@
+# tests/test_backends.py
+import asyncio
+import random
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from src.models import agents, simulation
+from src.models.backends import (
+    BackendError,
+    EDSLBackend,
+    Latency,
+    QuestionSpec,
+    StubAgent,
+    StubBackend,
+    make_backend,
+    set_backend,
+)
+from src.models.cache import ResponseCache
+
+
+class TestStubBackend(unittest.TestCase):
+    def test_answers_are_deterministic_and_templated(self):
+        stub = StubBackend(replies={"opener": "Hi, I'm {agent_name} ({gender})."})
+        agent = stub.make_agent("Al", {"persona": "climber"})
+        q = QuestionSpec("opener", "…")
+        first = stub.ask(q, {"gender": "he/him"}, agent=agent, model_name="m")
+        again = StubBackend(replies=stub.replies).ask(q, {"gender": "he/him"}, agent=agent, model_name="m")
+        self.assertEqual(first, "Hi, I'm Al (he/him).")
+        self.assertEqual(first, again)
+
+        rating = QuestionSpec("rating", "…", type="linear_scale", options=tuple(range(1, 11)))
+        rows = stub.ask_survey([rating], {"history": "h"}, agents=[agent, agent], model_name="m")
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(4 <= rows[0]["rating"] <= 9)
+
+    def test_samples_in_one_job(self):
+        stub = StubBackend(rating_range=(1, 10))
+        agent = stub.make_agent("Al", {"persona": "climber"})
+        rating = QuestionSpec("rating", "…", type="linear_scale", options=tuple(range(1, 11)))
+        single = stub.ask_survey([rating], {"history": "h"}, agents=[agent], model_name="m")
+        rows = stub.ask_samples([rating], {"history": "h"}, agents=[agent, agent],
+                                samples=8, model_name="m")
+
+        self.assertEqual(stub.jobs, 2)
+        self.assertEqual([len(r) for r in rows], [8, 8])
+        self.assertEqual(rows[0][0], single[0])  # sample 0 is the plain answer
+        self.assertGreater(len({r["rating"] for r in rows[0]}), 1)
+
+    def test_edsl_rows_grouped_per_agent(self):
+        class Row:
+            def __init__(self, agent, answer):
+                self.agent, self.answer = agent, answer
+
+        rows = [Row("a", 1), Row("b", 2), Row("a", 3), Row("b", 4)]
+        grouped = EDSLBackend._rows_by_agent(rows, ["b", "a"], per_agent=2)
+        self.assertEqual([[r.answer for r in g] for g in grouped], [[2, 4], [1, 3]])
+
+    def test_latency_distributions(self):
+        rng = random.Random(1)
+        self.assertEqual(Latency("fixed", median_s=0.2).sample(rng), 0.2)
+        samples = [Latency("lognormal", median_s=0.1, max_s=0.5).sample(rng) for _ in range(500)]
+        self.assertTrue(all(0 <= s <= 0.5 for s in samples))
+        self.assertAlmostEqual(sorted(samples)[250], 0.1, delta=0.02)
+        with self.assertRaises(ValueError):
+            Latency("gamma")
+
+    def test_injected_failures_and_latency(self):
+        stub = StubBackend(latency=Latency("fixed", median_s=0.02), failure_rate=0.5, seed=3)
+        q = QuestionSpec("turn_0_B", "…")
+        failures = 0
+        t0 = time.perf_counter()
+        for _ in range(20):
+            try:
+                stub.ask(q, {}, model_name="m")
+            except BackendError:
+                failures += 1
+        self.assertGreaterEqual(time.perf_counter() - t0, 20 * 0.02)
+        self.assertEqual((stub.jobs, stub.failures), (20, failures))
+        self.assertTrue(0 < failures < 20)
+
+    def test_edsl_questions_are_built_once_per_spec(self):
+        from unittest.mock import MagicMock
+        from src.models.backends import EDSLBackend
+
+        edsl = MagicMock()
+        backend = EDSLBackend()
+        with patch.dict("sys.modules", {"edsl": edsl}):
+            first = backend.question(agents.TURN_QUESTION)
+            again = backend.question(QuestionSpec("turn", agents.TURN_QUESTION.text))
+            backend.question(agents.RATING_QUESTION)
+        self.assertIs(first, again)
+        self.assertEqual(edsl.QuestionFreeText.call_count, 1)
+        self.assertEqual(edsl.QuestionLinearScale.call_count, 1)
+
+    def test_reply_cache_key_tracks_chat_only(self):
+        a, b = StubAgent("Al", {"persona": "a"}), StubAgent("Bea", {"persona": "b"})
+        fields = {"chat": "hi", "persona": "a", "partner_persona": "b"}
+        key = lambda f, agent=a: agents._cache_key("response", "m", None, "Q", f, agent, ("chat",))
+        self.assertEqual(key(fields), key(dict(fields)))
+        self.assertNotEqual(key(fields), key(dict(fields, chat="hey")))
+        self.assertNotEqual(key(fields), key(dict(fields, persona="c")))
+        self.assertNotEqual(key(fields), key(fields, agent=b))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            make_backend("carrier-pigeon")
+
+
+class TestStubLoadTest(unittest.TestCase):
+    """The real async engine, pools, cache and telemetry on the stub backend."""
+
+    def test_run_many_on_stub_backend(self):
+        pair = dict(
+            name_a="Al", profile_a="climber", gender_a="he/him",
+            name_b="Bea", profile_b="reader", gender_b="she/her",
+            rounds=2, model_name="stub-model",
+        )
+        previous = set_backend(StubBackend(latency=Latency("fixed", median_s=0.01)))
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = ResponseCache(f"{tmp}/cache.sqlite3")
+                with patch.object(agents, "get_cache", lambda: cache):
+                    t0 = time.perf_counter()
+                    results = asyncio.run(simulation.run_many([pair] * 20, max_concurrency=20))
+                    elapsed = time.perf_counter() - t0
+                    rerun = asyncio.run(simulation.run_many([pair], max_concurrency=1))
+                hits = cache.stats()["hits"]
+                cache.close()
+        finally:
+            set_backend(previous)
+
+        transcript, score_a, score_b = results[0]
+        self.assertEqual([speaker for speaker, _ in transcript], ["Al", "Bea", "Al", "Bea", "Al"])
+        self.assertTrue(4 <= score_a <= 9 and 4 <= score_b <= 9)
+        self.assertLess(elapsed, 20 * 6 * 0.01)  # dates overlapped
+        self.assertEqual(rerun[0], results[0])  # deterministic, so fully cached
+        self.assertGreater(hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
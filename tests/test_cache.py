@@ -0,0 +1,69 @@
+# tests/test_cache.py
+import os
+import tempfile
+import time
+import unittest
+
+from src.models.cache import ResponseCache, make_key
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_is_order_independent(self):
+        a = make_key(model="m", scenario={"x": 1, "y": 2})
+        b = make_key(scenario={"y": 2, "x": 1}, model="m")
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, make_key(model="m", scenario={"x": 1, "y": 3}))
+
+    def test_hit_miss_counters_and_persistence(self):
+        cache = ResponseCache(self.path)
+        calls = []
+        compute = lambda: calls.append(1) or "hello"
+
+        self.assertEqual(cache.get_or_compute("k", compute), "hello")
+        self.assertEqual(cache.get_or_compute("k", compute), "hello")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 1))
+        cache.close()
+
+        reopened = ResponseCache(self.path)
+        self.assertEqual(reopened.get("k"), (True, "hello"))
+        reopened.close()
+
+    def test_none_is_not_cached(self):
+        cache = ResponseCache(self.path)
+        cache.get_or_compute("k", lambda: None)
+        self.assertEqual(cache.get("k"), (False, None))
+        cache.close()
+
+    def test_bypass(self):
+        cache = ResponseCache(self.path, enabled=False)
+        cache.set("k", 1)
+        self.assertEqual(cache.get("k"), (False, None))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_eviction_by_size_and_age(self):
+        cache = ResponseCache(self.path, max_entries=3)
+        for i in range(5):
+            cache.set(f"k{i}", i)
+            time.sleep(0.001)
+        cache.get("k0")  # touch the oldest so it survives LRU eviction
+        self.assertEqual(cache.evict(), 2)
+        self.assertTrue(cache.get("k0")[0])
+        self.assertFalse(cache.get("k1")[0])
+
+        cache.max_age_s = 0
+        time.sleep(0.001)
+        cache.evict()
+        self.assertEqual(cache.stats()["entries"], 0)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+# tests/test_cli.py
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src import cli
+from src.models.session import DateSession
+from src.models.store import DateStore
+
+
+def _fake_date():
+    """Patches replacing the live EDSL helpers used by `simulate_pair`."""
+    sessions = {}
+
+    def initialize_date(profile_a, profile_b, name_a, name_b, *args, session_id, **kwargs):
+        if "boom" in profile_a:
+            raise RuntimeError("provider down")
+        sessions[session_id] = DateSession(display_a=name_a, display_b=name_b)
+        return "agent_a", "agent_b", name_a, name_b
+
+    def get_opening_message(agent, display, *args, session_id, **kwargs):
+        entry = (display, "Hi!")
+        return entry, sessions[session_id].add(entry)
+
+    def get_next_response(me, other, display, turn, speaker, history, *args, session_id, **kwargs):
+        entry = (display, f"{speaker}{turn}")
+        return entry, sessions[session_id].add(entry)
+
+    return (
+        patch.object(cli, "initialize_date", initialize_date),
+        patch.object(cli, "get_session", lambda session_id: sessions[session_id]),
+        patch.object(cli, "get_opening_message", get_opening_message),
+        patch.object(cli, "get_next_response", get_next_response),
+        patch.object(cli, "get_date_ratings", lambda *a, **k: (7, 8)),
+        patch.object(cli, "end_date", lambda session_id: sessions.pop(session_id, None)),
+    )
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pairs = os.path.join(self.tmp.name, "pairs.jsonl")
+        self.out = os.path.join(self.tmp.name, "results.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_pairs(self, profiles):
+        with open(self.pairs, "w") as fh:
+            for i, profile in enumerate(profiles):
+                fh.write(json.dumps({
+                    "id": f"p{i}", "name_a": "Al", "profile_a": profile,
+                    "name_b": "Bea", "profile_b": "reader", "rounds": 1,
+                }) + "\n")
+
+    def _run(self, *extra):
+        err = io.StringIO()
+        patches = _fake_date()
+        with contextlib.ExitStack() as stack, contextlib.redirect_stderr(err):
+            for p in patches:
+                stack.enter_context(p)
+            self.setup_logging = stack.enter_context(patch.object(cli, "setup_logging"))
+            code = cli.main([
+                "simulate", "--pairs", self.pairs, "--out", self.out, "--workers", "3", *extra,
+            ])
+        records = []
+        with open(self.out) as fh:
+            for line in fh:
+                with contextlib.suppress(json.JSONDecodeError):
+                    records.append(json.loads(line))
+        return code, records, err.getvalue()
+
+    def test_simulate_streams_records_and_reports_progress(self):
+        self._write_pairs(["climber"] * 5)
+        code, records, err = self._run()
+
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(r["id"] for r in records), [f"p{i}" for i in range(5)])
+        self.assertEqual(
+            records[0]["transcript"], [["Al", "Hi!"], ["Bea", "B0"], ["Al", "A0"]]
+        )
+        self.assertEqual((records[0]["score_a"], records[0]["score_b"]), (7, 8))
+        self.assertIn("5/5 dates", err)
+        self.assertIn("dates/s", err)
+        self.setup_logging.assert_called_once_with()
+
+    def test_resume_skips_done_and_retries_failures(self):
+        self._write_pairs(["climber", "boom", "climber"])
+        with open(self.out, "w") as fh:  # p0 done, then a torn line
+            fh.write(json.dumps({"id": "p0", "score_a": 1, "score_b": 1}) + "\n")
+            fh.write('{"id": "p2", "sco')
+
+        code, records, err = self._run()
+        self.assertEqual(code, 1)  # p1 failed
+        self.assertIn("1 already done", err)
+        by_id = {r["id"]: r for r in records}
+        self.assertEqual(by_id["p0"]["score_a"], 1)  # not re-run
+        self.assertIn("provider down", by_id["p1"]["error"])
+        self.assertEqual(by_id["p2"]["score_b"], 8)
+
+        self.assertEqual(cli.completed_ids(self.out), {"p0", "p2"})
+
+    def test_duplicate_ids_are_rejected(self):
+        with open(self.pairs, "w") as fh:
+            for pair_id in ("a", "b", "a"):
+                fh.write(json.dumps({
+                    "id": pair_id, "name_a": "Al", "profile_a": "climber",
+                    "name_b": "Bea", "profile_b": "reader",
+                }) + "\n")
+        with self.assertRaisesRegex(ValueError, r":3: duplicate id 'a' \(first on line 1\)"):
+            cli.read_pairs(self.pairs)
+
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err), patch.object(cli, "setup_logging"):
+            code = cli.main(["simulate", "--pairs", self.pairs, "--out", self.out])
+        self.assertEqual(code, 2)
+        self.assertFalse(os.path.exists(self.out))
+
+    def test_interrupt_finishes_dates_in_flight(self):
+        self._write_pairs(["climber"] * 6)
+        pairs = cli.read_pairs(self.pairs)
+        interrupt = cli.Interrupt(stream=io.StringIO())
+        with contextlib.ExitStack() as stack:
+            for p in _fake_date():
+                stack.enter_context(p)
+            results = cli._iter_results(pairs, 3, interrupt, model_name="m")
+            got = [next(results)]
+            interrupt()  # first Ctrl-C: start nothing new, keep what is running
+            got += list(results)
+
+        self.assertEqual(len(got), 4)  # the first date + the three in flight
+        self.assertTrue(all(error is None for _, _, error in got))
+        self.assertIn("finishing 3 date(s) in flight", interrupt.stream.getvalue())
+
+    def test_second_interrupt_abandons_dates_in_flight(self):
+        with open(self.pairs, "w") as fh:
+            for i, name in enumerate(["Fast", "Slow", "Slow", "Slow"]):
+                fh.write(json.dumps({
+                    "id": f"p{i}", "name_a": name, "profile_a": "climber",
+                    "name_b": "Bea", "profile_b": "reader", "rounds": 1,
+                }) + "\n")
+        pairs = cli.read_pairs(self.pairs)
+        release, lock = threading.Event(), threading.Lock()
+        calls, ended = [], []
+
+        def get_next_response(me, other, display, turn, speaker, history, *args, **kwargs):
+            with lock:
+                calls.append(display)
+            if "Slow" in history:
+                release.wait(5)
+            return (display, "hi"), history + f"\n{display}: hi"
+
+        def end_date(session_id):
+            with lock:
+                ended.append(session_id)
+
+        interrupt = cli.Interrupt(stream=io.StringIO())
+        with contextlib.ExitStack() as stack:
+            for p in _fake_date():
+                stack.enter_context(p)
+            stack.enter_context(patch.object(cli, "get_next_response", get_next_response))
+            stack.enter_context(patch.object(cli, "end_date", end_date))
+            results = cli._iter_results(pairs, 3, interrupt, model_name="m")
+            self.assertEqual(next(results)[0]["id"], "p0")
+            interrupt()
+            with self.assertRaises(KeyboardInterrupt):
+                interrupt()  # second Ctrl-C
+            results.close()
+            self.assertTrue(interrupt.abandon.is_set())
+
+            release.set()
+            deadline = time.monotonic() + 5
+            while len(ended) < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        self.assertEqual(len(ended), 4)
+        # each slow date stopped after the call it was blocked in
+        self.assertEqual(len(calls), 2 + 3)
+
+    def test_store_receives_finished_dates(self):
+        self._write_pairs(["climber", "boom"])
+        store_dir = os.path.join(self.tmp.name, "dates")
+        self._run("--store", store_dir)
+
+        stored = list(DateStore(store_dir).records())
+        self.assertEqual([r["profile_a"] for r in stored], ["climber"])  # not the failure
+        self.assertEqual(stored[0]["source"], "cli")
+        self.assertEqual(stored[0]["transcript"][0], ["Al", "Hi!"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# tests/test_context.py
+import unittest
+
+from src.models.context import ContextPolicy, estimate_tokens, split_turns
+
+HISTORY = "".join(f"\n{'AB'[i % 2]}: message {i}" for i in range(10))
+
+
+class TestContextPolicy(unittest.TestCase):
+    def test_full_keeps_everything(self):
+        turns = split_turns(HISTORY)
+        self.assertEqual(len(turns), 10)
+        self.assertEqual(ContextPolicy().render(turns), HISTORY.strip())
+
+    def test_last_n_window(self):
+        chat = ContextPolicy("last_n", last_n=3).render(split_turns(HISTORY))
+        self.assertEqual(chat.splitlines(), ["B: message 7", "A: message 8", "B: message 9"])
+
+    def test_rolling_summary_refreshes_every_k(self):
+        policy = ContextPolicy("summary", last_n=2, summary_every=3)
+        calls = []
+
+        def summarise(text):
+            calls.append(text)
+            return f"S{len(calls)}"
+
+        summary, done = "", 0
+        for n in range(1, 11):  # replay the date one message at a time
+            turns = split_turns(HISTORY)[:n]
+            summary, done = policy.refresh_summary(turns, summary, done, summarise)
+
+        # messages leave the 2-message window at n=3..10 → refresh at n=5, 8
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(done, 6)
+        self.assertTrue(calls[1].startswith("Summary so far: S1"))
+
+        chat = policy.render(split_turns(HISTORY), summary)
+        self.assertTrue(chat.startswith("Earlier in the date: S2"))
+        self.assertTrue(chat.endswith("A: message 8\nB: message 9"))
+
+    def test_bounded_policy_keeps_tokens_flat(self):
+        policy = ContextPolicy("last_n", last_n=4)
+        sizes = [
+            estimate_tokens(policy.render(split_turns(HISTORY)[:n])) for n in range(4, 11)
+        ]
+        self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            ContextPolicy("everything")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# tests/test_hedging.py
+import threading
+import time
+import unittest
+
+from src.models.hedging import (
+    HedgePolicy,
+    Hedger,
+    LatencyTracker,
+    ModelRouter,
+    hedging,
+    parse_classes,
+    parse_policy,
+)
+from src.utils.metrics import METRICS, record_usage, track_call
+
+FAST = HedgePolicy(enabled=True, default_deadline_s=0.05, min_samples=3, min_deadline_s=0.01)
+
+
+class TestHedging(unittest.TestCase):
+    def test_parsing(self):
+        self.assertFalse(parse_policy("").enabled)
+        self.assertTrue(parse_policy("on").enabled)
+        policy = parse_policy("percentile=99,min_samples=5")
+        self.assertEqual((policy.enabled, policy.percentile, policy.min_samples), (True, 99, 5))
+        with self.assertRaises(ValueError):
+            parse_policy("after=3")
+        self.assertEqual(
+            parse_classes("gpt-4o, claude-3-5-sonnet [anthropic]; mini"),
+            [[("gpt-4o", None), ("claude-3-5-sonnet", "anthropic")], [("mini", None)]],
+        )
+
+    def test_tracker_percentiles_and_router_ranking(self):
+        tracker = LatencyTracker(window=100)
+        for i in range(1, 101):
+            tracker.record("slow", float(i))
+        tracker.record("fast", 0.5)
+        self.assertEqual(tracker.percentile("slow", 95), 95.0)
+        self.assertEqual(tracker.median("slow"), 50.0)
+        self.assertIsNone(tracker.median("unseen"))
+
+        router = ModelRouter([[("slow", "a"), ("unseen", None), ("fast", "b")]])
+        self.assertEqual(
+            router.rank("slow", None, tracker), [("fast", "b"), ("slow", "a"), ("unseen", None)]
+        )
+        self.assertEqual(router.hedge_target("other", "x", tracker), ("other", "x"))
+        self.assertIsNone(router.fallback("other", "x", tracker))
+        self.assertEqual(router.fallback("fast", None, tracker), ("slow", "a"))
+
+    def test_disabled_runs_inline(self):
+        hedger = Hedger(HedgePolicy())
+        caller = threading.current_thread()
+        self.assertIs(hedger.call("m", None, lambda m, s: threading.current_thread()), caller)
+        self.assertEqual(hedger.stats(), {})
+
+    def test_slow_primary_is_hedged_on_equivalent_model(self):
+        hedger = Hedger(FAST, ModelRouter([[("slow", None), ("fast", "svc")]]))
+        hedger.tracker.record("fast", 0.01)
+
+        def fn(model, service):
+            time.sleep(0.5 if model == "slow" else 0.0)
+            return f"{model}@{service}"
+
+        started = time.monotonic()
+        self.assertEqual(hedger.call("slow", None, fn), "fast@svc")
+        self.assertLess(time.monotonic() - started, 0.4)
+        stats = hedger.stats()["slow"]
+        self.assertEqual((stats["calls"], stats["hedged"], stats["hedge_wins"]), (1, 1, 1))
+        self.assertEqual(stats["hedge_rate"], 1.0)
+        self.assertIn("hedged 1/1 replies", hedger.summary())
+        self.assertIn(("hedge", "fast", "svc"), METRICS.by_model)
+
+    def test_fast_primary_is_not_hedged_and_deadline_follows_p95(self):
+        hedger = Hedger(FAST)
+        for _ in range(3):
+            self.assertEqual(hedger.call("m", None, lambda m, s: "ok"), "ok")
+        self.assertEqual(hedger.stats()["m"]["hedged"], 0)
+        self.assertEqual(hedger.deadline("m"), FAST.min_deadline_s)  # p95 ≈ 0, clamped
+
+    def test_error_falls_back_then_raises_when_all_fail(self):
+        hedger = Hedger(FAST, ModelRouter([[("a", None), ("b", None)]]))
+
+        def flaky(model, service):
+            if model == "a":
+                raise RuntimeError("provider down")
+            return "from b"
+
+        self.assertEqual(hedger.call("a", None, flaky), "from b")
+        self.assertEqual(hedger.stats()["a"]["fallbacks"], 1)
+
+        def broken(model, service):
+            raise RuntimeError(model)
+
+        with self.assertRaisesRegex(RuntimeError, "^a$"):
+            hedger.call("a", None, broken)
+        self.assertEqual(hedger.stats()["a"]["errors"], 1)
+
+    def test_primary_usage_is_kept_whether_it_wins_or_loses(self):
+        hedger = Hedger(FAST, ModelRouter([[("paid-slow", None), ("paid-fast", None)]]))
+        hedger.tracker.record("paid-fast", 0.01)
+        finished = threading.Event()
+
+        def fn(model, service):
+            if model == "paid-slow":
+                time.sleep(0.2)
+                record_usage(prompt_tokens=7, completion_tokens=3)
+                finished.set()
+            else:
+                record_usage(prompt_tokens=1, completion_tokens=1)
+            return model
+
+        with track_call("response", "paid-slow", None) as rec:
+            self.assertEqual(hedger.call("paid-slow", None, fn), "paid-fast")
+        self.assertIsNone(rec.prompt_tokens)  # the primary was still running
+        self.assertTrue(finished.wait(2))
+        deadline = time.monotonic() + 2
+        while ("primary", "paid-slow", None) not in METRICS.by_model and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(METRICS.by_model[("primary", "paid-slow", None)].prompt_tokens, 7)
+
+        with track_call("response", "paid-slow", None) as rec:
+            hedger.call("paid-slow", None, lambda m, s: record_usage(prompt_tokens=5) or m)
+        self.assertEqual(rec.prompt_tokens, 5)  # a winning primary bills the caller
+
+    def test_many_concurrent_calls_do_not_queue_past_the_deadline(self):
+        hedger = Hedger(HedgePolicy(enabled=True, default_deadline_s=0.5))
+
+        def call():
+            hedger.call("busy", None, lambda m, s: time.sleep(0.3))
+
+        threads = [threading.Thread(target=call) for _ in range(64)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(hedger.stats()["busy"]["hedged"], 0)
+
+    def test_hedging_block_overrides_policy(self):
+        hedger = Hedger(HedgePolicy())
+        caller = threading.current_thread()
+        with hedging(True):
+            self.assertIsNot(hedger.call("m", None, lambda m, s: threading.current_thread()), caller)
+        self.assertEqual(hedger.stats()["m"]["calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+# tests/test_importtime.py
+import pathlib
+import subprocess
+import sys
+import unittest
+
+from benchmarks.importtime import parse_importtime, total_us
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:        80 |         80 |     marshal
+import time:       300 |        500 |   src.utils.models
+import time:      1000 |       1700 | app
+"""
+
+
+class TestImportTime(unittest.TestCase):
+    def test_parse_depth_and_totals(self):
+        rows = parse_importtime(SAMPLE.splitlines())
+        self.assertEqual([r.module for r in rows], ["_io", "marshal", "src.utils.models", "app"])
+        self.assertEqual([r.depth for r in rows], [1, 2, 1, 0])
+        self.assertEqual(total_us(rows), 1700)
+
+    def test_startup_modules_do_not_import_edsl(self):
+        """The UI must be importable without paying for `edsl`."""
+        code = (
+            "import sys, src.ui, src.utils.models, src.models.simulation;"
+            "sys.exit('edsl' in sys.modules)"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
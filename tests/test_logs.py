@@ -0,0 +1,88 @@
+# tests/test_logs.py
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+
+from src.utils import logs
+from src.utils.metrics import bind
+
+
+class TestLogs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "app.log")
+        root = logging.getLogger()
+        self.level, self.handlers = root.level, list(root.handlers)
+        for h in self.handlers:  # e.g. pytest's capture handler
+            root.removeHandler(h)
+        self.log = logging.getLogger("lovedj.test")
+
+    def tearDown(self):
+        logs.shutdown_logging()
+        root = logging.getLogger()
+        root.setLevel(self.level)
+        for h in self.handlers:
+            root.addHandler(h)
+        self.tmp.cleanup()
+
+    def _records(self, path=None):
+        logs.shutdown_logging()  # flushes the writer
+        with open(path or self.path, encoding="utf-8") as fh:
+            return [json.loads(line) for line in fh]
+
+    def test_json_records_carry_date_and_turn_from_the_emitting_thread(self):
+        logs.setup_logging(self.path, level="DEBUG", debug_sample=1.0)
+        logs.setup_logging(self.path)  # idempotent
+
+        def worker():
+            with bind(date_id="d42", turn=3):
+                self.log.info("reply for %s", "Sam", extra={"model": "gpt-4o"})
+
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.log.exception("failed")
+
+        records = [r for r in self._records() if r["logger"] == "lovedj.test"]
+        self.assertEqual(records[0]["msg"], "reply for Sam")
+        self.assertEqual((records[0]["date_id"], records[0]["turn"]), ("d42", 3))
+        self.assertEqual(records[0]["model"], "gpt-4o")
+        self.assertNotIn("date_id", records[1])
+        self.assertEqual(records[1]["level"], "ERROR")
+        self.assertIn("ValueError: boom", records[1]["exc"])
+
+    def test_debug_lines_are_sampled_per_template(self):
+        logs.setup_logging(self.path, level="DEBUG", debug_sample=0.25)
+        for i in range(20):
+            self.log.debug("tick %d", i)
+            self.log.info("kept %d", i)
+        records = [r for r in self._records() if r["logger"] == "lovedj.test"]
+        ticks = [r["msg"] for r in records if r["level"] == "DEBUG"]
+        self.assertEqual(ticks, [f"tick {i}" for i in range(0, 20, 4)])
+        self.assertEqual(sum(r["level"] == "INFO" for r in records), 20)
+
+    def test_file_rotates_by_size(self):
+        logs.setup_logging(self.path, max_bytes=2000, backups=2)
+        for i in range(200):
+            self.log.info("line %d %s", i, "x" * 40)
+        logs.shutdown_logging()
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+        self.assertLessEqual(os.path.getsize(self.path), 2000)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = logs.ContextQueueHandler(logs.queue.Queue(1))
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "m", None, None)
+        handler.handle(record)
+        handler.handle(record)
+        self.assertEqual(handler.dropped, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# tests/test_metrics.py
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.utils import metrics as metrics_mod
+from src.utils.metrics import Metrics, bind, record_usage, track_call
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def _call(self, kind="response", model="gpt-4o", usage=None, hit=False):
+        with track_call(kind, model, "openai", metrics=self.metrics) as rec:
+            rec.cache_hit = hit
+            if usage:
+                record_usage(**usage)
+
+    def test_records_are_attributed_to_dates_and_models(self):
+        with bind(date_id="d1", queue_s=0.25):
+            self._call(usage={"prompt_tokens": 1000, "completion_tokens": 100})
+            self._call(hit=True)
+        with bind(date_id="d2"):
+            self._call(model="other")
+
+        d1 = self.metrics.date_totals("d1")
+        self.assertEqual((d1.calls, d1.cache_hits, d1.prompt_tokens), (2, 1, 1000))
+        self.assertAlmostEqual(d1.queue_s, 0.5)
+        # priced from the table: 1000 * 2.5/1M + 100 * 10/1M
+        self.assertAlmostEqual(d1.cost_usd, 0.0035)
+        self.assertEqual(set(self.metrics.model_totals()), {"gpt-4o", "other"})
+
+    def test_errors_are_counted_and_reraised(self):
+        with self.assertRaises(RuntimeError):
+            with track_call("rating", "gpt-4o", None, metrics=self.metrics):
+                raise RuntimeError("429")
+        self.assertEqual(self.metrics.model_totals()["gpt-4o"].errors, 1)
+
+    def test_exports(self):
+        self._call(usage={"prompt_tokens": 10, "completion_tokens": 5, "cost_usd": 0.01})
+        with tempfile.TemporaryDirectory() as tmp:
+            self.metrics.export(tmp)
+            self.metrics.export(tmp)  # second export appends nothing new
+            with open(os.path.join(tmp, "calls.jsonl")) as fh:
+                rows = [json.loads(line) for line in fh]
+            with open(os.path.join(tmp, "lovedj.prom")) as fh:
+                prom = fh.read()
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["cost_usd"], 0.01)
+        self.assertIn("# TYPE lovedj_calls_total counter", prom)
+        self.assertIn(
+            'lovedj_prompt_tokens_total{kind="response",model="gpt-4o",service="openai"} 10',
+            prom,
+        )
+
+    def test_unexported_records_are_bounded(self):
+        with patch.object(metrics_mod, "MAX_PENDING", 3):
+            metrics = self.metrics = Metrics()
+            for _ in range(5):
+                self._call()
+            self.assertEqual((len(metrics._pending), metrics.dropped), (3, 2))
+            self.assertEqual(metrics.model_totals()["gpt-4o"].calls, 5)  # totals keep all
+            self.assertIn("lovedj_call_records_dropped_total 2", metrics.prometheus_text())
+            with tempfile.TemporaryDirectory() as tmp:
+                self.assertEqual(metrics.write_jsonl(os.path.join(tmp, "calls.jsonl")), 3)
+            self._call()
+            self.assertEqual(len(metrics._pending), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
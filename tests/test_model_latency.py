@@ -0,0 +1,50 @@
+# tests/test_model_latency.py
+import unittest
+
+from benchmarks.model_latency import percentile, recommend, run_benchmark, to_markdown
+from src.models.backends import StubBackend, get_backend, set_backend
+from src.models.scheduler import get_scheduler
+
+
+class TestModelLatency(unittest.TestCase):
+    def setUp(self):
+        self.previous = set_backend(StubBackend(failure_rate=0.2, seed=3))
+
+    def tearDown(self):
+        set_backend(self.previous)
+
+    def test_report_covers_every_model_and_call_kind(self):
+        scheduler = get_scheduler()
+        report = run_benchmark(["gpt-4o", "stub-model [stub]"], dates=4, replies=3, concurrency=2)
+
+        self.assertIs(get_scheduler(), scheduler)  # restored
+        self.assertEqual(report["workload"]["calls_per_date"], 5)
+        gpt, stub = report["models"]["gpt-4o"], report["models"]["stub-model"]
+        self.assertEqual((gpt["dates"], gpt["calls"]), (4, 20))
+        self.assertEqual(stub["service"], "stub")
+        self.assertEqual(gpt["errors"], sum(gpt["error_types"].values()))
+        self.assertGreater(gpt["completion_tokens"], 0)
+        self.assertIsNotNone(gpt["cost_per_date_usd"])  # priced model
+        self.assertIsNone(stub["cost_per_date_usd"])
+        self.assertEqual(set(gpt["latency_by_kind"]), {"opener", "reply", "rating"})
+
+        markdown = to_markdown(report)
+        self.assertIn("| gpt-4o |", markdown)
+        self.assertIn("p50 / p95 latency by call", markdown)
+
+    def test_percentile_and_recommendation(self):
+        self.assertEqual(percentile([4, 1, 3, 2], 50), 2.5)
+        self.assertEqual(percentile([1.0], 99), 1.0)
+        self.assertIsNone(percentile([], 50))
+        models = {
+            "fast_flaky": {"error_rate": 0.2, "latency": {"p95_s": 0.5}},
+            "steady": {"error_rate": 0.0, "latency": {"p95_s": 2.0}},
+            "slow": {"error_rate": 0.0, "latency": {"p95_s": 3.0}},
+        }
+        self.assertEqual(recommend(models, 0.05), "steady")
+        self.assertIsNone(recommend(models, -1))
+        self.assertIsInstance(get_backend(), StubBackend)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,9 +4,15 @@ Tests for the model-helper utilities (live-hits EDSL).
 
 from __future__ import annotations
 
+import json
+import os
 import pathlib
 import sys
+import tempfile
+import threading
+import time
 import unittest
+from unittest.mock import patch
 from collections.abc import Sequence
 
 ROOT = pathlib.Path(__file__).resolve().parent.parent
@@ -17,6 +23,7 @@ try:
 except Exception:
     Model = None  # type: ignore[assignment]
 
+import utils.models as models_mod
 from utils.models import (
     get_all_models,
     get_service_map,
@@ -75,5 +82,172 @@ class TestModels(unittest.TestCase):
         self.assertTrue(expected.issubset(actual))
 
 
+class TestCatalogue(unittest.TestCase):
+    """Disk-backed catalogue: serve stale data at once, refresh behind it."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "models.json")
+        self.patches = [
+            patch.object(models_mod, "CATALOGUE_PATH", self.path),
+            patch.object(models_mod, "_MODEL_CACHE", None),
+            patch.object(models_mod, "_SERVICE_CACHE", None),
+            patch.object(models_mod, "_FETCHED_AT", 0.0),
+            patch.object(models_mod, "_LAST_ATTEMPT", 0.0),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self) -> None:
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp.cleanup()
+
+    def _write(self, age_s: float) -> None:
+        with open(self.path, "w") as fh:
+            json.dump(
+                {
+                    "fetched_at": time.time() - age_s,
+                    "models": ["m1", "m2"],
+                    "service_map": {"m1": "openai", "m2": "anthropic"},
+                },
+                fh,
+            )
+
+    def test_fresh_catalogue_is_served_without_discovery(self) -> None:
+        self._write(age_s=0)
+        with patch.object(models_mod, "_discover") as discover:
+            self.assertEqual(models_mod.get_all_models(), ["m1", "m2"])
+            self.assertEqual(models_mod.get_service_map()["m2"], "anthropic")
+        discover.assert_not_called()
+
+    def test_stale_catalogue_is_served_then_refreshed(self) -> None:
+        self._write(age_s=models_mod.CATALOGUE_TTL_S + 1)
+        fresh = (["m1", "m2", "m3"], {"m1": "openai", "m2": "anthropic", "m3": "google"})
+        release = threading.Event()
+
+        def slow_discover():
+            release.wait(5)
+            return fresh
+
+        with patch.object(models_mod, "Model", object()), patch.object(
+            models_mod, "_discover", side_effect=slow_discover
+        ):
+            self.assertEqual(models_mod.get_all_models(), ["m1", "m2"])
+            release.set()
+            with models_mod._REFRESH_LOCK:  # wait for the background refresh
+                pass
+            self.assertEqual(models_mod.get_all_models(), fresh[0])
+
+        with open(self.path) as fh:
+            self.assertEqual(json.load(fh)["models"], fresh[0])
+
+    def test_failed_refresh_keeps_stale_copy(self) -> None:
+        self._write(age_s=models_mod.CATALOGUE_TTL_S + 1)
+        with patch.object(models_mod, "Model", object()), patch.object(
+            models_mod, "_discover", side_effect=RuntimeError("boom")
+        ):
+            self.assertFalse(models_mod.refresh_models(block=True))
+            self.assertEqual(models_mod.get_all_models(), ["m1", "m2"])
+
+    def test_selectbox_labels_are_rebuilt_only_when_the_catalogue_changes(self) -> None:
+        self._write(age_s=0)
+        labels = models_mod.format_models_for_selectbox()
+        self.assertEqual(labels, ["m1 [openai]", "m2 [anthropic]"])
+        version = models_mod.catalogue_version()
+        self.assertIs(models_mod.format_models_for_selectbox(), labels)
+
+        models_mod._merge_service("google", {"m3": "google"})
+        self.assertGreater(models_mod.catalogue_version(), version)
+        self.assertEqual(models_mod.format_models_for_selectbox()[-1], "m3 [google]")
+
+
+class _FakeModel:
+    """`check_working_models(service=…)` per provider, with scripted behaviour."""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.probed = []
+
+    def check_working_models(self, service=None):
+        self.probed.append(service)
+        return self.behaviour[service]()
+
+
+class TestScopedDiscovery(unittest.TestCase):
+    """Only configured providers are probed, in parallel, merged on arrival."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.release = threading.Event()
+        self.patches = [
+            patch.object(models_mod, "CATALOGUE_PATH", os.path.join(self.tmp.name, "m.json")),
+            patch.object(models_mod, "_MODEL_CACHE", None),
+            patch.object(models_mod, "_SERVICE_CACHE", None),
+            patch.object(models_mod, "_FETCHED_AT", 0.0),
+            patch.object(models_mod, "_LAST_ATTEMPT", 0.0),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self) -> None:
+        self.release.set()
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp.cleanup()
+
+    def _slow(self):
+        self.release.wait(5)
+        return [["google", "gemini-new"]]
+
+    def _broken(self):
+        raise RuntimeError("bad key")
+
+    def test_configured_services_from_keys_or_override(self) -> None:
+        env = {"OPENAI_API_KEY": "k", "GROQ_API_KEY": "k", "LOVEDJ_MODEL_SERVICES": ""}
+        with patch.dict(os.environ, env, clear=True):
+            self.assertEqual(models_mod.configured_services(), ["openai", "groq"])
+        with patch.dict(os.environ, {"LOVEDJ_MODEL_SERVICES": "anthropic, openai"}, clear=True):
+            self.assertEqual(models_mod.configured_services(), ["anthropic", "openai"])
+
+    def test_slow_and_broken_providers_keep_their_old_models(self) -> None:
+        models_mod._install(
+            ["claude-old", "gemini-old", "gpt-old", "llama"],
+            {"claude-old": "anthropic", "gemini-old": "google",
+             "gpt-old": "openai", "llama": "groq"},
+            0.0,
+        )
+        fake = _FakeModel({
+            "openai": lambda: [["openai", "gpt-new"]],
+            "anthropic": self._broken,
+            "google": self._slow,
+        })
+        models, svc_map = models_mod._discover_services(
+            fake, ["openai", "anthropic", "google"], timeout=0.3
+        )
+        self.assertEqual(sorted(fake.probed), ["anthropic", "google", "openai"])
+        self.assertEqual(models, ["claude-old", "gemini-old", "gpt-new"])  # groq not configured
+        self.assertEqual(svc_map["gpt-new"], "openai")
+        self.assertIn("gpt-new", models_mod.get_service_map())  # merged on arrival
+
+        with self.assertRaises(RuntimeError):
+            models_mod._discover_services(fake, ["anthropic"], timeout=0.3)
+
+    def test_cold_start_waits_only_for_the_first_provider(self) -> None:
+        fake = _FakeModel({"openai": lambda: [["openai", "gpt-4o"]], "google": self._slow})
+        with patch.object(models_mod, "Model", fake), patch.object(
+            models_mod, "configured_services", lambda: ["openai", "google"]
+        ):
+            started = time.monotonic()
+            self.assertEqual(models_mod.get_all_models(), ["gpt-4o"])
+            self.assertLess(time.monotonic() - started, 2)
+
+            self.release.set()
+            with models_mod._REFRESH_LOCK:  # wait for the rest of the refresh
+                pass
+            self.assertEqual(models_mod.get_all_models(), ["gemini-new", "gpt-4o"])
+            self.assertEqual(models_mod.get_service_map()["gemini-new"], "google")
+
+
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
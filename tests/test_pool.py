@@ -0,0 +1,83 @@
+# tests/test_pool.py
+import threading
+import time
+import unittest
+
+from src.models.pool import ObjectPool
+
+
+class TestObjectPool(unittest.TestCase):
+    def test_builds_once_and_counts_savings(self):
+        pool = ObjectPool("test")
+        builds = []
+
+        def factory():
+            builds.append(1)
+            time.sleep(0.01)
+            return object()
+
+        first = pool.get(("gpt-4o", "openai"), factory)
+        for _ in range(3):
+            self.assertIs(pool.get(("gpt-4o", "openai"), factory), first)
+
+        stats = pool.stats()
+        self.assertEqual(len(builds), 1)
+        self.assertEqual((stats["objects"], stats["hits"]), (1, 3))
+        self.assertAlmostEqual(stats["saved_s"], 3 * stats["build_s"], places=6)
+
+    def test_concurrent_callers_share_one_build(self):
+        pool = ObjectPool("test")
+        builds = []
+
+        def factory():
+            builds.append(1)
+            time.sleep(0.02)
+            return object()
+
+        seen = []
+        threads = [
+            threading.Thread(target=lambda: seen.append(pool.get("k", factory)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(len({id(o) for o in seen}), 1)
+
+    def test_lru_cap_drops_least_recently_used(self):
+        pool = ObjectPool("test", max_size=2)
+        pool.get("a", object)
+        pool.get("b", object)
+        pool.get("a", object)  # "b" is now least recently used
+        pool.get("c", object)
+
+        self.assertIn("a", pool)
+        self.assertNotIn("b", pool)
+        stats = pool.stats()
+        self.assertEqual((stats["objects"], stats["builds"], stats["evictions"]), (2, 3, 1))
+        self.assertEqual(pool._key_locks, {})  # no per-key state left behind
+        with self.assertRaises(ValueError):
+            ObjectPool("test", max_size=0)
+
+    def test_agent_pool_summary(self):
+        from unittest.mock import patch
+
+        from src.models import agents
+        from src.models.backends import StubBackend, set_backend
+
+        previous = set_backend(StubBackend())
+        try:
+            with patch.object(agents, "_AGENT_POOL", ObjectPool("agents", max_size=4)):
+                for _ in range(3):
+                    agents.get_agent("Al", "climber")
+                summary = agents.pool_summary()
+        finally:
+            set_backend(previous)
+        self.assertIn("agents: 1 built, 2 reused", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
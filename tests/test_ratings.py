@@ -0,0 +1,35 @@
+# tests/test_ratings.py
+import unittest
+
+from src.models.ratings import estimate_ratings, majority
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover – optional deps missing
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class TestEstimateRatings(unittest.TestCase):
+    def test_mean_variance_and_interval(self):
+        est, none, single = estimate_ratings([[7, 8, 6, 7, None], [None, None], [9]])
+        self.assertEqual((est.mean, est.variance, est.valid, est.samples), (7.0, 0.667, 4, 5))
+        # t(3) = 3.182 → half-width 3.182 · √(0.667 / 4)
+        self.assertAlmostEqual(est.ci_high - est.mean, 1.299, places=2)
+        self.assertIsNone(none.mean)
+        self.assertEqual((single.ci_low, single.ci_high), (9.0, 9.0))
+
+    def test_interval_is_clipped_to_scale(self):
+        (est,) = estimate_ratings([[10, 10, 9]])
+        self.assertEqual(est.ci_high, 10.0)
+
+
+class TestMajority(unittest.TestCase):
+    def test_votes(self):
+        self.assertTrue(majority([True, True, False, None]))
+        self.assertIsNone(majority([True, False]))
+        self.assertIsNone(majority([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+# tests/test_scheduler.py
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src.models import agents, simulation
+from src.models.backends import Latency, StubBackend, set_backend
+from src.models.cache import ResponseCache
+from src.models.scheduler import (
+    Scheduler,
+    ServiceLimits,
+    TokenBucket,
+    get_scheduler,
+    is_throttle,
+    parse_limits,
+    set_scheduler,
+)
+from src.utils.metrics import Metrics, track_call
+
+
+class RateLimitError(Exception):
+    status_code = 429
+    retry_after = 0.05
+
+
+class TestScheduler(unittest.TestCase):
+    def _scheduler(self, **limits):
+        return Scheduler({"svc": ServiceLimits(**limits)}, resolve=lambda model: "svc")
+
+    def test_parse_limits(self):
+        limits = parse_limits("openai:rpm=500,tpm=150000; default:concurrency=4;anthropic:rpm=50")
+        self.assertEqual(limits["openai"].rpm, 500)
+        self.assertEqual(limits["openai"].tpm, 150000)
+        self.assertEqual(limits["default"].concurrency, 4)
+        self.assertEqual(limits["anthropic"].rpm, 50)
+        self.assertEqual(parse_limits(""), {})
+        with self.assertRaises(ValueError):
+            parse_limits("openai:qps=3")
+
+    def test_token_bucket_waits_for_refill(self):
+        bucket = TokenBucket(per_minute=60, burst=2)  # 1 per second
+        now = bucket.updated
+        self.assertEqual(bucket.reserve(2, now), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1, now), 1.0)
+        self.assertAlmostEqual(bucket.reserve(1, now + 1.0), 1.0)
+
+    def test_throttle_halves_window_and_success_grows_it(self):
+        sched = self._scheduler(concurrency=8)
+        with self.assertRaises(RateLimitError):
+            with sched.slot("m", None):
+                raise RateLimitError("slow down")
+        stats = sched.stats()["svc"]
+        self.assertEqual((stats["window"], stats["throttled"]), (4, 1))
+
+        started = time.monotonic()
+        with sched.slot("m", None):
+            pass
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)  # honoured retry_after
+        self.assertEqual(sched.stats()["svc"]["window"], 4.25)
+
+        with self.assertRaises(ValueError):
+            with sched.slot("m", None):
+                raise ValueError("not a throttle")
+        self.assertEqual(sched.stats()["svc"]["errors"], 1)
+        self.assertTrue(is_throttle(RuntimeError("Error code: 429 - too many requests")))
+        self.assertFalse(is_throttle(RuntimeError("boom")))
+
+    def test_window_caps_concurrency(self):
+        sched = self._scheduler(concurrency=2, max_concurrency=2)
+        lock, running, peak = threading.Lock(), [0], [0]
+
+        def work():
+            with sched.slot("m", None):
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.01)
+                with lock:
+                    running[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(peak[0], 2)
+        stats = sched.stats()["svc"]
+        self.assertEqual((stats["calls"], stats["in_flight"], stats["queue_depth"]), (8, 0, 0))
+
+    def test_queue_time_is_charged_to_the_call(self):
+        sched = self._scheduler(rpm=600)  # burst of 100, then 10 per second
+        metrics = Metrics()
+        for _ in range(100):
+            with sched.slot("m", None):
+                pass
+        with track_call("response", "m", "svc", metrics=metrics):
+            with sched.slot("m", None, tokens=lambda: self.fail("no token budget")):
+                pass
+        self.assertGreater(metrics.model_totals()["m"].queue_s, 0.05)
+
+    def test_disabled_and_model_lookup(self):
+        self.assertEqual(Scheduler(enabled=False).stats(), {})
+        with Scheduler(enabled=False).slot("m", None):
+            pass
+        unbudgeted = Scheduler(resolve=lambda model: self.fail("no lookup without limits"))
+        with unbudgeted.slot("m", None):
+            pass
+        self.assertFalse(unbudgeted.enabled)
+
+        sched = Scheduler({"default": ServiceLimits()}, resolve=lambda model: None)
+        with sched.slot("m", None):
+            pass
+        with sched.slot("m", "openai"):
+            pass
+        self.assertEqual(list(sched.stats()), ["default", "openai"])
+
+        only_openai = Scheduler(parse_limits("openai:rpm=500"), resolve=lambda model: None)
+        with only_openai.slot("m", "anthropic"):
+            pass
+        self.assertEqual(list(only_openai.stats()), [])
+
+    def test_failed_lookups_are_not_memoised(self):
+        catalogue = {}
+        sched = Scheduler(parse_limits("openai:rpm=500"), resolve=catalogue.get)
+        self.assertEqual(sched.service_for("gpt-4o", None), "default")  # not loaded yet
+        catalogue["gpt-4o"] = "openai"
+        self.assertEqual(sched.service_for("gpt-4o", None), "openai")
+        catalogue.clear()
+        self.assertEqual(sched.service_for("gpt-4o", None), "openai")  # memoised
+
+
+class _PeakStub(StubBackend):
+    """Stub backend that records the most calls it ever had in flight."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lock, self.running, self.peak = threading.Lock(), 0, 0
+
+    def _track(self, call, *args, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+    def ask(self, *args, **kwargs):
+        return self._track(super().ask, *args, **kwargs)
+
+    def ask_survey(self, *args, **kwargs):
+        return self._track(super().ask_survey, *args, **kwargs)
+
+
+class TestUnconfiguredScheduler(unittest.TestCase):
+    def test_run_many_concurrency_is_unchanged_without_limits(self):
+        stub = _PeakStub(latency=Latency("fixed", median_s=0.2))
+        pairs = [
+            dict(
+                name_a=f"Al{i}", profile_a="climber", gender_a="he/him",
+                name_b="Bea", profile_b="reader", gender_b="she/her",
+                rounds=1, model_name="stub-model",
+            )
+            for i in range(32)
+        ]
+        env = {k: v for k, v in os.environ.items() if k != "LOVEDJ_RATE_LIMITS"}
+        previous_backend = set_backend(stub)
+        previous_scheduler = set_scheduler(None)
+        try:
+            with patch.dict(os.environ, env, clear=True), tempfile.TemporaryDirectory() as tmp:
+                self.assertFalse(get_scheduler().enabled)
+                cache = ResponseCache(f"{tmp}/cache.sqlite3")
+                with patch.object(agents, "get_cache", lambda: cache):
+                    asyncio.run(simulation.run_many(pairs, max_concurrency=32))
+                cache.close()
+        finally:
+            set_backend(previous_backend)
+            set_scheduler(previous_scheduler)
+        self.assertGreaterEqual(stub.peak, 32)  # every date in flight at once
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# tests/test_session.py
+import unittest
+from unittest.mock import patch
+
+from src.models.session import DateSession, SessionStore, UnknownSession, current_session_id
+
+try:
+    from src.models import simulation
+except Exception:  # pragma: no cover – optional deps missing
+    simulation = None
+
+
+class TestSessionStore(unittest.TestCase):
+    def _finished(self):
+        session = DateSession()
+        session.finished = True
+        return session
+
+    def test_lru_eviction(self):
+        store = SessionStore(max_sessions=2)
+        store.put("a", self._finished())
+        store.put("b", self._finished())
+        store.get("a")  # "b" is now least recently used
+        store.put("c", self._finished())
+
+        self.assertIn("a", store)
+        self.assertNotIn("b", store)
+        self.assertEqual((len(store), store.evictions), (2, 1))
+
+    def test_running_dates_are_not_evicted_unless_idle(self):
+        store = SessionStore(max_sessions=1, idle_s=60)
+        store.put("running", DateSession())
+        store.put("next", DateSession())
+        self.assertEqual((len(store), store.evictions), (2, 0))  # over the cap for now
+
+        store.get("running").last_used -= 120  # abandoned tab
+        store.put("third", DateSession())
+        self.assertNotIn("running", store)
+        self.assertEqual(store.evictions, 1)
+        with self.assertRaises(UnknownSession):
+            store.require("running")
+
+    def test_session_history(self):
+        session = DateSession(display_a="Ann", display_b="Ben")
+        session.add(("Ann", "Hi"))
+        history = session.add(("Ben", "Hello"))
+        self.assertEqual(history, "\nAnn: Hi\nBen: Hello")
+        self.assertEqual(session.transcript, [("Ann", "Hi"), ("Ben", "Hello")])
+
+    def test_default_id_outside_streamlit(self):
+        self.assertEqual(current_session_id(), "default")
+
+
+@unittest.skipIf(simulation is None, "simulation module not importable")
+class TestSessionIsolation(unittest.TestCase):
+    def test_two_sessions_do_not_share_history(self):
+        with patch.object(simulation, "get_agent", lambda name, persona, **kw: name), \
+             patch.object(simulation, "get_opener", lambda m, agent, **kw: f"hi from {agent}"):
+            for sid, name in (("s1", "Ann"), ("s2", "Zoe")):
+                simulation.initialize_date(
+                    "p", "q", name, "Bob", "m", None, "svc", "she/her", "he/him",
+                    session_id=sid,
+                )
+            _, h1 = simulation.get_opening_message("Ann", "Ann", "m", "svc", session_id="s1")
+            _, h2 = simulation.get_opening_message("Zoe", "Zoe", "m", "svc", session_id="s2")
+
+        self.assertEqual(h1, "\nAnn: hi from Ann")
+        self.assertEqual(h2, "\nZoe: hi from Zoe")
+        self.assertEqual(len(simulation.get_session("s1").transcript), 1)
+
+    def test_context_policy_windows_chat_and_records_tokens(self):
+        from src.models.context import ContextPolicy
+
+        sent = []
+
+        def fake_response(model, me, other, turn, speaker, chat, **kw):
+            sent.append(chat)
+            return "ok"
+
+        history = "".join(f"\nA: line {i}" for i in range(8))
+        simulation._SESSIONS.put("ctx", DateSession())
+        with patch.object(simulation, "get_response", fake_response):
+            simulation.get_next_response(
+                "a", "b", "Ann", 0, "A", history, "m", "svc",
+                session_id="ctx", context_policy=ContextPolicy("last_n", last_n=2),
+            )
+
+        self.assertEqual(sent, ["A: line 6\nA: line 7"])
+        self.assertEqual(simulation.get_session("ctx").context_tokens, [5])
+
+    def test_unknown_session_raises_instead_of_restarting_the_date(self):
+        with self.assertRaises(UnknownSession):
+            simulation.get_next_response(
+                "a", "b", "Ann", 0, "A", "\nB: hi", "m", "svc", session_id="never-started",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,15 @@
 # tests/test_simulation.py
+import asyncio
+import threading
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 
+try:
+    from src.models import simulation
+except Exception:  # pragma: no cover – optional deps missing
+    simulation = None
+
 # Mock necessary components for testing
 class MockAgent:
     def __init__(self, name, traits):
@@ -73,5 +81,88 @@ class TestSimulation(unittest.TestCase):
         self.assertEqual(rating_a, 8)
         self.assertEqual(rating_b, 8)
 
+
+@unittest.skipIf(simulation is None, "simulation module not importable")
+class TestAsyncEngine(unittest.TestCase):
+    PAIR = dict(
+        name_a="Alice",
+        profile_a="Profile A",
+        gender_a="she/her",
+        name_b="Bob",
+        profile_b="Profile B",
+        gender_b="he/him",
+        rounds=2,
+        model_name="mock-model",
+    )
+
+    def _patched(self, delay=0.0, tracker=None):
+        def slow(value):
+            def fn(*args, **kwargs):
+                if tracker is not None:
+                    tracker.enter()
+                time.sleep(delay)
+                if tracker is not None:
+                    tracker.leave()
+                return value(*args) if callable(value) else value
+            return fn
+
+        return (
+            patch.object(
+                simulation,
+                "get_agent",
+                lambda name, persona, **traits: MockAgent(name, dict(traits, persona=persona)),
+            ),
+            patch.object(simulation, "get_opener", slow("Hi!")),
+            patch.object(
+                simulation,
+                "get_response",
+                slow(lambda m, me, other, turn, speaker, hist: f"{speaker}{turn}"),
+            ),
+            patch.object(
+                simulation,
+                "evaluate_date",
+                slow(lambda m, agents, hist: [{"rating": 7} for _ in agents]),
+            ),
+        )
+
+    def test_run_date_async_walks_turns_in_order(self):
+        p0, p1, p2, p3 = self._patched()
+        with p0, p1, p2, p3:
+            transcript, a, b = asyncio.run(simulation.run_date_async(**self.PAIR))
+
+        self.assertEqual(
+            transcript,
+            [("Alice", "Hi!"), ("Bob", "B0"), ("Alice", "A0"), ("Bob", "B1"), ("Alice", "A1")],
+        )
+        self.assertEqual((a, b), (7, 7))
+
+    def test_run_many_respects_concurrency_limit(self):
+        class Tracker:
+            def __init__(self):
+                self.lock = threading.Lock()
+                self.live = self.peak = 0
+
+            def enter(self):
+                with self.lock:
+                    self.live += 1
+                    self.peak = max(self.peak, self.live)
+
+            def leave(self):
+                with self.lock:
+                    self.live -= 1
+
+        tracker = Tracker()
+        p0, p1, p2, p3 = self._patched(delay=0.01, tracker=tracker)
+        with p0, p1, p2, p3:
+            results = asyncio.run(
+                simulation.run_many([dict(self.PAIR, rounds=1)] * 10, max_concurrency=3)
+            )
+
+        self.assertEqual(len(results), 10)
+        # both ratings go out as one batched call, so one call per date
+        self.assertLessEqual(tracker.peak, 3)
+        self.assertGreater(tracker.peak, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
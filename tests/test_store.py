@@ -0,0 +1,94 @@
+# tests/test_store.py
+import math
+import os
+import tempfile
+import unittest
+
+from src.models.store import DateStore, date_record
+from src.models.transcript import Transcript
+
+
+def _record(i, model="gpt-4o", score_b=6):
+    return date_record(
+        transcript=[("Al", "Hi!"), ("Bea", "Hello")],
+        score_a=i,
+        score_b=score_b,
+        model_name=model,
+        service_name="openai",
+        rounds=1,
+        elapsed_s=1.5,
+        ts=1000.0 + i,
+    )
+
+
+class TestDateStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "dates")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_seals_segments_and_reads_columns(self):
+        store = DateStore(self.dir, segment_rows=3)
+        for i in range(7):
+            store.append(_record(i, model=f"m{i % 2}", score_b=None if i == 2 else 6))
+        stats = store.stats()
+        self.assertEqual((stats["dates"], stats["sealed_segments"], stats["active_rows"]), (7, 2, 1))
+
+        cols = DateStore(self.dir).columns()  # a fresh reader: mmap + active segment
+        self.assertEqual(list(cols["score_a"]), [float(i) for i in range(7)])
+        self.assertTrue(math.isnan(cols["score_b"][2]))
+        self.assertEqual(list(cols["messages"]), [2] * 7)
+        self.assertEqual(list(cols["chars"]), [8] * 7)
+        models = store.categories("model")
+        self.assertEqual([models[c] for c in cols["model"]], ["m0", "m1"] * 3 + ["m0"])
+
+        recent = store.columns(["score_a"], since=1005.0)
+        self.assertEqual(list(recent), ["score_a"])
+        self.assertEqual(list(recent["score_a"]), [5.0, 6.0])
+        with self.assertRaises(KeyError):
+            store.columns(["nope"])
+
+    def test_records_round_trip_and_reopen(self):
+        store = DateStore(self.dir, segment_rows=2)
+        records = [_record(i) for i in range(3)]
+        for r in records:
+            store.append(r)
+        store.close()
+
+        reopened = DateStore(self.dir, segment_rows=2)
+        self.assertEqual(list(reopened.records()), records)
+        self.assertEqual(len(reopened), 3)
+        reopened.append(_record(3))  # fills and seals the active segment
+        self.assertEqual(reopened.stats()["sealed_segments"], 2)
+        self.assertEqual([r["score_a"] for r in reopened.records(since=1002.0)], [2, 3])
+
+    def test_torn_line_is_skipped(self):
+        store = DateStore(self.dir)
+        store.append(_record(0))
+        store.close()
+        with open(os.path.join(self.dir, "seg-000001.jsonl"), "a") as fh:
+            fh.write('{"date_id": "torn", "sco')
+
+        store = DateStore(self.dir)
+        store.append(_record(1))
+        self.assertEqual([r["score_a"] for r in store.records()], [0, 1])
+        self.assertEqual(store.seal(), "seg-000001")
+        self.assertEqual(list(DateStore(self.dir).columns(["score_a"])["score_a"]), [0.0, 1.0])
+
+    def test_disabled_store_is_a_no_op(self):
+        store = DateStore(self.dir, enabled=False)
+        store.append(_record(0))
+        self.assertFalse(os.path.exists(self.dir))
+        self.assertEqual(len(store), 0)
+        self.assertEqual(list(store.columns(["ts"])["ts"]), [])
+
+    def test_date_record_accepts_transcript(self):
+        t = Transcript([("Al", "Hi!")])
+        self.assertEqual(date_record(transcript=t, score_a=1, score_b=2, model_name="m")["transcript"],
+                         [["Al", "Hi!"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# tests/test_streaming.py
+import time
+import unittest
+
+from src.models.session import DateSession
+from src.models.streaming import ReplyStream, StubStreamer, split_chunks
+from src.utils.metrics import METRICS
+
+try:
+    from src.models import simulation
+except Exception:  # pragma: no cover – optional deps missing
+    simulation = None
+
+
+def _start(session_id):
+    """Register an empty date, as `initialize_date()` would."""
+    simulation._SESSIONS.put(session_id, DateSession())
+    return session_id
+
+
+class TestStreaming(unittest.TestCase):
+    def test_chunks_rejoin_to_original(self):
+        text = "  Hi there,\n how's the  coffee? "
+        chunks = list(split_chunks(text))
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual("".join(chunks), text)
+
+    def test_stub_first_chunk_arrives_before_the_full_reply(self):
+        stub = StubStreamer("one two three four", first_chunk_delay=0.01, chunk_delay=0.02)
+        stream = ReplyStream(stub.stream_reply("stub", None, None, 0, "B", ""), str.upper)
+
+        t0 = time.perf_counter()
+        first = next(iter(stream))
+        ttft = time.perf_counter() - t0
+        self.assertEqual(first, "one")
+        self.assertLess(ttft, 0.05)
+
+    def test_reply_stream_completion_hook(self):
+        stream = ReplyStream(iter(["a", " b"]), str.upper, model_name="stub-model")
+        self.assertEqual(list(stream), ["a", " b"])
+        self.assertEqual((stream.text, stream.result), ("a b", "A B"))
+        self.assertIsNotNone(stream.first_chunk_s)
+        self.assertGreaterEqual(METRICS.model_totals()["stub-model"].streams, 1)
+
+    @unittest.skipIf(simulation is None, "simulation module not importable")
+    def test_stream_next_response_updates_session(self):
+        stub = StubStreamer(lambda turn, speaker, hist: f"{speaker} says hi on turn {turn}")
+        stream = simulation.stream_next_response(
+            "agent_b", "agent_a", "Bea", 0, "B", "\nAl: hello", "stub", None,
+            session_id=_start("stream-test"), streamer=stub,
+        )
+        self.assertEqual("".join(stream), "B says hi on turn 0")
+        entry, history = stream.result
+        self.assertEqual(entry, ("Bea", "B says hi on turn 0"))
+        self.assertTrue(history.endswith("\nBea: B says hi on turn 0"))
+
+    @unittest.skipIf(simulation is None, "simulation module not importable")
+    def test_replayed_replies_record_no_first_chunk_time(self):
+        class Replayer(StubStreamer):
+            native = False  # like EDSLStreamer: whole completion, then words
+
+        before = METRICS.model_totals().get("replay-model")
+        stream = simulation.stream_next_response(
+            "agent_b", "agent_a", "Bea", 0, "B", "", "replay-model", None,
+            session_id=_start("replay-test"), streamer=Replayer("hi there"),
+        )
+        self.assertEqual("".join(stream), "hi there")
+        self.assertTrue(stream.replayed)
+        self.assertIsNone(stream.first_chunk_s)
+        self.assertEqual(METRICS.model_totals().get("replay-model"), before)
+
+    @unittest.skipIf(simulation is None, "simulation module not importable")
+    def test_pipeline_prefetches_next_reply_while_rendering(self):
+        started = []
+
+        def reply(turn, speaker, hist):
+            started.append((speaker, time.perf_counter()))
+            return f"{speaker}{turn}"
+
+        stub = StubStreamer(reply, first_chunk_delay=0.05)
+        with simulation.ReplyPipeline(
+            "agent_a", "agent_b", "Al", "Bea", 2, "\nAl: hello", "stub", None,
+            session_id=_start("pipeline-test"), streamer=stub,
+        ) as pipeline:
+            texts = []
+            for item in pipeline:
+                texts.append((item.display, "".join(item)))
+                time.sleep(0.1)  # slow "render"
+                history = item.result[1]
+
+        self.assertEqual(texts, [("Bea", "B0"), ("Al", "A0"), ("Bea", "B1"), ("Al", "A1")])
+        self.assertEqual([s for s, _ in started], ["B", "A", "B", "A"])
+        self.assertTrue(history.endswith("\nBea: B1\nAl: A1"))
+        # requests follow each other at model latency (0.05 s), not at
+        # model latency + render time (0.15 s)
+        for (_, prev), (_, nxt) in zip(started, started[1:]):
+            self.assertLess(nxt - prev, 0.1)
+
+    @unittest.skipIf(simulation is None, "simulation module not importable")
+    def test_pipeline_surfaces_errors_on_the_consumer(self):
+        def boom(turn, speaker, hist):
+            raise RuntimeError("provider down")
+
+        pipeline = simulation.ReplyPipeline(
+            "agent_a", "agent_b", "Al", "Bea", 1, "", "stub", None,
+            session_id=_start("pipeline-error"), streamer=StubStreamer(boom),
+        )
+        with pipeline, self.assertRaisesRegex(RuntimeError, "provider down"):
+            for item in pipeline:
+                "".join(item)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+# tests/test_templates.py
+import unittest
+
+from src.prompts.date import RESPONSE_PROMPT
+from src.prompts.templates import PROMPT_VERSION, PromptTemplate, compile_prompt
+
+
+class TestPromptTemplate(unittest.TestCase):
+    def test_render(self):
+        t = PromptTemplate("Hi {{ name }}, about {{topic}}: {{ name }}!")
+        self.assertEqual(t.slots, ("name", "topic"))
+        self.assertEqual(t.render({"name": "Al", "topic": "jazz"}), "Hi Al, about jazz: Al!")
+        self.assertEqual(t.render({"name": "Al"}), "Hi Al, about : Al!")  # Jinja-like
+
+    def test_real_prompt_slots_and_sharing(self):
+        compiled = compile_prompt(RESPONSE_PROMPT)
+        self.assertIs(compiled, compile_prompt(RESPONSE_PROMPT))
+        self.assertEqual(
+            set(compiled.slots), {"persona", "gender", "partner_persona", "chat"}
+        )
+        self.assertRegex(PROMPT_VERSION, r"^[0-9a-f]{12}$")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# tests/test_transcript.py
+import unittest
+
+from src.models.session import DateSession
+from src.models.transcript import Transcript
+
+ENTRIES = [("Ann", "Hi"), ("Ben", "Hello: there"), ("Ann", "Two\nlines"), ("Ben", "")]
+
+
+def _old_history(entries):
+    history = ""
+    for speaker, msg in entries:
+        history += f"\n{speaker}: {msg}"
+    return history
+
+
+class TestTranscript(unittest.TestCase):
+    def test_history_matches_old_format(self):
+        t = Transcript()
+        for i, entry in enumerate(ENTRIES, 1):
+            self.assertEqual(t.append(*entry), _old_history(ENTRIES[:i]))
+        self.assertEqual(t.as_history_text(), _old_history(ENTRIES))
+        self.assertEqual(Transcript(ENTRIES).as_history_text(), _old_history(ENTRIES))
+        self.assertEqual(list(t), ENTRIES)
+        self.assertEqual(t[-1], ("Ben", ""))
+        self.assertEqual(t, ENTRIES)
+
+    def test_windows_follow_appends(self):
+        t = Transcript(ENTRIES)
+        self.assertEqual(t.as_history_text(window=2), _old_history(ENTRIES[-2:]))
+        self.assertEqual(t.as_history_text(window=0), "")
+        self.assertEqual(t.as_history_text(window=99), t.as_history_text())
+        self.assertEqual(t.lines()[-1], "Ben: ")
+        t.add(("Ann", "Bye"))
+        self.assertEqual(t.as_history_text(window=2), _old_history((ENTRIES + [("Ann", "Bye")])[-2:]))
+        self.assertEqual(t.lines()[-2:], ["Ben: ", "Ann: Bye"])
+
+    def test_speakers_are_interned(self):
+        t = Transcript(ENTRIES)
+        self.assertEqual(t.speakers, ("Ann", "Ben"))
+        self.assertIs(t[0][0], t[2][0])
+
+    def test_round_trips(self):
+        t = Transcript(ENTRIES + [("Zoë", "ça va? 💬")])
+        self.assertEqual(Transcript.from_records(t.to_records()), t)
+        self.assertEqual(Transcript.from_bytes(t.to_bytes()), t)
+        self.assertEqual(Transcript.from_bytes(Transcript().to_bytes()), Transcript())
+        with self.assertRaises(ValueError):
+            Transcript.from_bytes(b"XXXX" + bytes(8))
+
+    def test_session_derives_history(self):
+        s = DateSession()
+        s.add(("Ann", "Hi"))
+        self.assertEqual(s.add(("Ben", "Hello")), "\nAnn: Hi\nBen: Hello")
+        self.assertEqual(s.history_txt, "\nAnn: Hi\nBen: Hello")
+        self.assertEqual(s.index, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+# tests/test_turn_overhead.py
+import unittest
+
+from benchmarks.turn_overhead import compare, run_suite, snapshot
+from src.models.backends import get_backend
+
+
+class TestTurnOverhead(unittest.TestCase):
+    def test_suite_runs_on_stub_backend_and_restores_backend(self):
+        before = get_backend()
+        results = run_suite(["history_render", "stub_turn"], min_time_s=0.001, repeats=1)
+        self.assertEqual(set(results), {"history_render", "stub_turn"})
+        self.assertTrue(all(r.per_op_us > 0 for r in results.values()))
+        self.assertIs(get_backend(), before)
+
+        with self.assertRaises(ValueError):
+            run_suite(["no_such_case"])
+
+    def test_compare_flags_regressions(self):
+        base = {"cases": {"a": {"per_op_us": 10.0}, "b": {"per_op_us": 10.0}}}
+        current = {"cases": {"a": {"per_op_us": 11.0}, "b": {"per_op_us": 20.0}, "c": {"per_op_us": 1.0}}}
+        rows = {r["name"]: r for r in compare(current, base, threshold=1.5)}
+        self.assertFalse(rows["a"]["regressed"])
+        self.assertTrue(rows["b"]["regressed"])
+        self.assertIsNone(rows["c"]["ratio"])  # new case, nothing to diff
+        self.assertIn("python", snapshot({}))
+
+
+if __name__ == "__main__":
+    unittest.main()